@@ -0,0 +1,146 @@
+"""
+Role-based row access.
+
+A role's policy names the incident domains it may read and, per domain,
+the severities and services it may see (None = all of them). Policies are
+compiled into the IncidentFilter every loader builds its query from:
+restrict() intersects the sidebar selection with the policy, so
+build_where() puts the role's limits in the SQL WHERE clause (and the
+archive scan, snapshots, rollups, the dashboards' delta sync and the
+spike alerts apply them the same way). A session only ever fetches the
+rows its role may see, and cached results, shared mirrors and alert
+models stay per-role because the restricted filter is part of their keys.
+
+Roles without a policy see nothing. The defaults below can be replaced
+per role from a JSON file (data1/access.json by default); "*" stands for
+every domain:
+
+    {"roles": {"auditor": {"cyber": {"severities": ["high", "critical"]},
+                           "it": {"services": ["payments-api"]}}}}
+"""
+import json
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from incident_repo import DATA_DIR, IncidentFilter, has_field
+
+ACCESS_FILE = DATA_DIR / "access.json"
+SESSION_KEY = "access_policy"
+
+
+class AccessDenied(PermissionError):
+    """The role may not read incidents of this domain."""
+
+
+@dataclass(frozen=True)
+class RowPolicy:
+    """Rows of one domain a role may read; None means no limit."""
+    severities: Optional[Tuple[str, ...]] = None
+    services: Optional[Tuple[str, ...]] = None
+
+
+ALL_ROWS = RowPolicy()
+SEVERE = RowPolicy(severities=("high", "critical"))
+
+# role -> domain (or "*") -> rows; roles not listed see nothing
+ROLE_POLICIES = {
+    "admin": {"*": ALL_ROWS},
+    "data_scientist": {"cyber": ALL_ROWS, "it": ALL_ROWS},
+    "analyst": {"cyber": ALL_ROWS, "it": SEVERE},
+    "it_admin": {"it": ALL_ROWS, "cyber": SEVERE},
+}
+
+
+def _intersect(selected, allowed):
+    if allowed is None:
+        return selected
+    if selected is None:
+        return tuple(allowed)
+    return tuple(value for value in selected if value in allowed)
+
+
+@dataclass(frozen=True)
+class Policy:
+    role: Optional[str]
+    domains: Dict[str, RowPolicy] = field(default_factory=dict)
+
+    def rows(self, domain: str) -> Optional[RowPolicy]:
+        return self.domains.get(domain, self.domains.get("*"))
+
+    def allows(self, domain: str) -> bool:
+        return self.rows(domain) is not None
+
+    def unrestricted(self, domain: str) -> bool:
+        """True if the role sees every row of the domain."""
+        return self.rows(domain) == ALL_ROWS
+
+    def restrict(self, domain: str, filters: IncidentFilter = None) -> IncidentFilter:
+        """`filters` narrowed to the rows the role may read; raises AccessDenied."""
+        rows = self.rows(domain)
+        if rows is None:
+            raise AccessDenied(f"Role {self.role!r} may not read {domain!r} incidents")
+        filters = filters or IncidentFilter()
+        services = filters.services
+        if has_field(domain, "service_name"):
+            services = _intersect(services, rows.services)
+        return replace(filters, severities=_intersect(filters.severities, rows.severities),
+                       services=services)
+
+    def covers(self, domain: str, filters: IncidentFilter) -> bool:
+        """True if `filters` selects no rows outside the policy."""
+        return self.allows(domain) and self.restrict(domain, filters) == filters
+
+    def options(self, domain: str, options: dict) -> dict:
+        """
+        get_filter_options() output without the values the role may not see
+        (load it with restrict(domain) too, so the other values only come
+        from rows the role may read).
+        """
+        rows = self.rows(domain) or RowPolicy(severities=(), services=())
+        return {**options,
+                "severities": list(_intersect(options["severities"], rows.severities)),
+                "services": list(_intersect(options["services"], rows.services))}
+
+
+def _row_policy(spec: dict) -> RowPolicy:
+    return RowPolicy(**{name: None if spec.get(name) is None else tuple(spec[name])
+                        for name in ("severities", "services")})
+
+
+def load_policies(path=ACCESS_FILE) -> dict:
+    """ROLE_POLICIES with the roles of a JSON config replaced; missing file is a no-op."""
+    policies = dict(ROLE_POLICIES)
+    path = Path(path)
+    if path.exists():
+        config = json.loads(path.read_text(encoding="utf-8"))
+        for role, domains in config.get("roles", {}).items():
+            policies[role] = {domain: _row_policy(spec or {}) for domain, spec in domains.items()}
+    return policies
+
+
+def resolve(role: Optional[str], path=ACCESS_FILE) -> Policy:
+    """The policy of a role (an empty one for unknown roles)."""
+    return Policy(role, dict(load_policies(path).get(role, {})))
+
+
+def session_policy(state) -> Policy:
+    """The logged-in role's policy, resolved once per session (and on role change)."""
+    role = state.get("role") if state.get("logged_in_user") else None
+    policy = state.get(SESSION_KEY)
+    if policy is None or policy.role != role:
+        policy = resolve(role)
+        state[SESSION_KEY] = policy
+    return policy
+
+
+def _describe(values) -> str:
+    return "all" if values is None else ", ".join(values) or "none"
+
+
+if __name__ == "__main__":
+    for role, domains in load_policies().items():
+        print(f"{role}:")
+        for domain, rows in domains.items():
+            print(f"  {domain:<6} severities: {_describe(rows.severities)}; "
+                  f"services: {_describe(rows.services)}")
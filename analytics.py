@@ -0,0 +1,150 @@
+"""
+Headless dashboard computations, independent of Streamlit.
+
+`dashboard_view(domain, filters, table)` returns everything a dashboard
+draws for one filter spec: metrics, severity distribution, time series and
+one page of the incident table. Results are memoised on (domain, filter
+spec, table request, grain) plus the table's data version, so the same
+view is computed once per data change however many sessions, scripts or
+reports ask for it. The Streamlit pages only render a DashboardView.
+Metrics and charts include incidents moved to the Parquet archive
+(archive.py); the table page lists the hot (SQLite) rows only.
+
+    python analytics.py --domain it --severity high critical --json
+"""
+import argparse
+import json
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Optional
+
+import pandas as pd
+
+from archive import archive_metrics
+from db_helper import count_incidents, get_incident_metrics, get_incidents_page
+from incident_cache import table_version, versioned
+from incident_repo import INCIDENT_TABLES, IncidentFilter, table_for
+from migrations import ensure_migrated
+from rollups import get_rollup_severity_counts, get_rollup_time_series
+
+
+@dataclass(frozen=True)
+class TableRequest:
+    """Which page of the incident table to fetch (keyset cursor in `after`)."""
+    page_size: int = 100
+    sort_column: Optional[str] = None
+    descending: bool = True
+    after: Optional[tuple] = None
+
+
+@dataclass(frozen=True)
+class DashboardView:
+    domain: str
+    filters: IncidentFilter
+    version: int
+    metrics: dict
+    severity_counts: pd.Series
+    time_series: pd.Series
+    page: pd.DataFrame
+    next_cursor: Optional[tuple]
+    total_rows: int
+    archived_metrics: dict
+
+
+@versioned(table_for)
+def _compute_view(domain: str, filters: IncidentFilter, table: TableRequest,
+                  grain: str) -> DashboardView:
+    # Compaction always deletes hot rows too, so the table version also
+    # covers the archive's contents.
+    archived = archive_metrics(domain, filters)
+    page, next_cursor = get_incidents_page(
+        domain, filters, page_size=table.page_size, sort_column=table.sort_column,
+        descending=table.descending, after=table.after,
+    )
+    return DashboardView(
+        domain=domain,
+        filters=filters,
+        version=table_version(table_for(domain)),
+        metrics={name: count + archived[name]
+                 for name, count in get_incident_metrics(domain, filters).items()},
+        severity_counts=get_rollup_severity_counts(domain, filters),
+        time_series=get_rollup_time_series(domain, filters, grain),
+        page=page,
+        next_cursor=next_cursor,
+        total_rows=count_incidents(domain, filters),
+        archived_metrics=archived,
+    )
+
+
+def dashboard_view(domain: str, filters: IncidentFilter = None, table: TableRequest = None,
+                   grain: str = "day", sync=None) -> DashboardView:
+    """
+    The view for one filter spec. Pass the session's IncidentSync as `sync`
+    to take the hot metrics from its incrementally maintained cube.
+    """
+    ensure_migrated()
+    filters = filters or IncidentFilter()
+    view = _compute_view(domain, filters, table or TableRequest(), grain)
+    # the cached view is shared: hand out copies of its mutable parts
+    view = replace(
+        view,
+        metrics=dict(view.metrics),
+        severity_counts=view.severity_counts.copy(deep=False),
+        time_series=view.time_series.copy(deep=False),
+        page=view.page.copy(deep=False),
+    )
+    if sync is not None:
+        hot = sync.metrics(filters)
+        view = replace(view, metrics={name: hot[name] + view.archived_metrics[name]
+                                      for name in hot})
+    return view
+
+
+def view_to_dict(view: DashboardView) -> dict:
+    """JSON-friendly form of a view, for scripts and batch reports."""
+    page = view.page.copy()
+    for column in page.select_dtypes("datetime").columns:
+        page[column] = page[column].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "domain": view.domain,
+        "version": view.version,
+        "metrics": view.metrics,
+        "severity_counts": {str(k): int(v) for k, v in view.severity_counts.items()},
+        "time_series": {str(k): int(v) for k, v in view.time_series.items()},
+        "total_rows": view.total_rows,
+        "archived_metrics": view.archived_metrics,
+        "page": page.astype(object).where(page.notna(), None).to_dict("records"),
+        "next_cursor": view.next_cursor,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute a dashboard view without Streamlit.")
+    parser.add_argument("--domain", choices=sorted(INCIDENT_TABLES), default="cyber")
+    parser.add_argument("--severity", nargs="+")
+    parser.add_argument("--status", nargs="+")
+    parser.add_argument("--service", nargs="+")
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat)
+    parser.add_argument("--grain", choices=["day", "hour"], default="day")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print the whole view as JSON")
+    args = parser.parse_args()
+
+    spec = IncidentFilter(
+        severities=tuple(args.severity) if args.severity else None,
+        statuses=tuple(args.status) if args.status else None,
+        services=tuple(args.service) if args.service else None,
+        start_date=args.start,
+        end_date=args.end,
+    )
+    result = dashboard_view(args.domain, spec, TableRequest(page_size=args.page_size),
+                            args.grain)
+    if args.json:
+        print(json.dumps(view_to_dict(result), indent=2, default=str))
+    else:
+        print(f"{args.domain} (data version {result.version})")
+        for name, value in result.metrics.items():
+            print(f"  {name:<20} {value}")
+        print(result.severity_counts.to_string())
+        print(result.page.to_string(index=False))
@@ -0,0 +1,382 @@
+"""
+Spike detection over the daily incident counts of each domain.
+
+Every series (all incidents, and one per severity, type and service) keeps
+rolling baselines of its daily count: an EWMA mean and variance over all
+days, and one per weekday for weekly seasonality. A day is compared with
+its weekday baseline once that has MIN_WEEKS observations, otherwise with
+the overall one after MIN_HISTORY days. It is a spike when
+
+    z = (count - expected) / max(sd, 1) >= Z_THRESHOLD  and  count >= MIN_COUNT
+
+Baselines are updated in O(1) per incident. A new incident adds one to
+today's count of its series. When a series moves to a later day, the
+finished day is scored and folded into the baselines, and the days without
+incidents in between are folded in closed form, in one step however long
+the gap. Each process's model follows the table through the `updated_seq`
+stamps (migration 5), like incident_delta. After the first build it only
+reads rows written since its last refresh, whichever process or db_helper
+function wrote them. Deletes, edits, rows dated before a series' current
+day and large bulk loads instead trigger a recompute. The recompute runs
+over the daily rollups, vectorised across series, and never rescans the
+incidents.
+
+A model can be scoped to the rows a role may read (access.py): its
+streamed rows and its rollup counts are filtered by the scope in SQL, so
+every series, the total included, only counts incidents the role sees.
+
+    python anomalies.py --domain it --days 30
+"""
+import argparse
+import math
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import db_pool
+from db_pool import connection
+from incident_repo import INCIDENT_TABLES, IncidentFilter, build_where, has_field
+from instrumentation import timed
+from migrations import ensure_migrated
+
+ALPHA = 0.1             # overall EWMA, ~20 days of memory
+WEEK_ALPHA = 0.25       # per-weekday EWMA, ~8 weeks of memory
+MIN_HISTORY = 14        # days before the overall baseline is trusted
+MIN_WEEKS = 4           # observations of a weekday before its baseline is used
+Z_THRESHOLD = 3.0
+MIN_COUNT = 3           # smaller counts are never spikes
+ALERT_DAYS = 7          # default look-back of alerts()
+KEEP_DAYS = 90          # spikes remembered per model
+RECOMPUTE_ROWS = 50_000 # more new rows than this: recompute instead of streaming
+
+# dimension -> stored column; "all" is the domain's total
+DIMENSIONS = {"all": None, "severity": "severity", "type": "type", "service": "service_name"}
+
+ALERT_COLUMNS = ["dimension", "value", "day", "count", "expected", "z", "in_progress"]
+
+
+# ---------- ONE SERIES ----------
+
+def _ewma(mean: float, var: float, n: int, x: float, alpha: float):
+    if not n:               # the first observation is the baseline, not a step from zero
+        return float(x), 0.0
+    diff = x - mean
+    incr = alpha * diff
+    return mean + incr, (1 - alpha) * (var + diff * incr)
+
+
+def _ewma_step(mean, var, n, x, alpha, active):
+    """_ewma over arrays, for the series where `active` is set."""
+    diff = x - mean
+    incr = alpha * diff
+    new_mean = np.where(n == 0, x, mean + incr)
+    new_var = np.where(n == 0, 0.0, (1 - alpha) * (var + diff * incr))
+    return np.where(active, new_mean, mean), np.where(active, new_var, var)
+
+
+def _decay(mean: float, var: float, alpha: float, days: int):
+    """The EWMA state after `days` days with a count of zero, in one step."""
+    keep = (1 - alpha) ** days
+    return mean * keep, keep * (var + mean * mean * (1 - keep))
+
+
+def _weekday_count(first: int, last: int, weekday: int) -> int:
+    """Days d in [first, last] with d % 7 == weekday."""
+    return (last - weekday) // 7 - (first - 1 - weekday) // 7
+
+
+class Series:
+    """Baselines of one daily count series and the count of its open day."""
+
+    __slots__ = ("day", "count", "mean", "var", "n", "week_mean", "week_var", "week_n")
+
+    def __init__(self, day: int):
+        self.day = day                  # open day (proleptic ordinal)
+        self.count = 0
+        self.mean = self.var = 0.0
+        self.n = 0
+        self.week_mean = [0.0] * 7
+        self.week_var = [0.0] * 7
+        self.week_n = [0] * 7
+
+    def score(self, x: int, day: int):
+        """(expected, z) of count x on `day`, or None while there is too little history."""
+        weekday = day % 7
+        if self.week_n[weekday] >= MIN_WEEKS:
+            mean, var = self.week_mean[weekday], self.week_var[weekday]
+        elif self.n >= MIN_HISTORY:
+            mean, var = self.mean, self.var
+        else:
+            return None
+        return mean, (x - mean) / max(math.sqrt(var), 1.0)
+
+    def advance(self, day: int, on_spike=None):
+        """Close the open day, fold it and the empty days before `day`, open `day`."""
+        if day <= self.day:
+            return
+        x, closed = self.count, self.day
+        if on_spike is not None and x >= MIN_COUNT:
+            scored = self.score(x, closed)
+            if scored is not None and scored[1] >= Z_THRESHOLD:
+                on_spike(closed, x, *scored)
+        self.mean, self.var = _ewma(self.mean, self.var, self.n, x, ALPHA)
+        weekday = closed % 7
+        self.week_mean[weekday], self.week_var[weekday] = _ewma(
+            self.week_mean[weekday], self.week_var[weekday], self.week_n[weekday], x, WEEK_ALPHA)
+        self.n += 1
+        self.week_n[weekday] += 1
+
+        gap = day - closed - 1
+        if gap > 0:
+            self.mean, self.var = _decay(self.mean, self.var, ALPHA, gap)
+            self.n += gap
+            for weekday in range(7):
+                empty = _weekday_count(closed + 1, day - 1, weekday)
+                if empty:
+                    self.week_mean[weekday], self.week_var[weekday] = _decay(
+                        self.week_mean[weekday], self.week_var[weekday], WEEK_ALPHA, empty)
+                    self.week_n[weekday] += empty
+        self.day, self.count = day, 0
+
+
+# ---------- MODEL OF A DOMAIN ----------
+
+class LateIncident(Exception):
+    """An incident dated before its series' open day: the baselines need a recompute."""
+
+
+class AnomalyModel:
+    """Series per (dimension, value) of one domain, kept current incrementally."""
+
+    def __init__(self, domain: str, scope: IncidentFilter = None):
+        self.domain = domain
+        self.scope = scope or IncidentFilter()     # rows counted (severities, services)
+        self.series = {}            # (dimension, value) -> Series
+        self.day = None             # latest day seen in the domain
+        self.spikes = {}            # (dimension, value, day) -> (count, expected, z)
+        self.high_water = -1
+        self.max_id = 0
+        self.recomputes = 0
+        self._lock = threading.Lock()
+
+    def _keys(self, severity, incident_type, service):
+        yield "all", ""
+        for dimension, value in (("severity", severity), ("type", incident_type),
+                                 ("service", service)):
+            if value:
+                yield dimension, value
+
+    def _spike_recorder(self, key):
+        def record(day, count, expected, z):
+            self.spikes[(*key, day)] = (count, expected, z)
+        return record
+
+    def observe(self, day: int, severity=None, incident_type=None, service=None):
+        """Count one incident on `day` (an ordinal) in each of its series; O(1)."""
+        for key in self._keys(severity, incident_type, service):
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = Series(day)
+            elif day < series.day:
+                raise LateIncident(key, day)
+            series.advance(day, self._spike_recorder(key))
+            series.count += 1
+        if self.day is None or day > self.day:
+            self.day = day
+
+    def recompute(self, counts: pd.DataFrame):
+        """
+        Rebuild every series from daily counts (columns dimension, value,
+        day as an ordinal, count), vectorised across series: the same state
+        streaming the incidents through observe() would give.
+        """
+        self.series, self.spikes, self.day = {}, {}, None
+        self.recomputes += 1
+        counts = counts[counts["count"] > 0]
+        if counts.empty:
+            return
+        keys = pd.MultiIndex.from_frame(counts[["dimension", "value"]]).unique()
+        key_index = keys.get_indexer(pd.MultiIndex.from_frame(counts[["dimension", "value"]]))
+        first, last = int(counts["day"].min()), int(counts["day"].max())
+        matrix = np.zeros((len(keys), last - first + 1))
+        np.add.at(matrix, (key_index, counts["day"].to_numpy() - first), counts["count"].to_numpy())
+
+        k = len(keys)
+        started = np.argmax(matrix > 0, axis=1) + first
+        mean, var, n = np.zeros(k), np.zeros(k), np.zeros(k, dtype=np.int64)
+        week_mean, week_var = np.zeros((k, 7)), np.zeros((k, 7))
+        week_n = np.zeros((k, 7), dtype=np.int64)
+        for day in range(first, last):          # every day but the open last one
+            active = started <= day
+            x = matrix[:, day - first]
+            weekday = day % 7
+
+            if day >= last - KEEP_DAYS:
+                use_week = week_n[:, weekday] >= MIN_WEEKS
+                expected = np.where(use_week, week_mean[:, weekday], mean)
+                spread = np.where(use_week, week_var[:, weekday], var)
+                z = (x - expected) / np.maximum(np.sqrt(spread), 1.0)
+                ready = use_week | (n >= MIN_HISTORY)
+                for i in np.flatnonzero(active & ready & (x >= MIN_COUNT) & (z >= Z_THRESHOLD)):
+                    self.spikes[(*keys[i], day)] = (int(x[i]), float(expected[i]), float(z[i]))
+
+            mean, var = _ewma_step(mean, var, n, x, ALPHA, active)
+            n += active
+            week_mean[:, weekday], week_var[:, weekday] = _ewma_step(
+                week_mean[:, weekday], week_var[:, weekday], week_n[:, weekday], x, WEEK_ALPHA,
+                active)
+            week_n[:, weekday] += active
+
+        for i, key in enumerate(keys):
+            series = Series(last)
+            series.count = int(matrix[i, -1])
+            series.mean, series.var, series.n = float(mean[i]), float(var[i]), int(n[i])
+            series.week_mean = week_mean[i].tolist()
+            series.week_var = week_var[i].tolist()
+            series.week_n = week_n[i].tolist()
+            self.series[key] = series
+        self.day = last
+
+    def alerts(self, days: int = ALERT_DAYS) -> pd.DataFrame:
+        """Spikes in the last `days` days, including today's count so far."""
+        if self.day is None:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        for key, series in self.series.items():
+            series.advance(self.day, self._spike_recorder(key))
+        self.spikes = {key: value for key, value in self.spikes.items()
+                       if key[2] > self.day - KEEP_DAYS}
+        rows = [(dimension, value, day, *spike, False)
+                for (dimension, value, day), spike in self.spikes.items()
+                if day > self.day - days]
+        for (dimension, value), series in self.series.items():
+            scored = series.score(series.count, series.day)
+            if series.count >= MIN_COUNT and scored is not None and scored[1] >= Z_THRESHOLD:
+                rows.append((dimension, value, series.day, series.count, *scored, True))
+        alerts = pd.DataFrame(rows, columns=ALERT_COLUMNS)
+        alerts["day"] = [date.fromordinal(d) for d in alerts["day"]]
+        return alerts.sort_values(["day", "z"], ascending=False, ignore_index=True)
+
+
+# ---------- FED FROM THE DATABASE ----------
+
+def _ordinal(timestamp: str) -> int:
+    return date.fromisoformat(timestamp[:10]).toordinal()
+
+
+def _scoped(domain: str, scope: IncidentFilter, date_column: str = None):
+    """(" AND ...", params) restricting a query to the scope's rows."""
+    where_sql, params = build_where(domain, scope, date_column)
+    return where_sql.replace(" WHERE ", " AND ", 1), params
+
+
+def _daily_counts(conn, domain: str, scope: IncidentFilter = None) -> pd.DataFrame:
+    """Per-series daily counts from the day rollup (archived incidents included)."""
+    scoped, scope_params = _scoped(domain, scope or IncidentFilter(), "bucket")
+    frames = []
+    for dimension, column in DIMENSIONS.items():
+        # one aggregate per dimension: the cells are many, the results are not
+        value, present = ("''", "") if column is None else (column, f"AND {column} != ''")
+        frames.append(pd.read_sql_query(f"""
+            SELECT '{dimension}' AS dimension, {value} AS value, bucket,
+                   SUM(incident_count) AS count
+            FROM incident_rollups WHERE grain = 'day' AND domain = ? {present}{scoped}
+            GROUP BY bucket, value
+        """, conn, params=(domain, *scope_params)))
+    counts = pd.concat(frames, ignore_index=True)
+    counts["day"] = [date.fromisoformat(b).toordinal() for b in counts.pop("bucket")]
+    return counts[["dimension", "value", "day", "count"]]
+
+
+def refresh(model: AnomalyModel):
+    """Bring a model up to the table: stream the new rows, or recompute."""
+    spec = INCIDENT_TABLES[model.domain]
+    table, date_column = spec["table"], spec["date_column"]
+    service = "service_name" if has_field(model.domain, "service_name") else "NULL"
+    scoped, scope_params = _scoped(model.domain, model.scope)
+    with model._lock, connection() as conn:
+        conn.execute("BEGIN")   # one snapshot for the version and the rows
+        version = conn.execute("SELECT version FROM table_versions WHERE table_name = ?",
+                               (table,)).fetchone()[0]
+        if version == model.high_water:
+            return
+        changed = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE updated_seq > ?",
+                               (model.high_water,)).fetchone()[0]
+        deleted = conn.execute(
+            "SELECT 1 FROM incident_tombstones WHERE table_name = ? AND seq > ? LIMIT 1",
+            (table, model.high_water),
+        ).fetchone()
+        # over every row, not just the scope's: an edit can move a row out of it
+        edited = conn.execute(
+            f"SELECT 1 FROM {table} WHERE updated_seq > ? AND incident_id <= ? LIMIT 1",
+            (model.high_water, model.max_id),
+        ).fetchone()
+        stream = (model.high_water >= 0 and not deleted and not edited
+                  and changed <= RECOMPUTE_ROWS)
+        if stream:
+            rows = conn.execute(f"""
+                SELECT incident_id, severity, type, {service}, {date_column} FROM {table}
+                WHERE updated_seq > ?{scoped} ORDER BY incident_id
+            """, (model.high_water, *scope_params)).fetchall()
+            try:
+                for incident_id, severity, incident_type, service_name, when in rows:
+                    if when is not None:
+                        model.observe(_ordinal(when), severity, incident_type, service_name)
+            except LateIncident:
+                stream = False
+        if not stream:
+            model.recompute(_daily_counts(conn, model.domain, model.scope))
+        model.max_id = conn.execute(
+            f"SELECT COALESCE(MAX(incident_id), 0) FROM {table}").fetchone()[0]
+        model.high_water = version
+
+
+_models = {}        # (database file, domain, scope) -> AnomalyModel
+_models_lock = threading.Lock()
+
+
+def get_model(domain: str, scope: IncidentFilter = None) -> AnomalyModel:
+    """This process's model of a domain (within `scope`), refreshed from the table."""
+    ensure_migrated()
+    scope = scope or IncidentFilter()
+    key = (db_pool.get_pool().db_file, domain, scope)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = AnomalyModel(domain, scope)
+    refresh(model)
+    return model
+
+
+@timed()
+def get_alerts(domain: str, filters: IncidentFilter = None, days: int = ALERT_DAYS,
+               scope: IncidentFilter = None) -> pd.DataFrame:
+    """
+    Recent spikes of the series the filter selects (the total always), each
+    counted over the rows in `scope` only: pass the role's restricted
+    filter (access.Policy.restrict) when it may not see every row.
+    """
+    model = get_model(domain, scope)
+    with model._lock:
+        alerts = model.alerts(days)
+    filters = filters or IncidentFilter()
+    keep = np.ones(len(alerts), dtype=bool)
+    for dimension, selected in (("severity", filters.severities), ("type", filters.types),
+                                ("service", filters.services)):
+        if selected is not None:
+            keep &= ~((alerts["dimension"] == dimension) & ~alerts["value"].isin(selected))
+    return alerts[keep].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recent spikes in the daily incident counts.")
+    parser.add_argument("--domain", default="it")
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    found = get_alerts(args.domain, days=args.days)
+    if found.empty:
+        print(f"No spikes in the last {args.days} days.")
+    else:
+        print(found.round(2).to_string(index=False))
@@ -1,12 +1,18 @@
 import streamlit as st
-import pages.Login
-import pages.CybersecurityDashboard
-import pages.ITDashboard  # second domain
+
+from instrumentation import serve_metrics, span
+from migrations import ensure_migrated
+from views import PAGES, load_page
 
 st.set_page_config(page_title="CW2 Intelligence Platform", layout="wide")
 
 
 def main():
+    # Bring data1/cw2.db up to the latest schema (once per process)
+    ensure_migrated()
+    # /metrics for Prometheus when CW2_METRICS_PORT is set (once per process)
+    serve_metrics()
+
     # Persistent session state for auth
     if "logged_in_user" not in st.session_state:
         st.session_state["logged_in_user"] = None
@@ -32,18 +38,17 @@ def main():
         else:
             st.info("Not logged in")
 
-        page = st.selectbox(
-            "Go to",
-            ["Login", "Cybersecurity Dashboard", "IT Dashboard"],
-        )
-
-    # Route to correct page
-    if page == "Login":
-        pages.Login.show()
-    elif page == "Cybersecurity Dashboard":
-        pages.CybersecurityDashboard.show()
-    elif page == "IT Dashboard":
-        pages.ITDashboard.show()
+        page = st.selectbox("Go to", list(PAGES))
+
+    # Route to correct page; its module (and pandas) is imported on first use
+    if PAGES[page].needs_data:
+        from incident_repo import load_domain_config
+
+        # Extra incident domains from data1/domains.json, if present
+        load_domain_config()
+    view = load_page(page)
+    with span(f"page.{page}"):       # one span per rerun of the page
+        view.show()
 
 
 if __name__ == "__main__":
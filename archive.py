@@ -0,0 +1,298 @@
+"""
+Columnar archive tier for old, finished incidents.
+
+`compact(domain)` moves resolved/closed incidents older than
+ARCHIVE_AFTER_DAYS out of the SQLite table into Parquet files partitioned
+by domain and month:
+
+    data1/archive/<domain>/month=YYYY-MM/part-<id>.parquet
+
+A file only becomes part of the archive when its row in `archive_files`
+(migration 8) commits, in the same transaction that deletes the hot rows,
+so a crash leaves at worst an orphan file that the next run removes.
+Files are written, and orphans removed, only while holding the database
+write lock, so a file another run has yet to commit is never taken for an
+orphan. The
+rollups keep counting archived incidents (their counts are also kept in
+`archive_rollups` for rebuilds), so the charts are unchanged.
+
+`scan(domain, columns, filters)` reads the archive for the repository:
+the manifest prunes whole files by month/date range, the remaining filters
+are pushed down to the Parquet row groups, and only the projected columns
+are decoded.
+
+    python archive.py compact --domain it --older-than 180
+    python archive.py merge --domain it      # one file per month partition
+    python archive.py status
+"""
+import argparse
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+import db_pool
+from db_pool import connection
+from incident_cache import invalidate, versioned
+from incident_repo import INCIDENT_TABLES, IncidentFilter
+from migrations import add_rollup_counts, ensure_migrated
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # the archive tier needs pyarrow; without it nothing is archived
+    pa = ds = pq = None
+
+ARCHIVE_AFTER_DAYS = 180
+ARCHIVED_STATUSES = ("resolved", "closed")
+ROW_GROUP_ROWS = 64_000
+
+
+def archive_root() -> Path:
+    """Archive directory, next to the database in use."""
+    return db_pool.get_pool().db_file.parent / "archive"
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise RuntimeError("The Parquet archive needs the pyarrow package.")
+
+
+# ---------- MANIFEST ----------
+
+def _manifest(domain: str) -> list:
+    with connection() as conn:
+        return conn.execute("""
+            SELECT path, month, row_count, min_date, max_date FROM archive_files
+            WHERE domain = ? ORDER BY month, path
+        """, (domain,)).fetchall()
+
+
+def _files_for(domain: str, filters: IncidentFilter) -> list:
+    """Manifest paths whose date range can overlap the filter's."""
+    start = filters.start_date.isoformat() if filters.start_date else None
+    end = (filters.end_date + timedelta(days=1)).isoformat() if filters.end_date else None
+    return [
+        path for path, _, _, min_date, max_date in _manifest(domain)
+        if (start is None or max_date >= start) and (end is None or min_date < end)
+    ]
+
+
+# ---------- READS ----------
+
+def _expression(domain: str, filters: IncidentFilter):
+    """The filter spec as a pyarrow expression (None when unfiltered)."""
+    fields = INCIDENT_TABLES[domain]["fields"]
+    date_column = INCIDENT_TABLES[domain]["date_column"]
+    parts = []
+    for column, values in (
+        ("severity", filters.severities),
+        ("status", filters.statuses),
+        ("type", filters.types),
+        ("service_name", filters.services if "service_name" in fields else None),
+    ):
+        if values is not None:
+            parts.append(ds.field(column).isin(list(values)))
+    if filters.start_date is not None:
+        start = datetime.combine(filters.start_date, datetime.min.time())
+        parts.append(ds.field(date_column) >= pa.scalar(start, pa.timestamp("us")))
+    if filters.end_date is not None:
+        end = datetime.combine(filters.end_date + timedelta(days=1), datetime.min.time())
+        parts.append(ds.field(date_column) < pa.scalar(end, pa.timestamp("us")))
+    expression = None
+    for part in parts:
+        expression = part if expression is None else expression & part
+    return expression
+
+
+@versioned("archive_files")
+def scan(domain: str, columns: tuple, filters: IncidentFilter) -> pd.DataFrame:
+    """
+    Archived incidents of a domain (stored column names, untyped); reads
+    only the files and row groups the filters can match.
+    """
+    files = _files_for(domain, filters) if pq is not None else []
+    if not files:
+        return pd.DataFrame({c: pd.Series([], dtype=object) for c in columns})
+    root = archive_root()
+    dataset = ds.dataset([str(root / path) for path in files], format="parquet")
+    table = dataset.to_table(columns=list(columns), filter=_expression(domain, filters))
+    return table.to_pandas()
+
+
+def scan_batches(domain: str, columns: tuple, filters: IncidentFilter, batch_rows: int):
+    """scan() in DataFrames of at most `batch_rows` rows, for bounded-memory exports."""
+    files = _files_for(domain, filters) if pq is not None else []
+    if not files:
+        return
+    root = archive_root()
+    dataset = ds.dataset([str(root / path) for path in files], format="parquet")
+    for batch in dataset.to_batches(columns=list(columns), filter=_expression(domain, filters),
+                                    batch_size=batch_rows):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+@versioned("archive_files")
+def archive_metrics(domain: str, filters: IncidentFilter) -> dict:
+    """Same counts as db_helper.get_incident_metrics, over the archive."""
+    df = scan(domain, ("severity", "status"), filters)
+    return {
+        "total": len(df),
+        "open_investigating": int(df["status"].isin(["open", "investigating"]).sum()),
+        "high_critical": int(df["severity"].isin(["high", "critical"]).sum()),
+        "resolved": int((df["status"] == "resolved").sum()),
+    }
+
+
+# ---------- COMPACTION ----------
+
+def _remove_orphans(domain: str) -> int:
+    """Delete files under the domain's directory that the manifest doesn't list."""
+    directory = archive_root() / domain
+    if not directory.exists():
+        return 0
+    listed = {path for path, *_ in _manifest(domain)}
+    removed = 0
+    for file in directory.glob("month=*/*.parquet"):
+        if file.relative_to(archive_root()).as_posix() not in listed:
+            file.unlink()
+            removed += 1
+    return removed
+
+
+def _write_file(domain: str, month: str, df: pd.DataFrame) -> tuple:
+    """Write one sorted Parquet file; returns its manifest row."""
+    date_column = INCIDENT_TABLES[domain]["date_column"]
+    df = df.sort_values(date_column, kind="stable")
+    relative = f"{domain}/month={month}/part-{uuid.uuid4().hex[:12]}.parquet"
+    target = archive_root() / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), target,
+                   row_group_size=ROW_GROUP_ROWS, compression="zstd")
+    dates = df[date_column]
+    return (relative, domain, month, len(df),
+            dates.min().strftime("%Y-%m-%d %H:%M:%S"), dates.max().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def _typed(domain: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Datetime columns as timestamps so Parquet stores them natively."""
+    fields = INCIDENT_TABLES[domain]["fields"]
+    for column in df.columns:
+        if fields[column] == "datetime":
+            df[column] = pd.to_datetime(df[column], format="ISO8601",
+                                        errors="coerce").astype("datetime64[us]")
+    return df
+
+
+def compact(domain: str, older_than_days: int = ARCHIVE_AFTER_DAYS, now: datetime = None) -> dict:
+    """
+    Move finished incidents older than `older_than_days` into the archive.
+    Returns {"rows": archived rows, "files": files written}.
+    """
+    _require_pyarrow()
+    ensure_migrated()
+    spec = INCIDENT_TABLES[domain]
+    table, date_column = spec["table"], spec["date_column"]
+    cutoff = ((now or datetime.now()) - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+    where = (f"status IN ({', '.join('?' * len(ARCHIVED_STATUSES))}) "
+             f"AND {date_column} IS NOT NULL AND {date_column} < ?")
+    params = (*ARCHIVED_STATUSES, cutoff)
+
+    with connection() as conn:
+        # Hold the write lock from the read to the delete so the files and
+        # the deleted rows are exactly the same incidents, and while looking
+        # for orphans so no other run is between writing and listing a file.
+        conn.execute("BEGIN IMMEDIATE")
+        _remove_orphans(domain)
+        df = pd.read_sql_query(f"SELECT {spec['columns']} FROM {table} WHERE {where}",
+                               conn, params=params)
+        if df.empty:
+            return {"rows": 0, "files": 0}
+        df = _typed(domain, df)
+        months = df[date_column].dt.strftime("%Y-%m")
+        manifest = [_write_file(domain, month, part.reset_index(drop=True))
+                    for month, part in df.groupby(months, sort=True)]
+
+        add_rollup_counts(conn, table, where=where, params=params, target="archive_rollups")
+        # incident_rollups keeps the counts: the rows move, they don't go away
+        conn.execute("INSERT INTO rollup_suspend (flag) VALUES (1)")
+        conn.execute(f"DELETE FROM {table} WHERE {where}", params)
+        conn.execute("DELETE FROM rollup_suspend")
+        conn.executemany("""
+            INSERT INTO archive_files (path, domain, month, row_count, min_date, max_date)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, manifest)
+    invalidate(table)
+    invalidate("archive_files")
+    return {"rows": len(df), "files": len(manifest)}
+
+
+def merge(domain: str) -> int:
+    """Rewrite each month partition that has several files as one file."""
+    _require_pyarrow()
+    ensure_migrated()
+    by_month = {}
+    for path, month, *_ in _manifest(domain):
+        by_month.setdefault(month, []).append(path)
+    root = archive_root()
+    merged = 0
+    for month, paths in by_month.items():
+        if len(paths) < 2:
+            continue
+        df = pd.concat([pq.read_table(str(root / p)).to_pandas() for p in paths], ignore_index=True)
+        with connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")     # see compact(): no orphan sweep mid-write
+            row = _write_file(domain, month, df)
+            conn.executemany("DELETE FROM archive_files WHERE path = ?", [(p,) for p in paths])
+            conn.execute("""
+                INSERT INTO archive_files (path, domain, month, row_count, min_date, max_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, row)
+        for path in paths:
+            (root / path).unlink(missing_ok=True)
+        merged += 1
+    if merged:
+        invalidate("archive_files")
+    return merged
+
+
+def status() -> list:
+    """(domain, files, rows, first month, last month) per archived domain."""
+    ensure_migrated()
+    with connection() as conn:
+        return conn.execute("""
+            SELECT domain, COUNT(*), SUM(row_count), MIN(month), MAX(month)
+            FROM archive_files GROUP BY domain ORDER BY domain
+        """).fetchall()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the Parquet incident archive.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compact_cmd = commands.add_parser("compact", help="archive old finished incidents")
+    compact_cmd.add_argument("--domain", choices=sorted(INCIDENT_TABLES), nargs="+",
+                             default=sorted(INCIDENT_TABLES))
+    compact_cmd.add_argument("--older-than", type=int, default=ARCHIVE_AFTER_DAYS,
+                             help="age in days (default %(default)s)")
+    merge_cmd = commands.add_parser("merge", help="merge small files per month")
+    merge_cmd.add_argument("--domain", choices=sorted(INCIDENT_TABLES), nargs="+",
+                           default=sorted(INCIDENT_TABLES))
+    commands.add_parser("status", help="show what is archived")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        for name in args.domain:
+            result = compact(name, args.older_than)
+            print(f"✅ {name}: archived {result['rows']} incidents into {result['files']} files.")
+    elif args.command == "merge":
+        for name in args.domain:
+            print(f"✅ {name}: merged {merge(name)} month partitions.")
+    else:
+        rows = status()
+        if not rows:
+            print("Nothing archived yet.")
+        for name, files, count, first, last in rows:
+            print(f"{name:<8} {files:>5} files {count:>10} incidents  {first} .. {last}")
@@ -1,10 +1,10 @@
-import bcrypt
 from pathlib import Path
 
+import bcrypt
+
 # ---------- PATHS ----------
 
 DATA_DIR = Path("data1")          # your folder name in the project
-DATA_DIR.mkdir(exist_ok=True)     # make sure data1/ exists
 USERS_FILE = DATA_DIR / "users.txt"
 
 
@@ -26,27 +26,41 @@ def check_password(plain_password: str, stored_hash: str) -> bool:
 
 # ---------- USERS FILE HELPERS ----------
 
+# Parsed users.txt, reused while the file's (mtime, size) is unchanged
+_users_cache = {"stamp": None, "users": {}}
+
+
 def load_users():
     """
     Load users from users.txt.
     Format per line: username,hashed_password,role
     """
+    if not USERS_FILE.exists():
+        return {}
+    stat = USERS_FILE.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if _users_cache["stamp"] == stamp:
+        return dict(_users_cache["users"])
+
     users = {}
-    if USERS_FILE.exists():
-        with open(USERS_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                username, pwd_hash, role = line.split(",")
-                users[username] = (pwd_hash, role)
-    return users
+    with open(USERS_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            username, pwd_hash, role = line.split(",")
+            users[username] = (pwd_hash, role)
+    _users_cache["stamp"] = stamp
+    _users_cache["users"] = users
+    return dict(users)
 
 
 def save_user(username: str, pwd_hash: str, role: str):
     """Append a new user line into users.txt."""
+    DATA_DIR.mkdir(exist_ok=True)     # make sure data1/ exists
     with open(USERS_FILE, "a", encoding="utf-8") as f:
         f.write(f"{username},{pwd_hash},{role}\n")
+    _users_cache["stamp"] = None  # re-read on next load
 
 
 # ---------- REGISTER & LOGIN ----------
@@ -0,0 +1,174 @@
+"""
+Authentication service used by the Login page.
+
+- User records come from the `users` table through the shared versioned
+  cache (incident_cache), so a login does not hit SQLite unless the table
+  changed; registering a user invalidates it.
+- bcrypt runs in a bounded worker pool. `CW2_BCRYPT_WORKERS` caps how many
+  hashes run at once, so a burst of logins at shift change queues up
+  instead of saturating every core.
+- A login that waits more than VERIFY_TIMEOUT for a worker fails with
+  BUSY instead of raising, and its queued hash is dropped.
+- When BCRYPT_ROUNDS changes, a successful login transparently rehashes
+  the stored password with the new work factor.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db_pool import connection
+from incident_cache import invalidate, versioned
+from instrumentation import span
+
+BCRYPT_ROUNDS = int(os.environ.get("CW2_BCRYPT_ROUNDS", "12"))
+MAX_WORKERS = int(os.environ.get("CW2_BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+VERIFY_TIMEOUT = 30.0
+
+LOGIN_OK = "ok"
+UNKNOWN_USER = "unknown_user"
+BAD_PASSWORD = "bad_password"
+BUSY = "busy"
+
+
+@versioned("users")
+def load_user_records() -> dict:
+    """username -> (password_hash, role) for every user."""
+    with connection() as conn:
+        rows = conn.execute("SELECT username, password_hash, role FROM users").fetchall()
+    return {username: (pwd_hash, role) for username, pwd_hash, role in rows}
+
+
+def hash_cost(pwd_hash: str) -> int:
+    """Work factor encoded in a bcrypt hash ('$2b$12$...' -> 12)."""
+    return int(pwd_hash.split("$")[2])
+
+
+class AuthService:
+    """Verifies and registers users; safe to share across Streamlit sessions."""
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, max_workers: int = MAX_WORKERS):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.logins = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rehashes = 0
+        self.verify_seconds = 0.0
+
+    # ---------- bcrypt in the worker pool ----------
+
+    def _run(self, fn, *args, timeout=VERIFY_TIMEOUT):
+        future = self._executor.submit(fn, *args)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()     # still queued: do not hash for nobody
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def hash_password(self, password: str) -> str:
+        import bcrypt   # deferred: only needed once someone logs in
+
+        return self._run(
+            lambda: bcrypt.hashpw(password.encode("utf-8"),
+                                  bcrypt.gensalt(self.rounds)).decode("utf-8")
+        )
+
+    def check_password(self, password: str, pwd_hash: str) -> bool:
+        import bcrypt
+
+        started = time.perf_counter()
+        with span("auth.bcrypt_checkpw"):
+            ok = self._run(bcrypt.checkpw, password.encode("utf-8"), pwd_hash.encode("utf-8"))
+        with self._lock:
+            self.verify_seconds += time.perf_counter() - started
+        return ok
+
+    # ---------- public API ----------
+
+    def authenticate(self, username: str, password: str):
+        """
+        Return (LOGIN_OK, role), (UNKNOWN_USER, None), (BAD_PASSWORD, None)
+        or (BUSY, None) when the bcrypt pool did not get to it in time.
+        """
+        record = load_user_records().get(username)
+        if record is None:
+            return UNKNOWN_USER, None
+
+        pwd_hash, role = record
+        try:
+            ok = self.check_password(password, pwd_hash)
+        except TimeoutError:
+            return BUSY, None
+        if not ok:
+            with self._lock:
+                self.failures += 1
+            return BAD_PASSWORD, None
+
+        with self._lock:
+            self.logins += 1
+        if hash_cost(pwd_hash) != self.rounds:
+            try:
+                self._rehash(username, password)
+            except TimeoutError:
+                pass            # the login stands; rehashed on a later one
+        return LOGIN_OK, role
+
+    def _rehash(self, username: str, password: str):
+        new_hash = self.hash_password(password)
+        with connection() as conn:
+            conn.execute(
+                "UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username)
+            )
+        invalidate("users")
+        with self._lock:
+            self.rehashes += 1
+
+    def register(self, username: str, password: str, role: str) -> bool:
+        """Create a user; False if the username is taken."""
+        pwd_hash = self.hash_password(password)
+        with connection() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                (username, pwd_hash, role),
+            )
+            created = cur.rowcount == 1
+        invalidate("users")
+        return created
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "logins": self.logins,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "rehashes": self.rehashes,
+                "verify_seconds": self.verify_seconds,
+                "rounds": self.rounds,
+                "max_workers": self.max_workers,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> AuthService:
+    """Process-wide service shared by all sessions."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = AuthService()
+    return _service
+
+
+def authenticate(username: str, password: str):
+    return get_service().authenticate(username, password)
@@ -0,0 +1 @@
+"""Performance benchmarks. Run each one with `python -m benchmarks.<name>`."""
@@ -0,0 +1,65 @@
+"""
+Role policies (access.py) on a copy of the synthetic database.
+
+For every role and domain it may read, loads the incidents the way a
+dashboard session does: with the role's policy compiled into the query.
+Prints rows fetched, load time and the frame's memory next to the
+unrestricted load, and the query plan SQLite picks for the restricted one.
+
+    python -m benchmarks.bench_access --rows 1000000
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import SEED, build_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark role-scoped incident loads.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.data_dir, args.rows, SEED)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "incidents.db"
+        shutil.copyfile(dataset["db"], db_file)
+
+        import access
+        import db_pool
+        import incident_repo
+        from incident_cache import invalidate
+
+        db_pool.configure(db_file)
+        print(f"{args.rows} incidents per domain")
+        for domain in ("cyber", "it"):
+            print(f"{domain}:")
+            for role in access.ROLE_POLICIES:
+                policy = access.resolve(role)
+                if not policy.allows(domain):
+                    continue
+                filters = policy.restrict(domain)
+                best = float("inf")
+                for _ in range(args.repeat):
+                    invalidate()        # every load runs its query
+                    started = time.perf_counter()
+                    frame = incident_repo.load(domain, filters=filters)
+                    best = min(best, time.perf_counter() - started)
+                megabytes = frame.memory_usage(deep=True).sum() / 2 ** 20
+                where_sql, params = incident_repo.build_where(domain, filters)
+                with db_pool.connection() as conn:
+                    plan = conn.execute(
+                        f"EXPLAIN QUERY PLAN SELECT * FROM "
+                        f"{incident_repo.INCIDENT_TABLES[domain]['table']}{where_sql}", params,
+                    ).fetchone()[-1]
+                print(f"  {role:<15} {len(frame):>9,} rows {best * 1000:8.1f} ms "
+                      f"{megabytes:7.1f} MB  {plan}")
+        db_pool.get_pool().close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Spike detection (anomalies.py) on synthetic IT incidents.
+
+Streaming: incidents are fed to AnomalyModel.observe oldest first, and the
+cost per incident is timed over blocks of --probe incidents after histories
+of increasing length. O(1) per insert shows as a flat line. Recompute: the
+synthetic incidents are aggregated chunk by chunk into per-series daily
+counts (what the day rollup holds), then AnomalyModel.recompute rebuilds
+every series from them. Its time is checked against --budget, and the
+script exits non-zero when over it. The rebuilt model must agree with the
+streamed one.
+
+    python -m benchmarks.bench_anomalies --rows 10000000 --budget 2.0
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from anomalies import DIMENSIONS, AnomalyModel
+from benchmarks.synthetic import SEED, incident_chunks
+
+COLUMNS = {"severity": "severity", "type": "incident_type", "service": "service_name"}
+
+
+def _days(chunk: pd.DataFrame) -> np.ndarray:
+    stamps = pd.to_datetime(chunk["detected_at"], format="ISO8601").to_numpy("datetime64[D]")
+    return stamps.astype(np.int64) + 719163     # days since 1970 -> proleptic ordinal
+
+
+def chunk_counts(chunk: pd.DataFrame, days: np.ndarray) -> pd.DataFrame:
+    """Per-series daily counts of one chunk (dimension, value, day, count)."""
+    frames = []
+    for dimension in DIMENSIONS:
+        keys = {"day": days}
+        if dimension != "all":
+            keys["value"] = chunk[COLUMNS[dimension]].to_numpy()
+        counts = pd.DataFrame(keys).value_counts().rename("count").reset_index()
+        frames.append(counts.assign(dimension=dimension, value=counts.get("value", "")))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming and recomputed spike baselines.")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="incidents for the recompute")
+    parser.add_argument("--stream-rows", type=int, default=1_000_000,
+                        help="incidents streamed through observe()")
+    parser.add_argument("--probe", type=int, default=10_000, help="incidents per timed block")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds for the recompute")
+    args = parser.parse_args()
+
+    parts, stream, generated = [], [], 0
+    started = time.perf_counter()
+    for chunk in incident_chunks("it", args.rows, SEED):
+        days = _days(chunk)
+        parts.append(chunk_counts(chunk, days))
+        generated += len(chunk)
+        take = max(0, min(len(chunk), args.stream_rows - len(stream)))
+        stream += zip(days[:take].tolist(), chunk["severity"][:take].tolist(),
+                      chunk["incident_type"][:take].tolist(),
+                      chunk["service_name"][:take].tolist())
+    print(f"generated {generated:,} incidents in {time.perf_counter() - started:.1f} s")
+
+    print(f"streaming {len(stream):,} incidents, cost per incident after a history of")
+    streamed = AnomalyModel("it")
+    marks = {0, len(stream) - args.probe, *(10 ** k for k in range(3, 10))}
+    for first in range(0, len(stream), args.probe):
+        block = stream[first:first + args.probe]
+        clock = time.perf_counter()
+        for incident in block:
+            streamed.observe(*incident)
+        if first in marks:
+            per = (time.perf_counter() - clock) / len(block)
+            print(f"  {first:>10,}: {per * 1e6:6.2f} µs ({len(streamed.series)} series)")
+
+    counts = (pd.concat(parts, ignore_index=True)
+              .groupby(["dimension", "value", "day"], as_index=False)["count"].sum())
+    rebuilt = AnomalyModel("it")
+    best = float("inf")
+    for _ in range(3):
+        clock = time.perf_counter()
+        rebuilt.recompute(counts)
+        best = min(best, time.perf_counter() - clock)
+    span_days = counts["day"].max() - counts["day"].min() + 1
+    print(f"recompute over {generated:,} incidents ({len(counts):,} daily cells, "
+          f"{len(rebuilt.series)} series x {span_days} days): {best * 1000:.1f} ms "
+          f"(budget {args.budget:.1f} s)")
+
+    if args.stream_rows >= generated:
+        a, b = streamed.alerts(days=10_000), rebuilt.alerts(days=10_000)
+        same = ["dimension", "value", "day", "count", "in_progress"]
+        if not a[same].equals(b[same]):
+            raise SystemExit("streamed and recomputed spikes differ")
+        print(f"  streamed and recomputed models agree ({len(a)} spikes)")
+    if best > args.budget:
+        print(f"OVER BUDGET: recompute {best:.2f} s > {args.budget:.1f} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
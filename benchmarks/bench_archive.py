@@ -0,0 +1,97 @@
+"""
+Scan times with everything in SQLite vs. a small hot table plus the Parquet
+archive (archive.py).
+
+Copies the synthetic database for --rows, times full and one-month IT scans,
+compacts finished incidents older than --older-than days (relative to the
+end of the synthetic data) and times the same scans over hot + archive.
+
+    python -m benchmarks.bench_archive --rows 1000000
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+import archive
+import db_pool
+import incident_repo
+from benchmarks.synthetic import SEED, build_dataset
+from incident_repo import IncidentFilter
+
+ALL = IncidentFilter()
+MONTH = IncidentFilter(start_date=date(2024, 6, 1), end_date=date(2024, 6, 30))
+END_OF_DATA = datetime(2025, 12, 31, 23, 59, 59)
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _hot(filters):
+    columns = tuple(incident_repo.INCIDENT_TABLES["it"]["fields"])
+    return lambda: incident_repo._load.uncached("it", columns, filters)
+
+
+def _tiered(filters):
+    columns = tuple(incident_repo.INCIDENT_TABLES["it"]["fields"])
+
+    def run():
+        incident_repo._load.uncached("it", columns, filters)
+        archive.scan.uncached("it", columns, filters)
+    return run
+
+
+def _size_mb(path: Path) -> float:
+    files = [path] if path.is_file() else path.rglob("*.parquet")
+    return sum(f.stat().st_size for f in files) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Parquet archive tier.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--older-than", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.data_dir, args.rows, SEED)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "incidents.db"
+        shutil.copyfile(dataset["db"], db_file)
+        db_pool.configure(db_file)
+
+        rows = [("sqlite full scan", _best(_hot(ALL), args.repeat)),
+                ("sqlite one-month scan", _best(_hot(MONTH), args.repeat))]
+        before_mb = _size_mb(db_file)
+
+        started = time.perf_counter()
+        result = archive.compact("it", args.older_than, now=END_OF_DATA)
+        rows.append(("compact", time.perf_counter() - started))
+        with db_pool.connection() as conn:
+            conn.execute("VACUUM")
+
+        rows += [("hot+archive full scan", _best(_tiered(ALL), args.repeat)),
+                 ("hot+archive one-month scan", _best(_tiered(MONTH), args.repeat)),
+                 ("hot only full scan", _best(_hot(ALL), args.repeat))]
+
+        print(f"{args.rows} rows per domain; archived {result['rows']} IT incidents "
+              f"into {result['files']} files")
+        print(f"one-month query reads {len(archive._files_for('it', MONTH))} of "
+              f"{result['files']} files")
+        print(f"database {before_mb:.1f} MB -> {_size_mb(db_file):.1f} MB, "
+              f"archive {_size_mb(archive.archive_root() / 'it'):.1f} MB")
+        for name, seconds in rows:
+            print(f"  {name:<28} {seconds * 1000:10.1f} ms")
+        db_pool.get_pool().close()
+
+
+if __name__ == "__main__":
+    main()
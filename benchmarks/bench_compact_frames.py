@@ -0,0 +1,111 @@
+"""
+Memory and filter speed of incident frames: object-dtype strings (the old
+loaders), Arrow-backed strings and the repository's shared categoricals
+with code-based masks (incident_repo.filter_mask).
+
+    python -m benchmarks.bench_compact_frames --sizes 1000000 10000000
+"""
+import argparse
+import gc
+import time
+
+import numpy as np
+import pandas as pd
+
+import incident_repo
+from incident_repo import SEVERITIES, STATUSES, IncidentFilter
+
+SERVICES = [f"service-{i:03d}" for i in range(200)]
+TYPES = ["outage", "latency", "degraded", "error-rate", "capacity", "config"]
+FILTERS = IncidentFilter(
+    severities=("high", "critical"),
+    statuses=("open", "investigating"),
+    services=tuple(SERVICES[:40]),
+    types=("outage", "latency"),
+)
+TEXT_COLUMNS = ["service_name", "incident_type", "severity", "status"]
+
+
+def _synthetic(rows: int, seed: int = 7) -> dict:
+    """Codes per column; severity skewed towards low/medium."""
+    rnd = np.random.default_rng(seed)
+    return {
+        "service_name": (SERVICES, rnd.zipf(1.3, rows) % len(SERVICES)),
+        "incident_type": (TYPES, rnd.integers(0, len(TYPES), rows)),
+        "severity": (SEVERITIES, rnd.choice(4, rows, p=[0.5, 0.3, 0.15, 0.05])),
+        "status": (STATUSES, rnd.integers(0, len(STATUSES), rows)),
+    }
+
+
+def _frame(columns: dict, representation: str) -> pd.DataFrame:
+    data = {}
+    for name, (values, codes) in columns.items():
+        if representation == "categorical":
+            dtype = incident_repo.category_dtype(
+                "it", "type" if name == "incident_type" else name, values
+            )
+            # categories in the shared dtype may be ordered differently
+            data[name] = pd.Categorical.from_codes(
+                dtype.categories.get_indexer(values)[codes], dtype=dtype
+            )
+        else:
+            dtype = object if representation == "object" else "string[pyarrow]"
+            data[name] = pd.Series(np.asarray(values, dtype=object)[codes], dtype=dtype)
+    rows = len(next(iter(columns.values()))[1])
+    data["detected_at"] = pd.Timestamp("2024-01-01") + pd.to_timedelta(
+        np.arange(rows) % (365 * 24 * 3600), unit="s"
+    )
+    return pd.DataFrame(data)
+
+
+def _isin_mask(df: pd.DataFrame) -> np.ndarray:
+    return (
+        df["severity"].isin(FILTERS.severities)
+        & df["status"].isin(FILTERS.statuses)
+        & df["service_name"].isin(FILTERS.services)
+        & df["incident_type"].isin(FILTERS.types)
+    ).to_numpy()
+
+
+def _timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(rows: int, repeat: int) -> list:
+    columns = _synthetic(rows)
+    results, expected = [], None
+    for representation in ("object", "arrow", "categorical"):
+        df = _frame(columns, representation)
+        memory = df[TEXT_COLUMNS].memory_usage(deep=True).sum()
+        seconds, mask = _timed(lambda: _isin_mask(df), repeat)
+        row = {"rows": rows, "representation": representation,
+               "text_mb": memory / 1e6, "isin_ms": seconds * 1000}
+        if representation == "categorical":
+            seconds, codes = _timed(lambda: incident_repo.filter_mask("it", df, FILTERS), repeat)
+            assert np.array_equal(codes, mask)
+            row["codes_ms"] = seconds * 1000
+        expected = mask if expected is None else expected
+        assert np.array_equal(mask, expected)
+        results.append(row)
+        del df
+        gc.collect()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}  {'representation':<12} {'text MB':>9} {'isin ms':>9} {'codes ms':>9}")
+    for rows in args.sizes:
+        for r in run(rows, args.repeat):
+            codes = f"{r['codes_ms']:9.1f}" if "codes_ms" in r else f"{'-':>9}"
+            print(f"{r['rows']:>10}  {r['representation']:<12} {r['text_mb']:9.1f} "
+                  f"{r['isin_ms']:9.1f} {codes}")
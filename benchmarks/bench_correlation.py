@@ -0,0 +1,89 @@
+"""
+Cross-domain correlation (correlation.py) on synthetic cyber and IT frames.
+
+The frames come straight from the generator (no database), typed like
+incident_repo.load returns them, so only the matching is timed: all types
+and ransomware -> outage, for several windows. On a small sample the sweep
+is checked against, and timed next to, a pandas cross join.
+
+    python -m benchmarks.bench_correlation --rows 1000000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+import correlation
+from benchmarks.synthetic import SEED, incident_chunks
+from incident_repo import category_dtype
+
+TIMES = {"cyber": "reported_at", "it": "detected_at"}
+
+
+def build_frame(domain: str, rows: int, seed: int = SEED) -> pd.DataFrame:
+    df = pd.concat(incident_chunks(domain, rows, seed), ignore_index=True)
+    df = df[["incident_id", *(["service_name"] if domain == "it" else []),
+             "incident_type", "severity", TIMES[domain]]]
+    for column in ("service_name", "incident_type", "severity"):
+        if column in df:
+            stored = "type" if column == "incident_type" else column
+            df[column] = df[column].astype(category_dtype(domain, stored, df[column]))
+    df[TIMES[domain]] = pd.to_datetime(df[TIMES[domain]], format="ISO8601").astype("datetime64[us]")
+    return df
+
+
+def _best(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def cross_join_links(cyber: pd.DataFrame, it: pd.DataFrame, window_minutes: int) -> int:
+    """Linked IT incidents the naive way: every pair, then a time filter."""
+    pairs = it[["incident_id", "detected_at"]].merge(cyber[["reported_at"]], how="cross")
+    lag = pairs["detected_at"] - pairs["reported_at"]
+    hit = (lag >= pd.Timedelta(0)) & (lag <= pd.Timedelta(minutes=window_minutes))
+    return pairs.loc[hit, "incident_id"].nunique()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cyber -> IT correlation.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="incidents per domain")
+    parser.add_argument("--windows", type=int, nargs="+", default=[15, 60, 1440])
+    parser.add_argument("--cross-join-rows", type=int, default=3_000,
+                        help="sample size for the cross-join comparison")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cyber, it = build_frame("cyber", args.rows), build_frame("it", args.rows)
+    subsets = {
+        "all types": (cyber, it),
+        "ransomware -> outage": (cyber[cyber["incident_type"] == "ransomware"],
+                                 it[it["incident_type"] == "outage"]),
+    }
+    print(f"{args.rows} incidents per domain")
+    for name, (causes, effects) in subsets.items():
+        for window in args.windows:
+            seconds, result = _best(lambda: correlation.correlate(causes, effects, window),
+                                    args.repeat)
+            print(f"  {name:<22} {window:>5} min {seconds * 1000:8.1f} ms  "
+                  f"{result.summary['linked_it']:>9} linked  "
+                  f"({len(causes) + len(effects):,} incidents)")
+
+    n = args.cross_join_rows
+    sample_cyber, sample_it = cyber.iloc[::len(cyber) // n][:n], it.iloc[::len(it) // n][:n]
+    window = args.windows[0]
+    sweep_s, result = _best(lambda: correlation.correlate(sample_cyber, sample_it, window),
+                            args.repeat)
+    join_s, expected = _best(lambda: cross_join_links(sample_cyber, sample_it, window), 1)
+    if result.summary["linked_it"] != expected:
+        raise SystemExit(f"sweep found {result.summary['linked_it']} links, cross join {expected}")
+    print(f"  {n} x {n} sample, {window} min: sweep {sweep_s * 1000:.1f} ms, "
+          f"cross join {join_s * 1000:.1f} ms ({n * n:,} pairs), same {expected} links")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Dashboard rerun latency vs table size: SELECT * + pandas filtering (the old
+`show()` path) against the SQL push-down queries in db_helper.
+
+    python -m benchmarks.bench_dashboard_query --sizes 10000 100000 500000
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+import db_pool
+from migrations import migrate
+from db_helper import (
+    IncidentFilter,
+    get_daily_counts,
+    get_incident_metrics,
+    get_incidents_page,
+    get_severity_counts,
+)
+
+SEVERITIES = ["low", "medium", "high", "critical"]
+STATUSES = ["open", "investigating", "resolved"]
+TYPES = ["phishing", "malware", "ransomware", "ddos", "insider"]
+START = date(2023, 1, 1)
+
+
+def _build(db_file: Path, rows: int):
+    rnd = random.Random(42)
+    db_pool.configure(db_file)
+    migrate()
+    conn = sqlite3.connect(db_file)
+    conn.executemany(
+        "INSERT INTO cyber_incidents VALUES(NULL, 'cybersecurity', ?, ?, ?, ?)",
+        (
+            (rnd.choice(TYPES), rnd.choice(SEVERITIES), rnd.choice(STATUSES),
+             f"{START + timedelta(days=rnd.randrange(730))} 00:00:00")
+            for _ in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _old_rerun(filters: IncidentFilter):
+    with db_pool.connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM cyber_incidents", conn)
+    df = df.rename(columns={"type": "incident_type"})
+    df["reported_at"] = pd.to_datetime(df["reported_at"], errors="coerce")
+    filtered = df[
+        df["severity"].isin(filters.severities)
+        & df["status"].isin(filters.statuses)
+        & df["incident_type"].isin(filters.types)
+        & (df["reported_at"].dt.date >= filters.start_date)
+        & (df["reported_at"].dt.date <= filters.end_date)
+    ]
+    len(filtered)
+    filtered["status"].isin(["open", "investigating"]).sum()
+    filtered["severity"].isin(["high", "critical"]).sum()
+    filtered["severity"].value_counts()
+    filtered.groupby(filtered["reported_at"].dt.date).size()
+
+
+def _pushdown_rerun(filters: IncidentFilter):
+    get_incident_metrics.uncached("cyber", filters)
+    get_severity_counts.uncached("cyber", filters)
+    get_daily_counts.uncached("cyber", filters)
+    get_incidents_page.uncached("cyber", filters, page_size=100)
+
+
+def _cached_rerun(filters: IncidentFilter):
+    """Unchanged data: every query is served from incident_cache."""
+    get_incident_metrics("cyber", filters)
+    get_severity_counts("cyber", filters)
+    get_daily_counts("cyber", filters)
+    get_incidents_page("cyber", filters, page_size=100)
+
+
+def _best_of(fn, filters, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(filters)
+        timings.append(time.perf_counter() - t0)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    filters = IncidentFilter(
+        severities=("high", "critical"),
+        statuses=("open", "investigating"),
+        types=tuple(TYPES[:3]),
+        start_date=START + timedelta(days=300),
+        end_date=START + timedelta(days=400),
+    )
+
+    print(f"{'rows':>10}{'select * (ms)':>16}{'push-down (ms)':>16}{'speed-up':>10}"
+          f"{'cached (ms)':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            db_file = Path(tmp) / f"bench_{rows}.db"
+            _build(db_file, rows)
+            old = _best_of(_old_rerun, filters, args.repeat)
+            new = _best_of(_pushdown_rerun, filters, args.repeat)
+            cached = _best_of(_cached_rerun, filters, args.repeat)
+            print(f"{rows:>10}{old * 1000:>16.1f}{new * 1000:>16.1f}{old / new:>9.1f}x"
+                  f"{cached * 1000:>14.2f}")
+        db_pool.get_pool().close()
+
+
+if __name__ == "__main__":
+    main()
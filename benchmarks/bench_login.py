@@ -0,0 +1,96 @@
+"""
+Login load benchmark: logins/sec and latency percentiles at several bcrypt
+work factors, with many analysts logging in at once.
+
+"before" is the old Login page path (query the users table, then
+bcrypt.checkpw on the calling thread); "service" is auth_service with its
+cached user lookup and bounded bcrypt pool.
+
+    python -m benchmarks.bench_login --costs 4 8 10 12 --clients 16 --logins 64
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import bcrypt
+
+import db_pool
+from auth_service import LOGIN_OK, AuthService
+from migrations import migrate
+
+PASSWORD = "correct horse battery staple"
+
+
+def _before(username, password):
+    with db_pool.connection() as conn:
+        stored_hash, role = conn.execute(
+            "SELECT password_hash, role FROM users WHERE username = ?", (username,)
+        ).fetchone()
+    return bcrypt.checkpw(password.encode(), stored_hash.encode())
+
+
+def _drive(login, clients: int, logins: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+    per_client = max(1, logins // clients)
+
+    def client(n):
+        for i in range(per_client):
+            started = time.perf_counter()
+            assert login(f"user{(n + i) % 8}", PASSWORD)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "logins_per_sec": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--costs", type=int, nargs="+", default=[4, 8, 10, 12])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="bcrypt pool size (default: auth_service.MAX_WORKERS)")
+    args = parser.parse_args()
+
+    print(f"clients={args.clients} logins={args.logins}")
+    print(f"{'cost':>4} {'path':>8}{'logins/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for cost in args.costs:
+            db_pool.configure(Path(tmp) / f"login_{cost}.db")
+            migrate()
+            service = AuthService(rounds=cost, **({"max_workers": args.workers} if args.workers else {}))
+            for n in range(8):
+                service.register(f"user{n}", PASSWORD, "analyst")
+
+            results = {
+                "before": _drive(_before, args.clients, args.logins),
+                "service": _drive(
+                    lambda u, p: service.authenticate(u, p)[0] == LOGIN_OK,
+                    args.clients, args.logins,
+                ),
+            }
+            service.close()
+            for path, r in results.items():
+                print(f"{cost:>4} {path:>8}{r['logins_per_sec']:>10.1f}"
+                      f"{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+        db_pool.get_pool().close()
+
+
+if __name__ == "__main__":
+    main()
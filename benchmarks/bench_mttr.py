@@ -0,0 +1,64 @@
+"""
+MTTR / SLA computations (mttr.py) on a synthetic IT frame.
+
+The frame is built straight from the generator (no database), typed like
+incident_repo.load returns it, so only the computation is timed.
+
+    python -m benchmarks.bench_mttr --rows 1000000
+"""
+import argparse
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import mttr
+from benchmarks.synthetic import SEED, incident_chunks
+from incident_repo import category_dtype
+
+START = "detected_at"
+
+
+def build_frame(rows: int, seed: int = SEED) -> pd.DataFrame:
+    df = pd.concat(incident_chunks("it", rows, seed), ignore_index=True)
+    for column in ("service_name", "severity", "status"):
+        df[column] = df[column].astype(category_dtype("it", column, df[column]))
+    for column in (START, "resolved_at"):
+        df[column] = pd.to_datetime(df[column].replace("", None),
+                                    format="ISO8601").astype("datetime64[us]")
+    return df
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MTTR / SLA analytics.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = build_frame(args.rows)
+    as_of = datetime(2026, 1, 1)
+    cases = [
+        ("resolution_table service x severity",
+         lambda: mttr.resolution_table(df, START, ("service_name", "severity"))),
+        ("resolution_table severity", lambda: mttr.resolution_table(df, START, ("severity",))),
+        ("sla_summary", lambda: mttr.sla_summary(df, START, as_of)),
+        ("open_counts daily", lambda: mttr.open_counts(df, START, "D")),
+        ("open_counts hourly", lambda: mttr.open_counts(df, START, "h")),
+    ]
+    print(f"{args.rows} IT incidents")
+    for name, fn in cases:
+        seconds = _best(fn, args.repeat)
+        print(f"  {name:<38} {seconds * 1000:8.1f} ms  ({args.rows / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Concurrency benchmark: per-call sqlite3.connect vs the shared connection pool.
+
+Each worker thread runs a mix of dashboard-style reads (SELECT * on
+cyber_incidents) and single-row inserts against a throwaway database.
+
+    python -m benchmarks.bench_pool --threads 8 --seconds 3
+"""
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from db_pool import ConnectionPool
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cyber_incidents(
+        incident_id INTEGER PRIMARY KEY,
+        domain TEXT,
+        type TEXT,
+        severity TEXT,
+        status TEXT,
+        reported_at TEXT
+    );
+"""
+INSERT = (
+    "INSERT INTO cyber_incidents VALUES(NULL, 'cybersecurity', 'phishing', "
+    "'high', 'open', '2025-11-20')"
+)
+SELECT = "SELECT * FROM cyber_incidents ORDER BY incident_id DESC LIMIT 200"
+
+
+def _seed(db_file: Path, rows: int):
+    conn = sqlite3.connect(db_file)
+    conn.execute(SCHEMA)
+    for _ in range(rows):
+        conn.execute(INSERT)
+    conn.commit()
+    conn.close()
+
+
+def _per_call(db_file):
+    """The old pattern: connect, run, commit, close on every call."""
+    def run(sql):
+        conn = sqlite3.connect(db_file, timeout=10)
+        conn.execute(sql).fetchall()
+        conn.commit()
+        conn.close()
+    return run
+
+
+def _pooled(pool):
+    def run(sql):
+        with pool.connection() as conn:
+            conn.execute(sql).fetchall()
+    return run
+
+
+def _drive(run, threads: int, seconds: float, write_every: int) -> dict:
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def worker():
+        reads = writes = errors = 0
+        i = 0
+        while time.monotonic() < stop:
+            i += 1
+            is_write = i % write_every == 0
+            try:
+                run(INSERT if is_write else SELECT)
+                if is_write:
+                    writes += 1
+                else:
+                    reads += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        with lock:
+            counts["reads"] += reads
+            counts["writes"] += writes
+            counts["errors"] += errors
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return {k: v / seconds if k != "errors" else v for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--write-every", type=int, default=10,
+                        help="one insert per N operations")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_db = Path(tmp) / "before.db"
+        after_db = Path(tmp) / "after.db"
+        _seed(before_db, args.rows)
+        _seed(after_db, args.rows)
+
+        before = _drive(_per_call(before_db), args.threads, args.seconds, args.write_every)
+
+        pool = ConnectionPool(after_db, max_size=args.threads)
+        after = _drive(_pooled(pool), args.threads, args.seconds, args.write_every)
+        pool.close()
+
+    print(f"threads={args.threads} rows={args.rows} write_every={args.write_every}")
+    print(f"{'':12}{'reads/s':>12}{'writes/s':>12}{'errors':>8}")
+    for label, r in (("per-call", before), ("pooled", after)):
+        print(f"{label:12}{r['reads']:>12.0f}{r['writes']:>12.0f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
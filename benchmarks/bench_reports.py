@@ -0,0 +1,121 @@
+"""
+Saved report views (reports.py) on a copy of the synthetic database.
+
+Snapshots: a full refresh of a saved view and an incremental one after
+--new-rows inserts, next to computing the dashboard view from scratch and
+to serving the stored snapshot (what a dashboard does when the view is
+picked). Exports: every IT incident to CSV, Parquet and HTML in a fresh
+process each, streamed in chunks. Their peak RSS is compared with loading
+the whole result as one DataFrame and writing it out.
+
+    python -m benchmarks.bench_reports --rows 1000000
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import SEED, build_dataset, incident_chunks
+
+ROOT = Path(__file__).resolve().parent.parent
+
+EXPORT = """
+import json, sys, time
+import db_pool, ingest, reports
+db_pool.configure(sys.argv[1])
+view = reports.get_view("all-it")
+snapshot, _ = reports.refresh_snapshot(view)
+before = ingest.peak_rss_mb()
+started = time.perf_counter()
+if sys.argv[2] == "whole":
+    import pandas as pd
+    from db_pool import connection
+    with connection() as conn:
+        frame = pd.read_sql_query("SELECT * FROM it_incidents", conn)
+    frame.to_csv(sys.argv[3] + "/whole.csv", index=False)
+    rows = len(frame)
+else:
+    rows, _ = reports.export(snapshot, [sys.argv[2]], sys.argv[3])
+print(json.dumps({"rows": rows, "seconds": time.perf_counter() - started,
+                  "before": before, "peak": ingest.peak_rss_mb()}))
+"""
+
+
+def _best(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark saved-view snapshots and exports.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--new-rows", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.data_dir, args.rows, SEED)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "incidents.db"
+        shutil.copyfile(dataset["db"], db_file)
+
+        import analytics
+        import db_pool
+        import incident_repo
+        import reports
+        from incident_cache import invalidate
+        from incident_repo import IncidentFilter
+
+        db_pool.configure(db_file)
+        view = reports.SavedView("high-it", "it", IncidentFilter(severities=("high", "critical")))
+        reports.save_view(view)
+        reports.save_view(reports.SavedView("all-it", "it", IncidentFilter(),
+                                            formats=("csv", "parquet", "html")))
+
+        print(f"{args.rows} IT incidents, saved view: high and critical")
+        def computed():
+            invalidate()        # every query runs, as after a write
+            return analytics.dashboard_view("it", view.filters)
+
+        live_s, _ = _best(computed, args.repeat)
+        full_s, _ = _best(lambda: reports.refresh_snapshot(view, incremental=False), args.repeat)
+
+        new = next(incident_chunks("it", args.new_rows, SEED + 1))
+        new = new.drop(columns="incident_id").rename(columns={"incident_type": "type"})
+        incident_repo.insert_many("it", ({k: v or None for k, v in row.items()}
+                                         for row in new.to_dict("records")))
+        started = time.perf_counter()
+        snapshot, mode = reports.refresh_snapshot(view)
+        incremental_s = time.perf_counter() - started
+        serve_s, _ = _best(lambda: reports.snapshot_view(reports.get_snapshot(view.name)),
+                           args.repeat)
+        for label, seconds in (("dashboard view, computed", live_s),
+                               ("snapshot, full refresh", full_s),
+                               (f"snapshot, {mode} (+{args.new_rows} rows)", incremental_s),
+                               ("dashboard view from snapshot", serve_s)):
+            print(f"  {label:<36} {seconds * 1000:9.1f} ms")
+        db_pool.get_pool().close()
+
+        print("exports of every IT incident (fresh process each)")
+        for fmt in ("whole", *reports.EXPORT_FORMATS):
+            out = Path(tmp) / fmt
+            out.mkdir()
+            run = subprocess.run([sys.executable, "-c", EXPORT, str(db_file), fmt, str(out)],
+                                 cwd=ROOT, capture_output=True, text=True, check=True)
+            result = json.loads(run.stdout.strip().splitlines()[-1])
+            size = sum(f.stat().st_size for f in out.rglob("*") if f.is_file()) / 2 ** 20
+            label = "one DataFrame -> CSV" if fmt == "whole" else f"streamed {fmt}"
+            print(f"  {label:<22} {result['rows']:>9,} rows {result['seconds']:7.2f} s  "
+                  f"{size:7.1f} MB  peak RSS +{result['peak'] - result['before']:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
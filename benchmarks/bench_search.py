@@ -0,0 +1,72 @@
+"""
+Full-text search latency (search_index.py) on a copy of the synthetic
+database: building the index, then prefix, multi-word, fuzzy, filtered and
+deep-page queries, each timed uncached.
+
+    python -m benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import db_pool
+import search_index
+from benchmarks.synthetic import SEED, build_dataset
+from incident_repo import IncidentFilter
+from migrations import rebuild_search
+
+QUERIES = [
+    ("prefix, common", "it", "api", IncidentFilter(), 0),
+    ("prefix, short", "it", "pa", IncidentFilter(), 0),
+    ("two words", "it", "ledger stream", IncidentFilter(), 0),
+    ("fuzzy", "it", "paymnts", IncidentFilter(), 0),
+    ("with filters", "it", "checkout",
+     IncidentFilter(severities=("critical",), statuses=("open", "investigating")), 0),
+    ("page 40", "it", "api", IncidentFilter(), 40),
+    ("cyber fuzzy", "cyber", "ransomwre", IncidentFilter(), 0),
+]
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incident search.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.data_dir, args.rows, SEED)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "incidents.db"
+        shutil.copyfile(dataset["db"], db_file)
+        db_pool.configure(db_file)
+        search_index.search("it", "warm-up")       # migrates (builds the index) if needed
+
+        started = time.perf_counter()
+        with db_pool.connection() as conn:
+            rebuild_search(conn, "it_incidents")
+        print(f"{args.rows} rows per domain; IT index rebuilt in "
+              f"{time.perf_counter() - started:.2f} s")
+
+        for name, domain, text, filters, page in QUERIES:
+            result = search_index._search.uncached(domain, text, filters, page,
+                                                   search_index.PAGE_SIZE)
+            seconds = _best(lambda: search_index._search.uncached(
+                domain, text, filters, page, search_index.PAGE_SIZE), args.repeat)
+            print(f"  {name:<16} {text!r:<18} {result.total:>9} hits "
+                  f"{seconds * 1000:8.1f} ms")
+        db_pool.get_pool().close()
+
+
+if __name__ == "__main__":
+    main()
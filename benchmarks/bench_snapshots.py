@@ -0,0 +1,94 @@
+"""
+Memory and load time of N worker processes holding the IT incident frame,
+each loading its own copy from SQLite ("private") or mapping the shared
+Arrow snapshot (snapshots.py, "shared"), on a copy of the synthetic
+database.
+
+Workers load the whole table, touch every column and then wait, so that
+all of them are alive when their memory is read. USS counts the pages only
+that process holds; PSS splits shared pages between the processes mapping
+them.
+
+    python -m benchmarks.bench_snapshots --rows 1000000 --workers 4
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import psutil
+
+from benchmarks.synthetic import SEED, build_dataset
+
+ROOT = Path(__file__).resolve().parent.parent
+MB = 2 ** 20
+
+WORKER = """
+import json, sys, time
+import db_pool, incident_repo, snapshots
+db_pool.configure(sys.argv[1])
+snapshots.ENABLED = sys.argv[2] == "shared"
+started = time.perf_counter()
+frame = incident_repo.load("it", include_archive=False)
+seconds = time.perf_counter() - started
+for column in frame.columns:        # fault every page in
+    values = frame[column]
+    (values.cat.codes if values.dtype == "category" else values).to_numpy().view("uint8").sum()
+print(json.dumps({"rows": len(frame), "seconds": seconds}), flush=True)
+sys.stdin.read()
+"""
+
+
+def run_workers(db_file: Path, mode: str, workers: int) -> list:
+    procs = [subprocess.Popen([sys.executable, "-c", WORKER, str(db_file), mode], cwd=ROOT,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+             for _ in range(workers)]
+    results = []
+    try:
+        for proc in procs:
+            result = json.loads(proc.stdout.readline())
+            results.append(result)
+        for proc, result in zip(procs, results):
+            info = psutil.Process(proc.pid).memory_full_info()
+            result.update(uss=info.uss / MB, pss=info.pss / MB)
+    finally:
+        for proc in procs:
+            proc.communicate("")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared incident snapshots.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.data_dir, args.rows, SEED)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "incidents.db"
+        shutil.copyfile(dataset["db"], db_file)
+
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import sys, db_pool, snapshots; "
+                        "db_pool.configure(sys.argv[1]); snapshots.write_snapshot('it')",
+                        str(db_file)], cwd=ROOT, check=True)
+        snapshot = next((Path(tmp) / "snapshots").glob("*.arrow"))
+        print(f"{args.rows} IT incidents; snapshot {snapshot.stat().st_size / MB:.1f} MB "
+              f"written in {time.perf_counter() - started:.2f} s (incl. interpreter start)")
+
+        for mode in ("private", "shared"):
+            results = run_workers(db_file, mode, args.workers)
+            load = max(r["seconds"] for r in results)
+            uss = sum(r["uss"] for r in results)
+            pss = sum(r["pss"] for r in results)
+            print(f"  {mode:<8} {args.workers} workers: load {load * 1000:8.1f} ms (slowest), "
+                  f"USS {uss:7.1f} MB, PSS {pss:7.1f} MB in total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Import-time and cold-start budget for the Streamlit app.
+
+Each measurement runs in a fresh interpreter:
+
+- `python -X importtime -c "import app"`: time to import app.py, split
+  into Streamlit itself and everything else, plus a check that the heavy
+  modules (pandas, numpy, bcrypt, pyarrow) are not imported before a page
+  needs them;
+- importing each routed page (views.load_page) on its own;
+- cold start: the first run of the login page through Streamlit's AppTest.
+
+Exits non-zero when the median of --repeat runs is over budget, so it can
+gate changes like the other benchmarks.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --app-budget-ms 30 --repeat 7
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("pandas", "numpy", "bcrypt", "pyarrow")
+
+COLD_START = """
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60)
+at.run()
+assert not at.exception, at.exception
+"""
+
+
+def _python(code: str, *flags) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+
+
+def import_times(module: str = "app") -> dict:
+    """Cumulative import time (ms) of every module loaded by `import module`."""
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    run = _python(code, "-X", "importtime")
+    times = {}
+    for line in run.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1000
+    loaded = json.loads(run.stdout.strip().splitlines()[-1])
+    return {"times": times, "heavy": [m for m in HEAVY_MODULES if m in loaded]}
+
+
+def page_import_ms(label: str) -> float:
+    code = ("import time; started = time.perf_counter(); import views; "
+            f"views.load_page({label!r}); print((time.perf_counter() - started) * 1000)")
+    return float(_python(code).stdout.strip().splitlines()[-1])
+
+
+def cold_start_seconds() -> float:
+    started = time.perf_counter()
+    _python(COLD_START)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the app's import-time budget.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--app-budget-ms", type=float, default=50.0,
+                        help="import of app.py excluding Streamlit itself")
+    parser.add_argument("--login-budget-ms", type=float, default=500.0,
+                        help="importing the login page in a fresh interpreter")
+    parser.add_argument("--cold-start-budget", type=float, default=3.0,
+                        help="seconds for the first login page run")
+    parser.add_argument("--skip-cold-start", action="store_true")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    from views import PAGES
+
+    runs = [import_times() for _ in range(args.repeat)]
+    app_ms = statistics.median(r["times"].get("app", 0.0) for r in runs)
+    streamlit_ms = statistics.median(r["times"].get("streamlit", 0.0) for r in runs)
+    own_ms = app_ms - streamlit_ms
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+
+    failures = []
+    print(f"import app            {app_ms:8.1f} ms (streamlit {streamlit_ms:.1f} ms, "
+          f"own {own_ms:.1f} ms, budget {args.app_budget_ms:.0f} ms)")
+    if own_ms > args.app_budget_ms:
+        failures.append(f"app import {own_ms:.1f} ms > {args.app_budget_ms:.0f} ms")
+    if heavy:
+        print(f"  heavy modules imported at start-up: {', '.join(heavy)}")
+        failures.append(f"heavy modules at start-up: {', '.join(heavy)}")
+
+    for label in PAGES:
+        ms = statistics.median(page_import_ms(label) for _ in range(args.repeat))
+        print(f"page {label:<24} {ms:8.1f} ms")
+        if label == "Login" and ms > args.login_budget_ms:
+            failures.append(f"login page import {ms:.1f} ms > {args.login_budget_ms:.0f} ms")
+
+    if not args.skip_cold_start:
+        seconds = statistics.median(cold_start_seconds() for _ in range(min(args.repeat, 3)))
+        print(f"cold start (login)    {seconds:8.2f} s (budget {args.cold_start_budget:.1f} s)")
+        if seconds > args.cold_start_budget:
+            failures.append(f"cold start {seconds:.2f} s > {args.cold_start_budget:.1f} s")
+
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+End-to-end performance suite over synthetic data (benchmarks/synthetic.py).
+
+For each size it builds (or reuses) a database and CSVs, then times the
+load, filter, aggregate, insert and login paths and writes the results as
+JSON. Passing a previous result file with --baseline flags cases that got
+slower than --tolerance and exits non-zero, so runs can be compared across
+commits.
+
+    python -m benchmarks.bench_suite --sizes 10000 1000000 --out bench.json
+    python -m benchmarks.bench_suite --sizes 10000 --baseline bench.json
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timezone
+
+import pandas as pd
+
+import db_pool
+import incident_repo
+from analytics import TableRequest, _compute_view
+from auth_service import LOGIN_OK, AuthService
+from benchmarks.synthetic import SERVICES, SEED, build_dataset
+from db_helper import count_incidents, get_incident_metrics, get_incidents_page
+from incident_delta import IncidentMirror
+from incident_repo import IncidentFilter
+from ingest import ingest_csv
+from rollups import get_rollup_severity_counts, get_rollup_time_series
+
+FILTERS = IncidentFilter(
+    severities=("high", "critical"),
+    statuses=("open", "investigating", "resolved"),
+    services=tuple(SERVICES[:60]),
+    start_date=date(2025, 1, 1),
+    end_date=date(2025, 12, 31),
+)
+NO_FILTER = IncidentFilter()
+MIN_DIFF_SECONDS = 0.005   # ignore noise on very fast cases
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _cases(dataset: dict, frame_holder: dict, login_rounds: int):
+    """(name, rows processed, callable) in run order; writes come last."""
+    columns = tuple(incident_repo.INCIDENT_TABLES["it"]["fields"])
+
+    def load_frame():
+        frame_holder["it"] = incident_repo._load.uncached("it", columns, NO_FILTER)
+
+    def first_sync():
+        IncidentMirror("it").refresh()      # a fresh mirror: the full first fetch
+
+    return [
+        ("load.repo_full_it", None, load_frame),
+        ("load.it_db_replace", None,
+         lambda: ingest_csv(dataset["it_csv"], "it", mode="replace")),
+        ("filter.repo_filtered_it", None,
+         lambda: incident_repo._load.uncached("it", columns, FILTERS)),
+        ("filter.frame_mask_it", None,
+         lambda: incident_repo.filter_mask("it", frame_holder["it"], FILTERS)),
+        ("filter.count_it", None, lambda: count_incidents.uncached("it", FILTERS)),
+        ("filter.first_page_it", None,
+         lambda: get_incidents_page.uncached("it", FILTERS, page_size=100)),
+        ("aggregate.metrics_cyber", None,
+         lambda: get_incident_metrics.uncached("cyber", NO_FILTER)),
+        ("aggregate.metrics_it", None, lambda: get_incident_metrics.uncached("it", FILTERS)),
+        ("aggregate.rollup_severity_it", None,
+         lambda: get_rollup_severity_counts.uncached("it", FILTERS)),
+        ("aggregate.rollup_hourly_it", None,
+         lambda: get_rollup_time_series.uncached("it", FILTERS, "hour")),
+        ("aggregate.delta_first_sync_it", None, first_sync),
+        ("aggregate.dashboard_view_it", None,
+         lambda: _compute_view.uncached("it", FILTERS, TableRequest(), "day")),
+        ("insert.single_x200", 200, lambda: _insert_single(200)),
+        ("insert.batch_10k", 10_000, lambda: _insert_batch(10_000)),
+        ("login.x20", 20, lambda: _logins(login_rounds, 20)),
+    ]
+
+
+def _new_incident(n: int) -> dict:
+    return {"service_name": "bench-service", "incident_type": "latency",
+            "severity": "medium", "status": "open",
+            "detected_at": f"2025-12-31 12:{n // 60 % 60:02d}:{n % 60:02d}"}
+
+
+def _insert_single(count: int):
+    for n in range(count):
+        incident_repo.insert("it", _new_incident(n))
+
+
+def _insert_batch(count: int):
+    incident_repo.insert_many("it", (_new_incident(n) for n in range(count)))
+
+
+def _logins(rounds: int, count: int):
+    service = AuthService(rounds=rounds)
+    try:
+        service.register("bench_analyst", "bench-password", "analyst")
+        for _ in range(count):
+            assert service.authenticate("bench_analyst", "bench-password")[0] == LOGIN_OK
+    finally:
+        service.close()
+
+
+def _remove_bench_rows():
+    with db_pool.connection() as conn:
+        conn.execute("DELETE FROM it_incidents WHERE service_name = 'bench-service'")
+
+
+def run_size(rows: int, data_dir: str, repeat: int, login_rounds: int, rebuild: bool) -> list:
+    dataset = build_dataset(data_dir, rows, SEED, rebuild)
+    db_pool.configure(dataset["db"])
+    results = [
+        {"size": rows, "case": name, "seconds": seconds, "rows": rows}
+        for name, seconds in dataset["timings"].items() if name.startswith("load.")
+    ]
+    frame_holder = {}
+    try:
+        for name, processed, fn in _cases(dataset, frame_holder, login_rounds):
+            # writes and the replace load change the data, so run them once
+            once = name.startswith(("insert.", "login.", "load.it_db"))
+            seconds = _best(fn, 1 if once else repeat)
+            processed = processed or rows
+            results.append({"size": rows, "case": name, "seconds": seconds,
+                            "rows": processed, "rows_per_sec": processed / seconds})
+            print(f"{rows:>10}  {name:<32} {seconds * 1000:10.1f} ms", flush=True)
+    finally:
+        _remove_bench_rows()
+    return results
+
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """Cases at least `tolerance` (fraction) slower than in the baseline."""
+    before = {(r["size"], r["case"]): r["seconds"] for r in baseline}
+    regressions = []
+    for r in results:
+        old = before.get((r["size"], r["case"]))
+        if old is None:
+            continue
+        if r["seconds"] > old * (1 + tolerance) and r["seconds"] - old > MIN_DIFF_SECONDS:
+            regressions.append({**r, "baseline_seconds": old,
+                                "slowdown": r["seconds"] / old})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark suite.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--login-rounds", type=int, default=4,
+                        help="bcrypt work factor for the login case")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate the datasets")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.20)
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.sizes:
+        results.extend(run_size(rows, args.data_dir, args.repeat, args.login_rounds, args.rebuild))
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        report["baseline_commit"] = baseline.get("commit")
+        report["regressions"] = compare(results, baseline["results"], args.tolerance)
+        for r in report["regressions"]:
+            print(f"REGRESSION {r['size']:>10}  {r['case']:<32} "
+                  f"{r['baseline_seconds'] * 1000:.1f} -> {r['seconds'] * 1000:.1f} ms "
+                  f"(x{r['slowdown']:.2f})")
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Incident insert throughput with N concurrent submitters: one connection and
+commit per incident (the old insert path) against the group-commit write
+queue. Every submitter waits for its row to be committed, like a form.
+
+    python -m benchmarks.bench_write_queue --submitters 1 10 100 --rows 2000
+"""
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import db_pool
+import incident_repo
+from migrations import migrate
+from write_queue import WriteQueue
+
+
+def _incident(n):
+    return {"service_name": f"svc-{n % 9}", "type": "latency", "severity": "medium",
+            "status": "open", "detected_at": f"2025-05-01 10:{n // 60 % 60:02d}:{n % 60:02d}"}
+
+
+def _drive(insert, submitters: int, rows: int) -> dict:
+    per = max(1, rows // submitters)
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def submitter(k):
+        for i in range(per):
+            started = time.perf_counter()
+            try:
+                insert(_incident(k * per + i))
+            except sqlite3.OperationalError as exc:   # "database is locked"
+                errors.append(exc)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=submitter, args=(k,)) for k in range(submitters)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rows_per_sec": len(latencies) / elapsed,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "errors": len(errors),
+    }
+
+
+def run(submitters: int, rows: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name in ("direct", "queue"):
+            db_pool.configure(Path(tmp) / f"{name}.db", max_size=max(8, submitters))
+            migrate()
+            if name == "direct":
+                results[name] = _drive(lambda v: incident_repo.insert("it", v), submitters, rows)
+            else:
+                writer = WriteQueue()
+                results[name] = _drive(lambda v: writer.submit("it", v).result(), submitters, rows)
+                writer.close()
+                results[name]["mean_batch"] = writer.stats()["mean_batch"]
+            db_pool.get_pool().close()
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--submitters", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'submitters':>10}  {'path':<7} {'rows/s':>9} {'p95 ms':>8} {'errors':>7} {'batch':>6}")
+    for n in args.submitters:
+        for name, r in run(n, args.rows).items():
+            batch = f"{r['mean_batch']:6.1f}" if "mean_batch" in r else f"{'1':>6}"
+            print(f"{n:>10}  {name:<7} {r['rows_per_sec']:9,.0f} {r['p95_ms']:8.1f} "
+                  f"{r['errors']:>7} {batch}")
@@ -0,0 +1,189 @@
+"""
+Deterministic synthetic cyber and IT incidents for benchmarks.
+
+The same (domain, rows, seed) always produces the same CSV. Severity is
+skewed towards low/medium, timestamps arrive in bursts on top of a steady
+background rate, services follow a long-tailed (Zipf) popularity, and old
+incidents are mostly resolved while recent ones are mostly open.
+
+    python -m benchmarks.synthetic --rows 1000000 --data-dir bench_data
+"""
+import argparse
+import json
+import time
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import db_pool
+from ingest import ingest_csv
+from migrations import migrate
+
+SEED = 2025
+CHUNK_ROWS = 200_000
+GENERATOR_VERSION = 1
+
+END = np.datetime64("2025-12-31T23:59:59", "s")
+SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+SEVERITY_P = {"low": 0.55, "medium": 0.28, "high": 0.13, "critical": 0.04}
+RECENT_STATUS_P = {"open": 0.40, "investigating": 0.35, "resolved": 0.20, "closed": 0.05}
+OLD_STATUS_P = {"open": 0.03, "investigating": 0.07, "resolved": 0.55, "closed": 0.35}
+
+CYBER_TYPES = {
+    "phishing": 0.30, "malware": 0.18, "brute-force": 0.12, "misconfiguration": 0.10,
+    "credential-stuffing": 0.08, "ddos": 0.07, "ransomware": 0.05,
+    "sql-injection": 0.04, "data-exfiltration": 0.03, "insider": 0.03,
+}
+IT_TYPES = {
+    "latency": 0.28, "error-rate": 0.20, "degraded": 0.16, "outage": 0.10,
+    "capacity": 0.09, "dependency": 0.08, "config": 0.06, "certificate": 0.03,
+}
+SERVICES = [
+    f"{team}-{component}"
+    for team, component in product(
+        ["auth", "payments", "search", "checkout", "billing", "catalog", "email",
+         "reporting", "gateway", "storage", "identity", "ledger", "pricing",
+         "inventory", "shipping", "notifications", "analytics", "profile",
+         "orders", "media"],
+        ["api", "worker", "db", "cache", "frontend", "queue", "scheduler",
+         "proxy", "batch", "stream"],
+    )
+]
+
+# popularity rank -> service, shuffled so the busy services span teams
+_SERVICES_BY_POPULARITY = np.random.default_rng(SEED).permutation(np.array(SERVICES, dtype=object))
+
+CSV_COLUMNS = {
+    "cyber": ["incident_id", "domain", "incident_type", "severity", "status", "reported_at"],
+    "it": ["incident_id", "service_name", "incident_type", "severity", "status",
+           "detected_at", "resolved_at"],
+}
+
+
+def _choice(rng, weights: dict, size: int) -> np.ndarray:
+    return rng.choice(np.array(list(weights), dtype=object), size,
+                      p=np.array(list(weights.values())))
+
+
+def _bursty_seconds(rng, start: int, width: int, size: int) -> np.ndarray:
+    """Sorted offsets in [start, start + width): 60% steady, 40% in bursts."""
+    in_burst = rng.random(size) < 0.4
+    bursts = max(1, size // 2000)
+    centres = rng.integers(start, start + width, bursts)
+    offsets = np.where(
+        in_burst,
+        centres[rng.integers(0, bursts, size)] + rng.exponential(600, size).astype(np.int64),
+        rng.integers(start, start + width, size),
+    )
+    return np.sort(np.clip(offsets, start, start + width - 1))
+
+
+def _format(seconds: np.ndarray) -> np.ndarray:
+    stamps = np.datetime_as_string(END - SPAN_SECONDS + seconds.astype("timedelta64[s]"), unit="s")
+    return np.char.replace(stamps, "T", " ")
+
+
+def incident_chunks(domain: str, rows: int, seed: int = SEED, chunk_rows: int = CHUNK_ROWS):
+    """Yield DataFrames with CSV_COLUMNS[domain], oldest incidents first."""
+    if domain not in CSV_COLUMNS:
+        raise ValueError(f"Unknown domain {domain!r}")
+    chunks = max(1, -(-rows // chunk_rows))
+    for index in range(chunks):
+        first = index * chunk_rows
+        size = min(chunk_rows, rows - first)
+        rng = np.random.default_rng([seed, 0 if domain == "cyber" else 1, index])
+
+        # each chunk owns a contiguous slice of time so the file stays sorted
+        width = SPAN_SECONDS // chunks
+        seconds = _bursty_seconds(rng, index * width, width, size)
+        recent = seconds > SPAN_SECONDS - 30 * 24 * 3600
+        status = np.where(recent, _choice(rng, RECENT_STATUS_P, size),
+                          _choice(rng, OLD_STATUS_P, size))
+
+        data = {"incident_id": np.arange(first + 1, first + size + 1)}
+        if domain == "cyber":
+            data["domain"] = "cybersecurity"
+            data["incident_type"] = _choice(rng, CYBER_TYPES, size)
+        else:
+            popularity = (rng.zipf(1.3, size) - 1) % len(SERVICES)
+            data["service_name"] = _SERVICES_BY_POPULARITY[popularity]
+            data["incident_type"] = _choice(rng, IT_TYPES, size)
+        data["severity"] = _choice(rng, SEVERITY_P, size)
+        data["status"] = status
+
+        if domain == "cyber":
+            data["reported_at"] = _format(seconds)
+        else:
+            data["detected_at"] = _format(seconds)
+            # time to resolve: log-normal around 90 minutes
+            duration = rng.lognormal(np.log(90 * 60), 1.0, size).astype(np.int64)
+            resolved = np.isin(status, ["resolved", "closed"])
+            data["resolved_at"] = np.where(resolved, _format(seconds + duration), "")
+        yield pd.DataFrame(data, columns=CSV_COLUMNS[domain])
+
+
+def write_csv(path, domain: str, rows: int, seed: int = SEED) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        for index, chunk in enumerate(incident_chunks(domain, rows, seed)):
+            chunk.to_csv(handle, index=False, header=index == 0)
+    return path
+
+
+def build_dataset(data_dir, rows: int, seed: int = SEED, rebuild: bool = False) -> dict:
+    """
+    CSVs for both domains plus a database loaded from them, under
+    data_dir/<rows>/. Reused when the manifest matches. Returns the paths
+    and, if (re)built, the timings of each step.
+    """
+    directory = Path(data_dir) / str(rows)
+    manifest_file = directory / "manifest.json"
+    wanted = {"rows": rows, "seed": seed, "generator": GENERATOR_VERSION}
+    paths = {
+        "db": directory / "incidents.db",
+        "cyber_csv": directory / "cyber_incidents.csv",
+        "it_csv": directory / "it_incidents.csv",
+    }
+    if (not rebuild and manifest_file.exists()
+            and json.loads(manifest_file.read_text())["params"] == wanted):
+        return {**paths, "timings": {}}
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{paths['db']}{suffix}").unlink(missing_ok=True)
+
+    timings = {}
+    for domain in ("cyber", "it"):
+        started = time.perf_counter()
+        write_csv(paths[f"{domain}_csv"], domain, rows, seed)
+        timings[f"generate.{domain}"] = time.perf_counter() - started
+
+    db_pool.configure(paths["db"])
+    migrate()
+    for domain in ("cyber", "it"):
+        report = ingest_csv(paths[f"{domain}_csv"], domain, mode="append")
+        if report.rows_rejected:
+            raise RuntimeError(f"Generator produced invalid rows: {report.errors}")
+        timings[f"load.ingest_{domain}"] = report.elapsed
+
+    manifest_file.write_text(json.dumps({"params": wanted, "timings": timings}, indent=2))
+    return {**paths, "timings": timings}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic incident data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        dataset = build_dataset(args.data_dir, rows, args.seed, args.rebuild)
+        print(f"{rows:>10} rows -> {dataset['db'].parent}")
+        for step, seconds in dataset["timings"].items():
+            print(f"    {step:<20} {seconds:8.2f} s")
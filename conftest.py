@@ -0,0 +1,23 @@
+"""Shared fixtures: each test gets its own database in tmp_path, never data1/cw2.db."""
+import pytest
+
+import db_pool
+import migrations
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    """The process-wide pool pointed at a new, empty database file (not migrated)."""
+    db_pool.configure(tmp_path / "cw2.db")
+    yield tmp_path / "cw2.db"
+    db_pool.get_pool().close()
+
+
+@pytest.fixture
+def db(db_file):
+    """
+    A migrated, empty database; yields its directory. Test files that need
+    rows override it with a `db(db)` fixture of their own that seeds them.
+    """
+    migrations.migrate()
+    return db_file.parent
@@ -0,0 +1,166 @@
+"""
+Cross-domain correlation: IT incidents that start within a time window
+after a cyber incident (for example ransomware, then a service outage).
+
+Both domains are loaded as typed frames (incident_repo.load, hot table plus
+archive) and their timestamps are sorted once. The cyber incidents in
+[detected_at - window, detected_at] of an IT incident are then a contiguous
+run of the sorted cyber times, so two np.searchsorted calls give their
+number and the latest of them, taken as the likely cause. The whole match
+is O((n + m) log m) for n IT and m cyber incidents instead of an n x m
+cross join. The cached wrapper is memoised per window and filter specs on
+the versions of both tables.
+
+    python correlation.py --window 60 --cyber-types ransomware --it-types outage
+"""
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import incident_repo
+from incident_cache import versioned
+from incident_repo import INCIDENT_TABLES, IncidentFilter
+from instrumentation import timed
+from migrations import ensure_migrated
+
+WINDOWS_MINUTES = (15, 30, 60, 120, 240, 1440)
+LINK_ROWS = 200         # most recent links kept in the cached result
+
+_CYBER_COLUMNS = ("incident_id", "type", "severity")
+_IT_COLUMNS = ("incident_id", "service_name", "type", "severity")
+
+
+@dataclass(frozen=True)
+class Correlation:
+    window_minutes: int
+    summary: dict           # counts and lag figures, see correlate()
+    pairs: pd.DataFrame     # cyber type x IT type, count of links
+    daily: pd.Series        # linked IT incidents per day
+    links: pd.DataFrame     # the LINK_ROWS most recent links
+
+
+# ---------- FRAME COMPUTATIONS ----------
+
+def _sorted_times(df: pd.DataFrame, column: str):
+    """(sorted non-null times, their row positions in df)."""
+    times = df[column].to_numpy(dtype="datetime64[us]")
+    positions = np.flatnonzero(~np.isnat(times))
+    positions = positions[np.argsort(times[positions], kind="stable")]
+    return times[positions], positions
+
+
+def link_incidents(cyber: pd.DataFrame, it: pd.DataFrame, window: pd.Timedelta,
+                   cyber_time: str = "reported_at", it_time: str = "detected_at") -> pd.DataFrame:
+    """
+    One row per IT incident with at least one cyber incident in the window
+    before it: the IT columns prefixed `it_`, the latest such cyber incident
+    prefixed `cyber_`, the lag in minutes and how many cyber incidents fell
+    in the window.
+    """
+    cause_times, cause_rows = _sorted_times(cyber, cyber_time)
+    effect_times = it[it_time].to_numpy(dtype="datetime64[us]")
+    window = np.timedelta64(pd.Timedelta(window).value // 1000, "us")
+
+    upper = np.searchsorted(cause_times, effect_times, side="right")
+    lower = np.searchsorted(cause_times, effect_times - window, side="left")
+    in_window = upper - lower
+    in_window[np.isnat(effect_times)] = 0
+
+    effects = np.flatnonzero(in_window > 0)
+    causes = cause_rows[upper[effects] - 1]
+    lag = (effect_times[effects] - cause_times[upper[effects] - 1]).astype("float64") / 60e6
+    return pd.concat([
+        it.iloc[effects].reset_index(drop=True).add_prefix("it_"),
+        cyber.iloc[causes].reset_index(drop=True).add_prefix("cyber_"),
+        pd.DataFrame({"lag_minutes": lag, "cyber_in_window": in_window[effects]}),
+    ], axis=1)
+
+
+def followed_counts(cyber: pd.DataFrame, it: pd.DataFrame, window: pd.Timedelta,
+                    cyber_time: str = "reported_at", it_time: str = "detected_at") -> np.ndarray:
+    """IT incidents starting within the window after each cyber incident."""
+    effect_times, _ = _sorted_times(it, it_time)
+    cause_times = cyber[cyber_time].to_numpy(dtype="datetime64[us]")
+    window = np.timedelta64(pd.Timedelta(window).value // 1000, "us")
+    counts = (np.searchsorted(effect_times, cause_times + window, side="right")
+              - np.searchsorted(effect_times, cause_times, side="left"))
+    counts[np.isnat(cause_times)] = 0
+    return counts
+
+
+def correlate(cyber: pd.DataFrame, it: pd.DataFrame, window_minutes: int,
+              cyber_time: str = "reported_at", it_time: str = "detected_at",
+              link_rows: int = LINK_ROWS) -> Correlation:
+    """Links, per-type pairs, daily counts and summary figures for one window."""
+    window = pd.Timedelta(minutes=window_minutes)
+    links = link_incidents(cyber, it, window, cyber_time, it_time)
+    followed = followed_counts(cyber, it, window, cyber_time, it_time)
+    lags = links["lag_minutes"].to_numpy()
+    summary = {
+        "cyber_incidents": len(cyber),
+        "it_incidents": len(it),
+        "linked_it": len(links),
+        "linked_it_share": len(links) / len(it) if len(it) else 0.0,
+        "cyber_followed": int((followed > 0).sum()),
+        "median_lag_minutes": float(np.median(lags)) if len(lags) else None,
+        "p95_lag_minutes": float(np.percentile(lags, 95)) if len(lags) else None,
+    }
+    pairs = (links.groupby(["cyber_incident_type", "it_incident_type"], observed=True)
+             .size().unstack(fill_value=0))
+    # plain labels: categorical axes do not round-trip through Arrow (st.dataframe)
+    pairs.index, pairs.columns = pairs.index.astype(str), pairs.columns.astype(str)
+    days = links[f"it_{it_time}"].dt.floor("D")
+    daily = links.groupby(days).size().rename("linked_incidents")
+    recent = links.nlargest(link_rows, f"it_{it_time}").reset_index(drop=True)
+    return Correlation(window_minutes, summary, pairs, daily, recent)
+
+
+# ---------- CACHED, PER WINDOW ----------
+
+_TABLES = (INCIDENT_TABLES["cyber"]["table"], INCIDENT_TABLES["it"]["table"])
+
+
+def _frame(domain: str, columns, filters: IncidentFilter) -> pd.DataFrame:
+    date_column = INCIDENT_TABLES[domain]["date_column"]
+    return incident_repo.load(domain, columns=[*columns, date_column], filters=filters)
+
+
+@versioned(_TABLES)
+def _correlation(window_minutes: int, cyber_filter: IncidentFilter,
+                 it_filter: IncidentFilter) -> Correlation:
+    return correlate(
+        _frame("cyber", _CYBER_COLUMNS, cyber_filter), _frame("it", _IT_COLUMNS, it_filter),
+        window_minutes, INCIDENT_TABLES["cyber"]["date_column"],
+        INCIDENT_TABLES["it"]["date_column"],
+    )
+
+
+@timed()
+def get_correlation(window_minutes: int = 60, cyber_filter: IncidentFilter = None,
+                    it_filter: IncidentFilter = None) -> Correlation:
+    """IT incidents within `window_minutes` after a cyber incident, per filter specs."""
+    ensure_migrated()
+    return _correlation(int(window_minutes), cyber_filter or IncidentFilter(),
+                        it_filter or IncidentFilter())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Link IT incidents to preceding cyber incidents.")
+    parser.add_argument("--window", type=int, default=60, help="minutes after a cyber incident")
+    parser.add_argument("--cyber-types", nargs="+", help="e.g. ransomware ddos")
+    parser.add_argument("--it-types", nargs="+", help="e.g. outage")
+    parser.add_argument("--top", type=int, default=20, help="most recent links to print")
+    args = parser.parse_args()
+
+    result = get_correlation(
+        args.window,
+        IncidentFilter(types=tuple(args.cyber_types) if args.cyber_types else None),
+        IncidentFilter(types=tuple(args.it_types) if args.it_types else None),
+    )
+    for name, value in result.summary.items():
+        print(f"  {name:<20} {value}")
+    if not result.pairs.empty:
+        print(result.pairs.to_string())
+        print(result.links.head(args.top).round({"lag_minutes": 1}).to_string(index=False))
@@ -1,19 +1,32 @@
-import sqlite3
 from pathlib import Path
 import pandas as pd
 
+import incident_repo
+from db_pool import connection
+from ingest import ingest_csv
+
 DATA_DIR = Path("data1")
 DB_FILE = DATA_DIR / "cw2.db"
+CYBER_CSV_FILE = DATA_DIR / "incidents.csv"
 
 def connect_db():
-    return sqlite3.connect(DB_FILE)
+    return connection()
 
 def get_it_incidents_df() -> pd.DataFrame:
     """Fetch all IT incidents from the database"""
-    conn = connect_db()
-    try:
-        df = pd.read_sql_query("SELECT * FROM it_incidents", conn)
-    except Exception:
-        df = pd.DataFrame()  # return empty instead of crashing
-    conn.close()
-    return df
\ No newline at end of file
+    return incident_repo.load("it")
+
+def load_cyber_incidents_csv():
+    """Load data from incidents.csv into the cyber_incidents table."""
+    if not CYBER_CSV_FILE.exists():
+        print("incidents.csv not found – skipping load.")
+        return
+
+    report = ingest_csv(CYBER_CSV_FILE, "cyber", mode="upsert")
+    if report.rows_rejected:
+        print(f"Skipped {report.rows_rejected} invalid rows: {report.errors}")
+    print("Cyber incidents CSV loaded into cyber_incidents table.")
+
+
+if __name__ == "__main__":
+    load_cyber_incidents_csv()
@@ -1,133 +1,284 @@
-import sqlite3
 from pathlib import Path
 import pandas as pd
 
+import incident_repo
+from db_pool import connection
+from incident_cache import versioned
+from instrumentation import note_query, timed
+from incident_repo import (  # re-exported: the repository owns the domain registry
+    INCIDENT_TABLES,
+    SEVERITIES,
+    STATUSES,
+    IncidentFilter,
+    build_where,
+    datetime_columns,
+    has_field,
+    normalise_timestamp,
+    table_for,
+)
+from ingest import file_format_of, ingest_file
+from migrations import migrate
+from write_queue import submit_incident
+
 DATA_DIR = Path("data1")
 DB_FILE = DATA_DIR / "cw2.db"
 
 def connect_db():
-    """Create a connection to the SQLite database."""
-    return sqlite3.connect(DB_FILE)
+    """Borrow a pooled connection: `with connect_db() as conn: ...`"""
+    return connection()
 
 # ---------- CYBERSEC INCIDENTS ----------
+@timed()
 def create_cyber_table():
-    conn = sqlite3.connect(DB_FILE)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS cyber_incidents(
-            incident_id INTEGER PRIMARY KEY,
-            domain TEXT,
-            type TEXT,
-            severity TEXT,
-            status TEXT,
-            reported_at TEXT
-        );
-    """)
-    conn.commit()
-    conn.close()
+    """Create or upgrade the cyber_incidents table (schema lives in migrations.py)."""
+    migrate()
 
+@timed()
 def get_cyber_incidents_df() -> pd.DataFrame:
-    conn = sqlite3.connect(DB_FILE)
-    df = pd.read_sql_query("SELECT * FROM cyber_incidents", conn)
-    conn.close()
-
-    # Normalize only in pandas if column is called "type"
-    if "type" in df.columns and "incident_type" not in df.columns:
-        df = df.rename(columns={"type": "incident_type"})
-
-    if not df.empty:
-        df["reported_at"] = pd.to_datetime(df["reported_at"], errors="coerce")
-
-    return df
+    return incident_repo.load("cyber")
 
+@timed(rows=lambda _: 1)
 def insert_cyber_incident(domain, incident_type, severity, status, reported_at):
-    conn = connect_db()
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO cyber_incidents (incident_id, domain, type, severity, status, reported_at)
-        VALUES(NULL, ?, ?, ?, ?, ?)
-    """, (domain, incident_type, severity, status, reported_at))
-    conn.commit()
-    conn.close()
+    # group-committed with other concurrent inserts (write_queue.py)
+    return submit_incident("cyber", {
+        "domain": domain, "type": incident_type, "severity": severity,
+        "status": status, "reported_at": reported_at,
+    }).result()
 
 # ---------- IT OPERATIONS INCIDENTS ----------
+@timed()
 def create_it_table():
-    conn = sqlite3.connect(DB_FILE)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS it_incidents(
-            incident_id INTEGER PRIMARY KEY,
-            service_name TEXT,
-            type TEXT,
-            severity TEXT,
-            status TEXT,
-            detected_at TEXT,
-            resolved_at TEXT
-        );
-    """)
-    conn.commit()
-    conn.close()
+    """Create or upgrade the it_incidents table (schema lives in migrations.py)."""
+    migrate()
 
+@timed()
 def get_it_incidents_df() -> pd.DataFrame:
-    conn = sqlite3.connect(DB_FILE)
-    df = pd.read_sql_query("SELECT * FROM it_incidents", conn)
-    conn.close()
-
-    if "type" in df.columns and "incident_type" not in df.columns:
-        df = df.rename(columns={"type": "incident_type"})
-
-    if not df.empty:
-        df["detected_at"] = pd.to_datetime(df["detected_at"], errors="coerce")
-
-    return df
+    return incident_repo.load("it")
 
+@timed(rows=lambda _: 1)
 def insert_it_incident(service_name, incident_type, severity, status, detected_at, resolved_at=None):
-    conn = connect_db()
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO it_incidents (incident_id, service_name, type, severity, status, detected_at, resolved_at)
-        VALUES(NULL, ?, ?, ?, ?, ?, ?)
-    """, (service_name, incident_type, severity, status, detected_at, resolved_at))
-    conn.commit()
-    conn.close()
+    return submit_incident("it", {
+        "service_name": service_name, "type": incident_type, "severity": severity,
+        "status": status, "detected_at": detected_at, "resolved_at": resolved_at,
+    }).result()
 
 # ---------- USERS TABLE ----------
+@timed()
 def create_user_table():
-    conn = sqlite3.connect(DB_FILE)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS users(
-            id INTEGER PRIMARY KEY,
-            username TEXT UNIQUE,
-            password_hash TEXT,
-            role TEXT
-        );
-    """)
-    conn.commit()
-    conn.close()
+    """Create or upgrade the users table (schema lives in migrations.py)."""
+    migrate()
 
 # Optional migration (from text file) ✅
+@timed()
 def migrate_users_from_txt():
     USERS_FILE = DATA_DIR / "users.txt"
     if not USERS_FILE.exists():
         print("users.txt not found, skipping migration.")
         return
 
-    conn = connect_db()
-    cur = conn.cursor()
+    note_query("INSERT OR IGNORE INTO users VALUES(NULL, ?, ?, ?)")
+    with connection() as conn:
+        cur = conn.cursor()
 
-    with open(USERS_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            user, pwd_hash, role = line.split(",")
-            cur.execute("INSERT OR IGNORE INTO users VALUES(NULL, ?, ?, ?)", (user, pwd_hash, role))
+        with open(USERS_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                user, pwd_hash, role = line.split(",")
+                cur.execute("INSERT OR IGNORE INTO users VALUES(NULL, ?, ?, ?)", (user, pwd_hash, role))
 
-    conn.commit()
-    conn.close()
     print("✅ Users migrated from users.txt")
 
+# ---------- BULK IMPORT ----------
+MAX_IMPORT_ERRORS = 500   # rejected rows listed back to the user
+
+@timed(rows=lambda report: report.rows_loaded)
+def import_incidents(domain, handle, filename, mode="append", progress=None, scope=None):
+    """
+    Stream an uploaded CSV / JSONL / Parquet file into a domain's table in
+    batched transactions; caches are refreshed once at the end. Rows outside
+    `scope` (the uploader's restricted filter) are rejected. Returns the
+    ingest.IngestReport (rows loaded, rejected rows with line numbers).
+    """
+    return ingest_file(handle, domain, file_format_of(filename), mode=mode,
+                       progress=progress, max_errors=MAX_IMPORT_ERRORS, scope=scope)
+
+# ---------- FILTERED QUERIES (push-down) ----------
+# Dashboard filters are turned into SQL so only aggregates and the visible
+# page of rows leave SQLite, instead of SELECT * followed by pandas masks.
+
+@timed()
+@versioned(table_for)
+def get_filter_options(domain: str, filters: IncidentFilter = None) -> dict:
+    """
+    Distinct values and date bounds used to populate the sidebar widgets,
+    taken from the rows `filters` selects (pass the role's restricted
+    filter, so the options only name what the role may read).
+    """
+    table = INCIDENT_TABLES[domain]["table"]
+    date_column = INCIDENT_TABLES[domain]["date_column"]
+    where_sql, params = build_where(domain, filters or IncidentFilter())
+    with connection() as conn:
+        def distinct(column):
+            sql = (f"SELECT DISTINCT {column} FROM {table}{where_sql} "
+                   f"{'AND' if where_sql else 'WHERE'} {column} IS NOT NULL ORDER BY {column}")
+            note_query(sql)
+            return [r[0] for r in conn.execute(sql, params)]
+
+        options = {
+            "severities": distinct("severity"),
+            "statuses": distinct("status"),
+            "types": distinct("type"),
+            "services": distinct("service_name") if has_field(domain, "service_name") else [],
+        }
+        sql = f"SELECT MIN({date_column}), MAX({date_column}) FROM {table}{where_sql}"
+        note_query(sql)
+        min_date, max_date = conn.execute(sql, params).fetchone()
+
+    options["min_date"] = pd.to_datetime(min_date, errors="coerce")
+    options["max_date"] = pd.to_datetime(max_date, errors="coerce")
+    return options
+
+
+@timed()
+@versioned(table_for)
+def get_incident_metrics(domain: str, filters: IncidentFilter) -> dict:
+    """Total, open/investigating, high/critical and resolved counts in one scan."""
+    table = INCIDENT_TABLES[domain]["table"]
+    with connection() as conn:
+        where_sql, params = build_where(domain, filters)
+        sql = f"""
+            SELECT COUNT(*),
+                   COALESCE(SUM(status IN ('open', 'investigating')), 0),
+                   COALESCE(SUM(severity IN ('high', 'critical')), 0),
+                   COALESCE(SUM(status = 'resolved'), 0)
+            FROM {table}{where_sql}
+        """
+        note_query(sql)
+        row = conn.execute(sql, params).fetchone()
+    return dict(zip(("total", "open_investigating", "high_critical", "resolved"), row))
+
+
+@timed()
+@versioned(table_for)
+def get_severity_counts(domain: str, filters: IncidentFilter) -> pd.Series:
+    """Incident count per severity, largest first (like value_counts)."""
+    table = INCIDENT_TABLES[domain]["table"]
+    with connection() as conn:
+        where_sql, params = build_where(domain, filters)
+        sql = f"""
+            SELECT severity, COUNT(*) AS n FROM {table}{where_sql}
+            GROUP BY severity ORDER BY n DESC
+        """
+        note_query(sql)
+        rows = conn.execute(sql, params).fetchall()
+    return pd.Series(
+        [n for _, n in rows],
+        index=pd.Index([s for s, _ in rows], name="severity"),
+        name="count",
+        dtype="int64",
+    )
+
+
+@timed()
+@versioned(table_for)
+def get_daily_counts(domain: str, filters: IncidentFilter) -> pd.Series:
+    """Incident count per calendar day of the domain's date column."""
+    table = INCIDENT_TABLES[domain]["table"]
+    date_column = INCIDENT_TABLES[domain]["date_column"]
+    with connection() as conn:
+        where_sql, params = build_where(domain, filters)
+        sql = f"""
+            SELECT date({date_column}) AS day, COUNT(*) FROM {table}{where_sql}
+            GROUP BY day HAVING day IS NOT NULL ORDER BY day
+        """
+        note_query(sql)
+        rows = conn.execute(sql, params).fetchall()
+    index = pd.to_datetime(pd.Index([d for d, _ in rows])).date
+    return pd.Series(
+        [n for _, n in rows],
+        index=pd.Index(index, name=date_column),
+        name="incident_count",
+        dtype="int64",
+    )
+
+
+@timed()
+@versioned(table_for)
+def count_incidents(domain: str, filters: IncidentFilter) -> int:
+    """Filtered row count, answered from an index by the filter columns."""
+    table = INCIDENT_TABLES[domain]["table"]
+    with connection() as conn:
+        where_sql, params = build_where(domain, filters)
+        sql = f"SELECT COUNT(*) FROM {table}{where_sql}"
+        note_query(sql)
+        return conn.execute(sql, params).fetchone()[0]
+
+
+def _seek_clause(sort_column: str, descending: bool, after):
+    """
+    Keyset predicate for rows after `after` = (sort value, incident_id) in
+    ORDER BY sort_column, incident_id. SQLite sorts NULLs first ascending
+    and last descending, so NULL cursors need their own branch.
+    """
+    value, incident_id = after
+    if descending:
+        if value is None:
+            return f"({sort_column} IS NULL AND incident_id < ?)", [incident_id]
+        return (f"(({sort_column}, incident_id) < (?, ?) OR {sort_column} IS NULL)",
+                [value, incident_id])
+    if value is None:
+        return (f"(({sort_column} IS NULL AND incident_id > ?) OR {sort_column} IS NOT NULL)",
+                [incident_id])
+    return f"(({sort_column}, incident_id) > (?, ?))", [value, incident_id]
+
+
+@timed()
+@versioned(table_for)
+def get_incidents_page(domain: str, filters: IncidentFilter, page_size: int = 100,
+                       sort_column: str = None, descending: bool = True, after=None):
+    """
+    One page of the filtered incident table using keyset (seek) pagination.
+    Returns (page DataFrame, cursor for the next page or None). The cost
+    does not grow with the page number, unlike LIMIT/OFFSET.
+    """
+    table = INCIDENT_TABLES[domain]["table"]
+    date_column = INCIDENT_TABLES[domain]["date_column"]
+    columns = INCIDENT_TABLES[domain]["columns"]
+    sort_column = sort_column or date_column
+    if sort_column not in [c.strip() for c in columns.split(",")]:
+        raise ValueError(f"Cannot sort {table} by {sort_column!r}")
+
+    where_sql, params = build_where(domain, filters)
+    if after is not None:
+        seek_sql, seek_params = _seek_clause(sort_column, descending, after)
+        where_sql += f" AND {seek_sql}" if where_sql else f" WHERE {seek_sql}"
+        params = params + seek_params
+    order = "DESC" if descending else "ASC"
+
+    sql = (f"SELECT {columns} FROM {table}{where_sql} "
+           f"ORDER BY {sort_column} {order}, incident_id {order} LIMIT ?")
+    note_query(sql)
+    with connection() as conn:
+        rows = conn.execute(sql, params + [page_size + 1])
+        names = [d[0] for d in rows.description]
+        rows = rows.fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = dict(zip(names, rows[-1]))
+        next_cursor = (last[sort_column], last["incident_id"])
+
+    df = pd.DataFrame(rows, columns=names).rename(columns={"type": "incident_type"})
+    for column in datetime_columns(domain):
+        df[column] = pd.to_datetime(df[column], format="ISO8601", errors="coerce")
+    return df, next_cursor
+
 # ---------- RUN MIGRATIONS ----------
 if __name__ == "__main__":
     create_user_table()
     create_cyber_table()
     create_it_table()
-    print("✅ All tables created successfully.")
\ No newline at end of file
+    print("✅ All tables created successfully.")
@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DATA_DIR = Path("data1")
+DB_FILE = DATA_DIR / "cw2.db"
+
+# Applied to every new connection. WAL lets readers run while one writer
+# commits; NORMAL sync is safe under WAL and avoids an fsync per commit.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,          # negative = KiB, so ~16 MB page cache
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections shared by every thread in the process.
+
+    Connections are handed out through the `connection()` context manager,
+    which commits on success and rolls back on error. A thread that asks for
+    a connection while it already holds one gets the same connection back,
+    and a thread coming back for a new one is given the connection it used
+    last if that one is idle (so its page cache is still warm). New
+    connections are opened outside the pool lock, on a reserved slot, so a
+    slow connect never holds up threads borrowing idle connections.
+    """
+
+    def __init__(self, db_file=DB_FILE, max_size: int = 8, timeout: float = 10.0):
+        self.db_file = Path(db_file)
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = []
+        self._all = []
+        self._opening = 0              # slots reserved by connects in progress
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_file, timeout=self.timeout, check_same_thread=False
+        )
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        last = getattr(self._local, "last", None)
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed.")
+                if self._idle:
+                    if last is not None and last in self._idle:
+                        self._idle.remove(last)
+                        return last
+                    return self._idle.pop()
+                if len(self._all) + self._opening < self.max_size:
+                    self._opening += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"No database connection free after {self.timeout}s "
+                        f"(pool size {self.max_size})."
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            conn = self._open()
+        except BaseException:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()     # the slot is free again
+            raise
+        with self._cond:
+            self._opening -= 1
+            if self._closed:
+                conn.close()
+                raise sqlite3.ProgrammingError("Connection pool is closed.")
+            self._all.append(conn)
+        return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        with self._cond:
+            if self._closed:
+                conn.close()
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Yield a pooled connection; commit on success, roll back on error."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            # Nested use on the same thread: reuse, let the outer block commit.
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.last = conn
+            self._release(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "open": len(self._all),
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def close(self):
+        """Close every connection; in-use ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+            self._all.clear()
+            self._cond.notify_all()
+
+
+# ---------- DEFAULT POOL ----------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def configure(db_file=DB_FILE, max_size: int = 8, timeout: float = 10.0) -> ConnectionPool:
+    """Point the process-wide pool at another database (tests, benchmarks)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(db_file, max_size=max_size, timeout=timeout)
+    return _pool
+
+
+def connection():
+    """Shortcut for `get_pool().connection()`."""
+    return get_pool().connection()
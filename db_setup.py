@@ -1,23 +1,16 @@
-import sqlite3
 from pathlib import Path
 
+from db_pool import connection
+from migrations import migrate
+
 DATA_DIR = Path("data1")
 DB_FILE = DATA_DIR / "cw2.db"
 USERS_TXT = DATA_DIR / "users.txt"
 
 
 def create_db():
-    conn = sqlite3.connect(DB_FILE)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE,
-            password_hash TEXT,
-            role TEXT
-        );
-    """)
-    conn.commit()
-    conn.close()
+    """Create or upgrade every table (see migrations.py)."""
+    migrate()
 
 
 def migrate_users_from_txt():
@@ -26,25 +19,22 @@ def migrate_users_from_txt():
         print("users.txt not found, nothing to migrate.")
         return
 
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-
-    with open(USERS_TXT, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            username, pwd_hash, role = line.split(",")
-            try:
-                cur.execute(
-                    "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                    (username, pwd_hash, role)
-                )
-            except Exception as e:
-                print("Error inserting user", username, e)
-
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        cur = conn.cursor()
+
+        with open(USERS_TXT, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                username, pwd_hash, role = line.split(",")
+                try:
+                    cur.execute(
+                        "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                        (username, pwd_hash, role)
+                    )
+                except Exception as e:
+                    print("Error inserting user", username, e)
     print("Migration from users.txt completed.")
 
 
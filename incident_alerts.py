@@ -0,0 +1,39 @@
+"""
+Spike alerts for the dashboards.
+
+Shows anomalies.get_alerts for the series the sidebar filters select: one
+warning per spike in the last week, newest and strongest first, with the
+full list in an expander.
+"""
+import streamlit as st
+
+from anomalies import ALERT_DAYS, Z_THRESHOLD, get_alerts
+from instrumentation import span
+
+SHOWN = 3       # spikes shown as warnings; the rest are in the table
+
+
+def _label(alert) -> str:
+    if alert["dimension"] == "all":
+        return "All incidents"
+    return f"{alert['dimension'].capitalize()} '{alert['value']}'"
+
+
+def render_alerts(domain: str, filters, key: str, scope=None):
+    """Recent spikes in the daily counts (of the rows in `scope`), or a note that there are none."""
+    alerts = get_alerts(domain, filters, scope=scope)
+    if alerts.empty:
+        st.caption(f"No spikes in the last {ALERT_DAYS} days "
+                   f"(daily counts ≥ {Z_THRESHOLD:g} standard deviations above baseline).")
+        return
+
+    for _, alert in alerts.head(SHOWN).iterrows():
+        when = f"on {alert['day']:%a %d %b}"
+        if alert["in_progress"]:
+            when += " (latest day, still counting)"
+        st.warning(f"**{_label(alert)}**: {alert['count']} incidents {when}, "
+                   f"expected about {alert['expected']:.1f} (z = {alert['z']:.1f})", icon="⚠️")
+    with st.expander(f"All {len(alerts)} spikes in the last {ALERT_DAYS} days"):
+        with span("render.dataframe", rows=len(alerts)):
+            st.dataframe(alerts.round({"expected": 1, "z": 2}), use_container_width=True,
+                         hide_index=True, key=f"{key}_table")
@@ -0,0 +1,175 @@
+"""
+Process-wide cache for the incident data loaders.
+
+Entries are keyed on the loader, its arguments and the table's change
+counter (`table_versions`, bumped by triggers on every write, see
+migrations.py). A rerun with unchanged data costs one primary-key lookup;
+any insert/update/delete makes the next read miss and reload. The cache is
+shared by every Streamlit session in the process and bounded by memory,
+evicting least-recently-used entries first.
+"""
+import dataclasses
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import instrumentation
+from db_pool import connection
+
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def table_version(table: str) -> int:
+    """Current change counter of `table` (0 if it was never written)."""
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT version FROM table_versions WHERE table_name = ?", (table,)
+        ).fetchone()
+    return row[0] if row else 0
+
+
+def _version_of(name):
+    # a loader reading several tables is keyed on all their versions
+    if isinstance(name, tuple):
+        return tuple(table_version(table) for table in name)
+    return table_version(name)
+
+
+def _frame_types() -> tuple:
+    # pandas is only imported by the data pages; until then nothing cached
+    # can be a frame, so the login path does not pay for importing it
+    pd = sys.modules.get("pandas")
+    return (pd.DataFrame, pd.Series) if pd is not None else ()
+
+
+def _size_of(value) -> int:
+    frames = _frame_types()
+    if isinstance(value, frames):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, frames[0]) else usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size_of(v) for v in value.values())
+    if dataclasses.is_dataclass(value):
+        return sys.getsizeof(value) + sum(
+            _size_of(getattr(value, f.name)) for f in dataclasses.fields(value)
+        )
+    return sys.getsizeof(value)
+
+
+def _shallow_copy(value):
+    # Callers routinely add/rename columns; never hand out the cached object.
+    if isinstance(value, _frame_types()):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+class VersionedCache:
+    """LRU cache bounded by the estimated memory of its values."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (version, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, version, value, load_seconds: float = 0.0):
+        size = _size_of(value)
+        with self._lock:
+            self.load_seconds += load_seconds
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (version, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def invalidate(self, table: str = None):
+        """Drop entries for `table` (or everything) to free memory early."""
+        with self._lock:
+            for key in [k for k in self._entries
+                        if table is None or k[0] == table
+                        or (isinstance(k[0], tuple) and table in k[0])]:
+                self._bytes -= self._entries.pop(key)[2]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "load_seconds": self.load_seconds,
+            }
+
+
+_cache = VersionedCache()
+
+
+def get_cache() -> VersionedCache:
+    return _cache
+
+
+def cache_stats() -> dict:
+    """Hit/miss, eviction and load-time counters of the shared cache."""
+    return _cache.stats()
+
+
+def invalidate(table: str = None):
+    _cache.invalidate(table)
+
+
+def versioned(table):
+    """
+    Cache a loader on its arguments plus the version of `table`. `table` is
+    a table name, a tuple of names (loaders joining several tables), or a
+    function receiving the loader's arguments and returning one (for
+    loaders that take a domain).
+    """
+    def decorator(func):
+        operation = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            name = table(*args, **kwargs) if callable(table) else table
+            key = (name, func.__module__, func.__qualname__, args,
+                   tuple(sorted(kwargs.items())))
+            version = _version_of(name)
+            found, value = _cache.get(key, version)
+            instrumentation.cache_lookup(operation, found)
+            if not found:
+                started = time.perf_counter()
+                value = func(*args, **kwargs)
+                _cache.put(key, version, value, time.perf_counter() - started)
+            return _shallow_copy(value)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
@@ -0,0 +1,218 @@
+"""
+Incremental (delta) sync of an incident table for the dashboard sessions.
+
+An `IncidentMirror` remembers the table version it last saw. On refresh it
+fetches only rows whose `updated_seq` is above that high-water mark plus
+tombstones for deleted rows (both maintained by triggers, see migrations.py),
+and folds them into a small count cube keyed by
+(severity, status, type, service, day). Metrics and charts are read from
+the cube, so a rerun costs O(changed rows) rather than O(table).
+
+There is one mirror per database, domain and scope in the process,
+shared by every session: the cube and the id -> cell map it needs to move
+updated and deleted rows are held once. The scope is the session role's
+restricted filter (access.py), compiled into the delta query, so a mirror
+never fetches rows outside it; rows edited out of the scope are found by
+id and dropped. A session only keeps an `IncidentSync`, its cursor on the
+shared mirror. The rows themselves come from the shared versioned cache
+(incident_repo.load), not from a per-session copy.
+"""
+import threading
+from collections import Counter, OrderedDict
+
+import pandas as pd
+
+import db_pool
+import incident_repo
+from incident_repo import INCIDENT_TABLES, IncidentFilter, build_where, has_field
+from db_pool import connection
+
+CUBE_COLUMNS = ["severity", "status", "type", "service_name", "day"]
+MAX_MIRRORS = 16        # (database, domain, scope) mirrors kept per process
+
+
+class IncidentMirror:
+    """Process-wide count cube of one incident table (within a scope), updated incrementally."""
+
+    def __init__(self, domain: str, scope: IncidentFilter = None):
+        self.domain = domain
+        self.scope = scope or IncidentFilter()
+        self.table = INCIDENT_TABLES[domain]["table"]
+        self.date_column = INCIDENT_TABLES[domain]["date_column"]
+        service = "service_name" if has_field(domain, "service_name") else "NULL"
+        # only what the cube needs; the day is cut out in SQL
+        self.select = (f"SELECT incident_id, severity, status, type, {service}, "
+                       f"substr({self.date_column}, 1, 10) FROM {self.table}")
+        where_sql, self.scope_params = build_where(domain, self.scope)
+        self.scope_sql = where_sql[len(" WHERE "):]    # empty: every row
+        self.high_water = -1
+        self._keys = {}                # incident_id -> cube key
+        self._cells = {}               # cube key -> itself, so ids share one tuple
+        self._counts = Counter()       # cube key -> incident count
+        self._cube = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """Pull changes since the last refresh; return the rows fetched."""
+        with self._lock:
+            with connection() as conn:
+                conn.execute("BEGIN")  # one snapshot for version + delta
+                version = conn.execute(
+                    "SELECT version FROM table_versions WHERE table_name = ?",
+                    (self.table,),
+                ).fetchone()[0]
+                if version == self.high_water:
+                    return 0
+
+                changed = conn.execute(
+                    f"{self.select} WHERE updated_seq > ?"
+                    + (f" AND {self.scope_sql}" if self.scope_sql else ""),
+                    (self.high_water, *self.scope_params),
+                ).fetchall()
+                # ids only, of changed rows outside the scope (some may have left it)
+                left = set() if not self.scope_sql else {
+                    r[0] for r in conn.execute(
+                        f"SELECT incident_id FROM {self.table} "
+                        f"WHERE updated_seq > ? AND NOT COALESCE({self.scope_sql}, 0)",
+                        (self.high_water, *self.scope_params),
+                    )
+                }
+                deleted = [
+                    r[0] for r in conn.execute(
+                        "SELECT incident_id FROM incident_tombstones "
+                        "WHERE table_name = ? AND seq > ?",
+                        (self.table, self.high_water),
+                    )
+                ]
+
+            removed = 0
+            for incident_id in (*deleted, *left):
+                old = self._keys.pop(incident_id, None)
+                if old is not None:
+                    self._counts[old] -= 1
+                    removed += incident_id in left
+            cells = self._cells
+            for incident_id, *key in changed:
+                key = tuple(key)
+                key = cells.setdefault(key, key)
+                old = self._keys.get(incident_id)
+                if old is not None:
+                    self._counts[old] -= 1   # status change etc.: move the row
+                self._keys[incident_id] = key
+                self._counts[key] += 1
+
+            self.high_water = version
+            self._cube = None
+            return len(changed) + len(deleted) + removed
+
+    def cube(self) -> pd.DataFrame:
+        """Non-empty cube cells as a DataFrame with a `count` column."""
+        with self._lock:
+            if self._cube is None:
+                cells = [(*key, n) for key, n in self._counts.items() if n > 0]
+                self._cube = pd.DataFrame(cells, columns=CUBE_COLUMNS + ["count"])
+            return self._cube
+
+
+_mirrors = OrderedDict()    # (database, domain, scope) -> IncidentMirror
+_mirrors_lock = threading.Lock()
+
+
+def shared_mirror(domain: str, scope: IncidentFilter = None) -> IncidentMirror:
+    """The process-wide mirror of a domain (within `scope`) in the configured database."""
+    scope = scope or IncidentFilter()
+    key = (str(db_pool.get_pool().db_file), domain, scope)
+    with _mirrors_lock:
+        mirror = _mirrors.get(key)
+        if mirror is None:
+            mirror = _mirrors[key] = IncidentMirror(domain, scope)
+            while len(_mirrors) > MAX_MIRRORS:
+                _mirrors.popitem(last=False)
+        _mirrors.move_to_end(key)
+    return mirror
+
+
+class IncidentSync:
+    """One session's cursor on the shared mirror of an incident table."""
+
+    def __init__(self, domain: str, scope: IncidentFilter = None):
+        self.domain = domain
+        self.scope = scope or IncidentFilter()
+        self.mirror = shared_mirror(domain, self.scope)
+        self.date_column = self.mirror.date_column
+        self.high_water = -1
+        self.rows_fetched = 0          # rows pulled by the last refresh
+
+    def refresh(self) -> bool:
+        """Bring the mirror up to date; return True if anything changed since last time."""
+        self.rows_fetched = self.mirror.refresh()
+        version = self.mirror.high_water
+        changed = version != self.high_water
+        self.high_water = version
+        return changed
+
+    # ---------- views ----------
+
+    def cube(self) -> pd.DataFrame:
+        return self.mirror.cube()
+
+    def frame(self) -> pd.DataFrame:
+        """Current rows of the hot table, from the shared versioned cache."""
+        return incident_repo.load(self.domain, filters=self.scope, include_archive=False)
+
+    def _filtered_cube(self, filters: IncidentFilter) -> pd.DataFrame:
+        cube = self.cube()
+        mask = pd.Series(True, index=cube.index)
+        for column, values in (
+            ("severity", filters.severities),
+            ("status", filters.statuses),
+            ("type", filters.types),
+            ("service_name", filters.services if has_field(self.domain, "service_name") else None),
+        ):
+            if values is not None:
+                mask &= cube[column].isin(values)
+        if filters.start_date is not None:
+            mask &= cube["day"] >= filters.start_date.isoformat()
+        if filters.end_date is not None:
+            mask &= cube["day"] <= filters.end_date.isoformat()
+        return cube[mask]
+
+    def metrics(self, filters: IncidentFilter) -> dict:
+        cube = self._filtered_cube(filters)
+        counts = cube["count"]
+        return {
+            "total": int(counts.sum()),
+            "open_investigating": int(counts[cube["status"].isin(["open", "investigating"])].sum()),
+            "high_critical": int(counts[cube["severity"].isin(["high", "critical"])].sum()),
+            "resolved": int(counts[cube["status"] == "resolved"].sum()),
+        }
+
+    def severity_counts(self, filters: IncidentFilter) -> pd.Series:
+        cube = self._filtered_cube(filters)
+        return (
+            cube.groupby("severity")["count"].sum()
+            .sort_values(ascending=False)
+            .astype("int64")
+        )
+
+    def daily_counts(self, filters: IncidentFilter) -> pd.Series:
+        cube = self._filtered_cube(filters).dropna(subset=["day"])
+        series = cube.groupby("day")["count"].sum().astype("int64")
+        series.index = pd.to_datetime(series.index).date
+        series.index.name = self.date_column
+        return series.rename("incident_count")
+
+
+def session_sync(state, domain: str, scope: IncidentFilter = None) -> IncidentSync:
+    """
+    Return the session's IncidentSync (creating it, or replacing it when
+    the scope changed, e.g. after logging in with another role), refreshed.
+    """
+    key = f"incident_sync_{domain}"
+    scope = scope or IncidentFilter()
+    sync = state.get(key)
+    if sync is None or sync.scope != scope:
+        sync = IncidentSync(domain, scope)
+        state[key] = sync
+    sync.refresh()
+    return sync
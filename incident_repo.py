@@ -0,0 +1,420 @@
+"""
+Incident repository: one loader and one writer for every incident domain.
+
+Each domain (cyber, it, ...) is registered with its table, date column and a
+typed field list. Reads coerce dtypes once, inside `read_sql_query`
+(categoricals with process-wide shared dictionaries for the low-cardinality
+columns, datetime64 via parse_dates), only for the projected columns, and
+are cached on the table version. filter_mask() filters a loaded frame on
+the categorical codes.
+Writes normalise values the same way the ingest path does and go through
+one transaction per batch.
+
+Extra domains can be registered from a JSON file (data1/domains.json by
+default), as long as their table already exists:
+
+    {"domains": {"dev": {"table": "dev_incidents", "date_column": "opened_at",
+                         "fields": {"incident_id": "id", "type": "category",
+                                    "severity": "category", "status": "category",
+                                    "opened_at": "datetime"}}}}
+"""
+import json
+import re
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from db_pool import connection
+from incident_cache import invalidate, versioned
+from instrumentation import note_query, timed
+from migrations import ensure_migrated
+
+DATA_DIR = Path("data1")
+DOMAINS_FILE = DATA_DIR / "domains.json"
+
+# Allowed values, enforced by CHECK constraints (see migrations.py)
+SEVERITIES = ["low", "medium", "high", "critical"]
+STATUSES = ["open", "investigating", "resolved", "closed"]
+
+FIELD_KINDS = ("id", "text", "category", "datetime")
+
+# Stored column -> name shown to users
+RENAMES = {"type": "incident_type"}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def normalise_timestamp(value):
+    """Return an ISO 'YYYY-MM-DD HH:MM:SS' string (the stored format) or None."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, str):
+        # Fast path for ISO input (the common case in bulk loads)
+        try:
+            return datetime.fromisoformat(value.strip()).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            pass
+    ts = pd.to_datetime(value, errors="coerce")
+    if pd.isna(ts):
+        raise ValueError(f"Unrecognised date/time: {value!r}")
+    return ts.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ---------- DOMAIN REGISTRY ----------
+
+INCIDENT_TABLES = {}
+
+
+def register_domain(name: str, table: str, date_column: str, fields: dict):
+    """
+    Register (or replace) a domain. `fields` maps each stored column to one
+    of FIELD_KINDS, in display order; it must contain incident_id and the
+    date column.
+    """
+    for identifier in (table, *fields):
+        if not _IDENTIFIER.match(identifier):
+            raise ValueError(f"Invalid SQL identifier: {identifier!r}")
+    if fields.get("incident_id") != "id":
+        raise ValueError(f"Domain {name!r} needs an 'incident_id' field of kind 'id'")
+    if fields.get(date_column) != "datetime":
+        raise ValueError(f"Date column {date_column!r} must be a 'datetime' field")
+    unknown = set(fields.values()) - set(FIELD_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown field kinds for {name!r}: {sorted(unknown)}")
+
+    INCIDENT_TABLES[name] = {
+        "table": table,
+        "date_column": date_column,
+        "fields": dict(fields),
+        "columns": ", ".join(fields),
+    }
+
+
+def load_domain_config(path=DOMAINS_FILE) -> list:
+    """Register the domains listed in a JSON config; missing file is a no-op."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    config = json.loads(path.read_text(encoding="utf-8"))
+    for name, spec in config.get("domains", {}).items():
+        register_domain(name, spec["table"], spec["date_column"], spec["fields"])
+    return list(config.get("domains", {}))
+
+
+register_domain("cyber", "cyber_incidents", "reported_at", {
+    "incident_id": "id",
+    "domain": "category",
+    "type": "category",
+    "severity": "category",
+    "status": "category",
+    "reported_at": "datetime",
+})
+register_domain("it", "it_incidents", "detected_at", {
+    "incident_id": "id",
+    "service_name": "category",
+    "type": "category",
+    "severity": "category",
+    "status": "category",
+    "detected_at": "datetime",
+    "resolved_at": "datetime",
+})
+
+
+def table_for(domain, *args, **kwargs):
+    """Table behind a domain; used as the cache key of domain-keyed loaders."""
+    return INCIDENT_TABLES[domain]["table"]
+
+
+def has_field(domain: str, column: str) -> bool:
+    return column in INCIDENT_TABLES[domain]["fields"]
+
+
+def datetime_columns(domain: str) -> list:
+    fields = INCIDENT_TABLES[domain]["fields"]
+    return [c for c, kind in fields.items() if kind == "datetime"]
+
+
+# ---------- FILTER SPEC ----------
+
+@dataclass(frozen=True)
+class IncidentFilter:
+    """
+    Sidebar filter state. `None` means "no filter"; an empty tuple means
+    nothing is selected, which (like pandas `isin([])`) matches no rows.
+    """
+    severities: Optional[Tuple[str, ...]] = None
+    statuses: Optional[Tuple[str, ...]] = None
+    types: Optional[Tuple[str, ...]] = None
+    services: Optional[Tuple[str, ...]] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+
+def build_where(domain: str, filters: IncidentFilter, date_column: str = None):
+    """Return (where_sql, params) for a filter spec; where_sql may be empty."""
+    date_column = date_column or INCIDENT_TABLES[domain]["date_column"]
+    clauses, params = [], []
+
+    for column, values in (
+        ("severity", filters.severities),
+        ("status", filters.statuses),
+        ("type", filters.types),
+        ("service_name", filters.services if has_field(domain, "service_name") else None),
+    ):
+        if values is None:
+            continue
+        if not values:
+            clauses.append("0")
+            continue
+        clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+
+    # Half-open range on the raw ISO text keeps the comparison sargable.
+    if filters.start_date is not None:
+        clauses.append(f"{date_column} >= ?")
+        params.append(filters.start_date.isoformat())
+    if filters.end_date is not None:
+        clauses.append(f"{date_column} < ?")
+        params.append((filters.end_date + timedelta(days=1)).isoformat())
+
+    where_sql = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where_sql, params
+
+
+# ---------- READS ----------
+# Low-cardinality text columns are categoricals whose category lists are
+# shared process-wide per (table, column): every frame of a column carries
+# the same dictionary, so chunks and cached frames concatenate without
+# falling back to object dtype and filters can work on the integer codes.
+
+READ_CHUNK_ROWS = 100_000
+
+SEVERITY_DTYPE = pd.CategoricalDtype(SEVERITIES, ordered=True)
+STATUS_DTYPE = pd.CategoricalDtype(STATUSES)
+
+_categories = {}   # (table, column) -> CategoricalDtype, only ever extended
+_categories_lock = threading.Lock()
+
+
+def category_dtype(domain: str, column: str, values=()) -> pd.CategoricalDtype:
+    """
+    Shared dtype of a categorical column, extended with any unseen `values`.
+    New categories are appended, so existing codes never change.
+    """
+    if column == "severity":
+        return SEVERITY_DTYPE
+    if column == "status":
+        return STATUS_DTYPE
+    key = (INCIDENT_TABLES[domain]["table"], column)
+    with _categories_lock:
+        dtype = _categories.get(key)
+        known = dtype.categories if dtype is not None else pd.Index([], dtype=object)
+        unseen = pd.Index(pd.unique(pd.Series(values).dropna())).difference(known)
+        if dtype is None or len(unseen):
+            dtype = pd.CategoricalDtype(known.append(unseen.sort_values()))
+            _categories[key] = dtype
+    return dtype
+
+
+def _compact(domain: str, chunk: pd.DataFrame) -> pd.DataFrame:
+    fields = INCIDENT_TABLES[domain]["fields"]
+    for column in chunk.columns:
+        kind = fields[column]
+        if kind == "id":
+            chunk[column] = chunk[column].astype("int64")
+        elif kind == "category":
+            chunk[column] = chunk[column].astype(category_dtype(domain, column, chunk[column]))
+        elif kind == "datetime":
+            if chunk[column].dtype.kind != "M":
+                # parse_dates is skipped for empty results
+                chunk[column] = pd.to_datetime(chunk[column], format="ISO8601", errors="coerce")
+            # one unit everywhere (all-NULL columns parse as seconds)
+            chunk[column] = chunk[column].astype("datetime64[us]")
+    return chunk
+
+
+def _project(domain: str, columns) -> tuple:
+    """Stored column names for a projection given in stored or display names."""
+    fields = INCIDENT_TABLES[domain]["fields"]
+    if columns is None:
+        return tuple(fields)
+    stored = {display: column for column, display in RENAMES.items()}
+    selected = tuple(stored.get(c, c) for c in columns)
+    unknown = [c for c in selected if c not in fields]
+    if unknown:
+        raise ValueError(f"Unknown columns for {domain!r}: {unknown}")
+    return selected
+
+
+@timed()
+@versioned(table_for)
+def _load(domain: str, columns: tuple, filters: IncidentFilter) -> pd.DataFrame:
+    spec = INCIDENT_TABLES[domain]
+    fields = spec["fields"]
+    where_sql, params = build_where(domain, filters)
+    sql = f"SELECT {', '.join(columns)} FROM {spec['table']}{where_sql}"
+    note_query(sql)
+    with connection() as conn:
+        # Chunked so at most READ_CHUNK_ROWS rows exist as Python strings
+        chunks = [
+            _compact(domain, chunk)
+            for chunk in pd.read_sql_query(
+                sql,
+                conn,
+                params=params,
+                parse_dates={
+                    c: {"format": "ISO8601", "errors": "coerce"}
+                    for c in columns if fields[c] == "datetime"
+                },
+                chunksize=READ_CHUNK_ROWS,
+            )
+        ]
+    if not chunks:
+        chunks = [_compact(domain, pd.DataFrame({c: pd.Series([], dtype=object) for c in columns}))]
+    return _concat(domain, chunks).rename(columns=RENAMES)
+
+
+def _concat(domain: str, chunks: list) -> pd.DataFrame:
+    fields = INCIDENT_TABLES[domain]["fields"]
+    stored = {display: column for column, display in RENAMES.items()}
+    # Earlier chunks may predate categories added by later ones
+    for column in chunks[0].columns:
+        if fields[stored.get(column, column)] == "category":
+            dtype = category_dtype(domain, stored.get(column, column))
+            for chunk in chunks:
+                if chunk[column].dtype != dtype:
+                    chunk[column] = chunk[column].cat.set_categories(dtype.categories)
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def load(domain: str, columns=None, filters: IncidentFilter = None,
+         include_archive: bool = True) -> pd.DataFrame:
+    """
+    Incidents of a domain as a typed DataFrame: `columns` projects (stored
+    or display names), `filters` is pushed down into SQL and into the
+    Parquet archive (archive.py), whose matching rows follow the hot ones.
+    With shared snapshots on (snapshots.py) the hot rows come from the
+    memory-mapped snapshot instead, filtered in memory.
+    """
+    import archive   # archive and snapshots build on this module
+    import snapshots
+
+    ensure_migrated()
+    columns, filters = _project(domain, columns), filters or IncidentFilter()
+    if snapshots.ENABLED:
+        hot = snapshots.load(domain, columns, filters)   # shared across processes
+    else:
+        hot = _load(domain, columns, filters)
+    if not include_archive:
+        return hot
+    cold = archive.scan(domain, columns, filters)
+    if cold.empty:
+        return hot
+    cold = _compact(domain, cold.copy()).rename(columns=RENAMES)
+    return _concat(domain, [hot.copy(deep=False), cold])
+
+
+# ---------- IN-MEMORY FILTERS ----------
+
+def codes_mask(series: pd.Series, values) -> np.ndarray:
+    """`series.isin(values)` for a categorical, computed on its integer codes."""
+    categories = series.cat.categories
+    lookup = np.zeros(len(categories) + 1, dtype=bool)   # last slot: NaN (code -1)
+    positions = categories.get_indexer(list(values))
+    lookup[positions[positions >= 0]] = True
+    return lookup[series.cat.codes.to_numpy()]
+
+
+@timed()
+def filter_mask(domain: str, df: pd.DataFrame, filters: IncidentFilter) -> np.ndarray:
+    """Boolean mask of the rows of a loaded frame matching a filter spec."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in (
+        ("severity", filters.severities),
+        ("status", filters.statuses),
+        (RENAMES["type"], filters.types),
+        ("service_name", filters.services if has_field(domain, "service_name") else None),
+    ):
+        if values is not None:
+            mask &= codes_mask(df[column], values)
+    dates = df[INCIDENT_TABLES[domain]["date_column"]]
+    if filters.start_date is not None:
+        mask &= (dates >= pd.Timestamp(filters.start_date)).to_numpy()
+    if filters.end_date is not None:
+        mask &= (dates < pd.Timestamp(filters.end_date + timedelta(days=1))).to_numpy()
+    return mask
+
+
+# ---------- WRITES ----------
+
+def _normalise_row(domain: str, values: dict) -> dict:
+    fields = INCIDENT_TABLES[domain]["fields"]
+    stored = {display: column for column, display in RENAMES.items()}
+    row = {}
+    for key, value in values.items():
+        column = stored.get(key, key)
+        kind = fields.get(column)
+        if kind is None or kind == "id":
+            raise ValueError(f"Cannot write column {key!r} of {domain!r}")
+        if kind == "datetime":
+            value = normalise_timestamp(value)
+        elif column in ("severity", "status") and isinstance(value, str):
+            value = value.strip().lower()
+        row[column] = value
+    return row
+
+
+def prepare_insert(domain: str, values: dict):
+    """Validate and normalise one incident; return (sql, params) inserting it."""
+    row = _normalise_row(domain, values)
+    table = INCIDENT_TABLES[domain]["table"]
+    return (f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+            list(row.values()))
+
+
+def insert(domain: str, values: dict) -> int:
+    """Insert one incident; returns its incident_id."""
+    sql, params = prepare_insert(domain, values)
+    table = INCIDENT_TABLES[domain]["table"]
+    ensure_migrated()
+    with connection() as conn:
+        incident_id = conn.execute(sql, params).lastrowid
+    invalidate(table)
+    return incident_id
+
+
+def insert_many(domain: str, rows, batch_size: int = 1000) -> int:
+    """
+    Insert an iterable of dicts (all with the same keys) in one transaction,
+    `batch_size` rows per executemany; returns the number inserted.
+    """
+    table = INCIDENT_TABLES[domain]["table"]
+    inserted = 0
+    sql = columns = None
+    batch = []
+    ensure_migrated()
+    with connection() as conn:
+        for values in rows:
+            row = _normalise_row(domain, values)
+            if columns is None:
+                columns = list(row)
+                sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                       f"VALUES ({', '.join('?' * len(columns))})")
+            elif list(row) != columns:
+                raise ValueError(f"Row {inserted + len(batch)} has different columns")
+            batch.append([row[c] for c in columns])
+            if len(batch) >= batch_size:
+                conn.executemany(sql, batch)
+                inserted += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(sql, batch)
+            inserted += len(batch)
+    if inserted:
+        invalidate(table)
+    return inserted
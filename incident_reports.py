@@ -0,0 +1,34 @@
+"""
+Saved-view picker for the dashboards.
+
+Lists the domain's saved report views (reports.py) in the sidebar. Picking
+one returns its summary snapshot, which the dashboard renders instead of
+computing the view. A view that has never run gets its snapshot computed
+here once. Views that select rows outside the session's access policy
+(access.py) are not offered.
+"""
+from typing import Optional
+
+import streamlit as st
+
+from access import Policy
+from reports import Snapshot, get_snapshot, list_views, refresh_snapshot
+
+LIVE = "Live filters"
+
+
+def saved_view_picker(domain: str, key: str, policy: Policy) -> Optional[Snapshot]:
+    """The picked saved view's snapshot, or None for the live sidebar filters."""
+    views = {view.name: view for view in list_views(domain)
+             if policy.covers(domain, view.filters)}
+    if not views:
+        return None
+    choice = st.sidebar.selectbox("Saved view", [LIVE, *views], key=key)
+    if choice == LIVE:
+        return None
+    snapshot = get_snapshot(choice)
+    if snapshot is None:
+        snapshot, _ = refresh_snapshot(views[choice])
+    st.sidebar.caption(f"Snapshot of {snapshot.computed_at}: the filters below are not "
+                       f"applied. Run `python reports.py run {choice}` to refresh it.")
+    return snapshot
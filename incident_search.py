@@ -0,0 +1,52 @@
+"""
+Incident search box for the dashboards.
+
+Runs search_index.search for the typed words within the sidebar filters
+and shows one page of results with pager buttons. Changing the words or
+the filters starts again at page 1.
+"""
+import streamlit as st
+
+from instrumentation import span
+from search_index import PAGE_SIZE, search
+
+
+def render_search(domain: str, filters, key: str):
+    """Search box, one page of matching incidents and the pager."""
+    text = st.text_input(
+        "Search incidents", key=f"{key}_text",
+        placeholder="Type, service or domain, e.g. 'pay api' or 'ransomware'",
+    )
+    if not text.strip():
+        return
+
+    state = st.session_state
+    signature = (text.strip(), filters)
+    if state.get(f"{key}_signature") != signature:
+        state[f"{key}_signature"] = signature
+        state[f"{key}_page"] = 0
+    page = state[f"{key}_page"]
+
+    result = search(domain, text, filters, page=page)
+    for word, terms in result.corrections.items():
+        st.caption(f"No matches for '{word}'; showing {', '.join(terms)}.")
+    if not result.total:
+        st.info("No incidents match this search.")
+        return
+
+    with span("render.dataframe", rows=len(result.rows)):
+        st.dataframe(result.rows, use_container_width=True, hide_index=True)
+    first = page * PAGE_SIZE + 1
+    total = f"{result.total:,}" + ("" if result.exact else "+")
+    order = "best matches first" if result.ranked else "newest first"
+    st.caption(f"Results {first}–{page * PAGE_SIZE + len(result.rows)} of {total} ({order})")
+
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("← Previous", disabled=page == 0, key=f"{key}_prev"):
+        state[f"{key}_page"] = page - 1
+        st.rerun()
+    last = page * PAGE_SIZE + len(result.rows) >= result.total and result.exact
+    if next_col.button("Next →", disabled=last or len(result.rows) < PAGE_SIZE,
+                       key=f"{key}_next"):
+        state[f"{key}_page"] = page + 1
+        st.rerun()
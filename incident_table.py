@@ -0,0 +1,68 @@
+"""
+Paginated incident table for the dashboards.
+
+Only one page of rows is fetched and sent to the browser per rerun, using
+keyset pagination (see db_helper.get_incidents_page). The cursors of the
+pages already visited are kept in session state so "Previous" is a seek
+too. Changing the filters, sort or page size starts again at page 1.
+
+`table_request` draws the controls and says which page to fetch; the page
+itself comes from analytics.dashboard_view and is drawn by
+`render_table_page`.
+"""
+import streamlit as st
+
+from analytics import TableRequest
+from incident_repo import INCIDENT_TABLES
+from instrumentation import span
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def table_request(domain: str, filters, key: str) -> TableRequest:
+    """Draw sort / page-size controls; return the request for the current page."""
+    columns = list(INCIDENT_TABLES[domain]["fields"])
+    date_column = INCIDENT_TABLES[domain]["date_column"]
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    sort_column = c1.selectbox(
+        "Sort by", columns, index=columns.index(date_column), key=f"{key}_sort"
+    )
+    descending = c2.radio(
+        "Order", ["Newest / Z–A", "Oldest / A–Z"], key=f"{key}_order"
+    ) == "Newest / Z–A"
+    page_size = c3.selectbox("Rows per page", PAGE_SIZES, index=2, key=f"{key}_size")
+
+    # cursors[i] is the seek position of page i (page 0 starts at None)
+    signature = (filters, sort_column, descending, page_size)
+    state = st.session_state
+    if state.get(f"{key}_signature") != signature:
+        state[f"{key}_signature"] = signature
+        state[f"{key}_cursors"] = [None]
+    return TableRequest(page_size=page_size, sort_column=sort_column,
+                        descending=descending, after=state[f"{key}_cursors"][-1])
+
+
+def render_table_page(view, table: TableRequest, key: str):
+    """Draw one page of a DashboardView plus the pager buttons."""
+    cursors = st.session_state[f"{key}_cursors"]
+    page = len(cursors) - 1
+    df = view.page
+    with span("render.dataframe", rows=len(df)):
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+    first = page * table.page_size + 1 if len(df) else 0
+    caption = f"Rows {first}–{page * table.page_size + len(df)} of {view.total_rows}"
+    archived = view.archived_metrics["total"]
+    if archived:
+        caption += f" (+{archived} archived matches, counted in the metrics and charts)"
+    st.caption(caption)
+
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("← Previous", disabled=page == 0, key=f"{key}_prev"):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next →", disabled=view.next_cursor is None, key=f"{key}_next"):
+        cursors.append(view.next_cursor)
+        st.rerun()
+
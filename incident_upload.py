@@ -0,0 +1,61 @@
+"""
+Bulk incident import widget for the dashboards.
+
+Accepts CSV, JSONL or Parquet uploads and streams them through
+db_helper.import_incidents: rows are validated and normalised chunk by
+chunk, written in batched transactions, and rejected rows are listed with
+their line (or row) number. Rows outside the uploader's role scope, or
+updates of incidents outside it, are rejected too. The dashboard reruns
+once at the end.
+"""
+import pandas as pd
+import streamlit as st
+
+from db_helper import import_incidents
+from ingest import FILE_FORMATS
+
+MODES = {
+    "Add as new incidents": "append",
+    "Update by incident_id": "upsert",
+}
+
+
+def render_bulk_upload(domain: str, key: str, scope=None):
+    """File picker, import button, progress bar and the last import's report."""
+    last = st.session_state.pop(f"{key}_report", None)
+    if last is not None:
+        loaded, rejected, errors, elapsed = last
+        st.success(f"Imported {loaded:,} incidents in {elapsed:.1f}s.")
+        if rejected:
+            st.warning(f"{rejected:,} rows were rejected"
+                       + (f" (first {len(errors)} listed)." if len(errors) < rejected else "."))
+            st.dataframe(pd.DataFrame(errors, columns=["line", "error"]),
+                         use_container_width=True, hide_index=True)
+
+    with st.expander("Bulk import from file"):
+        uploaded = st.file_uploader(
+            "CSV, JSONL or Parquet export",
+            type=sorted(ext.lstrip(".") for ext in FILE_FORMATS),
+            key=f"{key}_file",
+        )
+        mode = st.radio("Import mode", list(MODES), horizontal=True, key=f"{key}_mode")
+        if not st.button("Import", disabled=uploaded is None, key=f"{key}_import"):
+            return
+
+        bar = st.progress(0.0, text="Importing…")
+
+        def progress(report, fraction):
+            bar.progress(fraction, text=f"{report.rows_loaded:,} rows imported, "
+                                        f"{report.rows_rejected:,} rejected")
+
+        try:
+            report = import_incidents(domain, uploaded, uploaded.name, MODES[mode], progress,
+                                      scope=scope)
+        except ValueError as exc:       # unsupported file / missing columns
+            st.error(f"Import failed: {exc}")
+            return
+
+    st.session_state[f"{key}_report"] = (
+        report.rows_loaded, report.rows_rejected, report.errors, report.elapsed
+    )
+    st.rerun()
@@ -0,0 +1,538 @@
+"""
+Streaming ingestion for cyber_incidents and it_incidents.
+
+The file is read in bounded-memory chunks; each chunk is validated and
+normalised row by row, then written with executemany in one transaction
+together with a checkpoint (the byte offset and line reached). After a
+crash, `--resume` continues from the last committed chunk, and rejected
+rows are still reported with their line in the file.
+
+    python ingest.py data1/incidents.csv --domain cyber
+    python ingest.py siem_export.csv --domain it --mode upsert --resume
+
+Modes:
+    append   insert every row as a new incident (source ids are ignored)
+    upsert   insert or update by the source incident_id (the natural key)
+    replace  empty the table first, then insert keeping source ids
+
+`ingest_file` takes an open CSV, JSONL or Parquet stream instead (dashboard
+uploads); it uses the same validation and batched writes, without
+checkpoints. Given the uploader's `scope` (their role's restricted filter,
+access.py), it rejects rows whose new values fall outside it and, when
+upserting, rows whose existing incident does.
+"""
+import argparse
+import csv
+import json
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from incident_repo import SEVERITIES, STATUSES, IncidentFilter, build_where, normalise_timestamp
+from db_pool import connection
+from incident_cache import invalidate
+from migrations import add_rollup_counts, add_search_rows, migrate
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet uploads need pyarrow
+    pq = None
+
+CHUNK_SIZE = 50_000
+MAX_REPORTED_ERRORS = 20
+
+# file extension -> format understood by ingest_file
+FILE_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl", ".ndjson": "jsonl",
+    ".parquet": "parquet", ".pq": "parquet",
+}
+
+SEVERITY_ALIASES = {
+    "info": "low", "informational": "low", "minor": "low",
+    "med": "medium", "moderate": "medium",
+    "major": "high", "severe": "high",
+    "crit": "critical", "urgent": "critical",
+}
+STATUS_ALIASES = {
+    "new": "open", "reopened": "open",
+    "in progress": "investigating", "in_progress": "investigating",
+    "triage": "investigating", "acknowledged": "investigating",
+    "fixed": "resolved", "done": "resolved", "mitigated": "resolved",
+}
+
+
+# ---------- FIELD NORMALISERS ----------
+
+def _text(value):
+    value = (value or "").strip()
+    return value or None
+
+
+def _severity(value):
+    value = (value or "").strip().lower()
+    value = SEVERITY_ALIASES.get(value, value)
+    if value not in SEVERITIES:
+        raise ValueError(f"unknown severity {value!r}")
+    return value
+
+
+def _status(value):
+    value = (value or "").strip().lower()
+    value = STATUS_ALIASES.get(value, value)
+    if value not in STATUSES:
+        raise ValueError(f"unknown status {value!r}")
+    return value
+
+
+def _incident_id(value):
+    value = (value or "").strip()
+    return int(value) if value else None
+
+
+# column -> (normaliser, accepted CSV header names)
+DOMAINS = {
+    "cyber": {
+        "table": "cyber_incidents",
+        "columns": {
+            "domain": (lambda v: _text(v) or "cybersecurity", ("domain",)),
+            "type": (_text, ("type", "incident_type")),
+            "severity": (_severity, ("severity",)),
+            "status": (_status, ("status",)),
+            "reported_at": (normalise_timestamp, ("reported_at", "timestamp", "date")),
+        },
+    },
+    "it": {
+        "table": "it_incidents",
+        "columns": {
+            "service_name": (_text, ("service_name", "service")),
+            "type": (_text, ("type", "incident_type")),
+            "severity": (_severity, ("severity",)),
+            "status": (_status, ("status",)),
+            "detected_at": (normalise_timestamp, ("detected_at",)),
+            "resolved_at": (normalise_timestamp, ("resolved_at",)),
+        },
+    },
+}
+
+
+class IngestReport:
+    """Counters printed at the end of a run."""
+
+    def __init__(self, max_errors: int = MAX_REPORTED_ERRORS):
+        self.max_errors = max_errors
+        self.rows_loaded = 0
+        self.rows_rejected = 0
+        self.lines_read = 0             # CSV lines consumed, header included
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_loaded / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, line_no: int, message: str):
+        self.rows_rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line_no, message))
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, if the OS reports it."""
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if peak > 1 << 32 else peak / 1024
+
+
+# ---------- ACCESS SCOPE ----------
+
+def _check_scope(domain, row, scope):
+    """Raise ValueError if a normalised row's values fall outside `scope`."""
+    if scope is None:
+        return
+    values = dict(zip(DOMAINS[domain]["columns"], row[1:]))
+    for column, allowed in (("severity", scope.severities), ("status", scope.statuses),
+                            ("type", scope.types), ("service_name", scope.services)):
+        if allowed is not None and column in values and values[column] not in allowed:
+            raise ValueError(f"{column} {values[column]!r} is outside your role's access")
+
+
+def _drop_hidden_targets(conn, domain, rows, scope, report):
+    """Rows without an existing incident outside `scope`; the others are rejected."""
+    where_sql, params = build_where(domain, scope)
+    ids = [row[0] for row in rows if row[0] is not None]
+    if not where_sql or not ids:
+        return rows
+    table = DOMAINS[domain]["table"]
+    hidden = set()
+    for start in range(0, len(ids), 500):           # stay under SQLite's variable limit
+        batch = ids[start:start + 500]
+        hidden.update(r[0] for r in conn.execute(
+            f"SELECT incident_id FROM {table} WHERE incident_id IN "
+            f"({', '.join('?' * len(batch))}) AND NOT COALESCE({where_sql[len(' WHERE '):]}, 0)",
+            (*batch, *params),
+        ))
+    for incident_id in sorted(hidden):
+        report.reject(None, f"incident {incident_id} is outside your role's access")
+    return [row for row in rows if row[0] not in hidden]
+
+
+# ---------- READING ----------
+
+def _lines(handle, position):
+    """
+    Yield decoded lines and keep position at [byte offset, line number]
+    reached.
+    """
+    for raw in iter(handle.readline, b""):
+        position[0] += len(raw)
+        position[1] += 1
+        yield raw.decode("utf-8-sig" if position[0] == len(raw) else "utf-8")
+
+
+def _header_map(header, domain):
+    """Map each table column to its index in the CSV header."""
+    positions = {name.strip().lower(): i for i, name in enumerate(header)}
+    mapping = {}
+    for column, (_, aliases) in DOMAINS[domain]["columns"].items():
+        for alias in aliases:
+            if alias in positions:
+                mapping[column] = positions[alias]
+                break
+    missing = {"severity", "status"} - mapping.keys()
+    if missing:
+        raise ValueError(f"CSV is missing required column(s): {', '.join(sorted(missing))}")
+    return mapping, positions.get("incident_id")
+
+
+def iter_chunks(path, domain, chunk_size=CHUNK_SIZE, start_offset=0, report=None):
+    """
+    Yield (rows, byte_offset) chunks of normalised tuples, in table column
+    order with the source incident_id first. Rejected rows go to `report`.
+    """
+    with open(path, "rb") as handle:
+        yield from _csv_chunks(handle, domain, chunk_size, start_offset, report)
+
+
+def _csv_chunks(handle, domain, chunk_size, start_offset=0, report=None, scope=None):
+    report = report or IngestReport()
+    columns = DOMAINS[domain]["columns"]
+    position = [0, 0]
+    reader = csv.reader(_lines(handle, position))
+    header = next(reader, None)
+    if header is None:
+        return
+    mapping, id_index = _header_map(header, domain)
+
+    if start_offset > position[0]:
+        # resuming: the reader starts over, so lines count on from the checkpoint's
+        handle.seek(start_offset)
+        position[:] = [start_offset, report.lines_read]
+        reader = csv.reader(_lines(handle, position))
+
+    chunk = []
+    for record in reader:
+        if not record:
+            continue
+        try:
+            row = [_incident_id(record[id_index]) if id_index is not None else None]
+            for column, (normalise, _) in columns.items():
+                index = mapping.get(column)
+                row.append(normalise(record[index] if index is not None else None))
+            _check_scope(domain, row, scope)
+            chunk.append(tuple(row))
+        except (ValueError, IndexError) as exc:
+            report.reject(position[1], str(exc))
+        if len(chunk) >= chunk_size:
+            report.lines_read = position[1]
+            yield chunk, position[0]
+            chunk = []
+    report.lines_read = position[1]
+    if chunk or position[0] > start_offset:
+        yield chunk, position[0]
+
+
+def _raw_text(value):
+    # JSON numbers / Parquet values -> the text the normalisers expect
+    if value is None or isinstance(value, (str, datetime, date)):
+        return value
+    return str(value)
+
+
+def _record_row(record: dict, domain):
+    """Normalised tuple (like a CSV row) from one JSON / Parquet record."""
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    fields = {str(k).strip().lower(): v for k, v in record.items()}
+    incident_id = fields.get("incident_id")
+    row = [_incident_id(str(incident_id)) if incident_id is not None else None]
+    for column, (normalise, aliases) in DOMAINS[domain]["columns"].items():
+        value = next((fields[a] for a in aliases if a in fields), None)
+        row.append(normalise(_raw_text(value)))
+    return tuple(row)
+
+
+def _jsonl_chunks(handle, domain, chunk_size, report, scope=None):
+    position, chunk = [0, 0], []
+    for line_no, line in enumerate(_lines(handle, position), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = _record_row(json.loads(line), domain)
+            _check_scope(domain, row, scope)
+            chunk.append(row)
+        except ValueError as exc:      # includes JSONDecodeError
+            report.reject(line_no, str(exc))
+        if len(chunk) >= chunk_size:
+            yield chunk, position[0]
+            chunk = []
+    yield chunk, position[0]
+
+
+def _parquet_chunks(handle, domain, chunk_size, report, scope=None):
+    if pq is None:
+        raise ValueError("Parquet files need the pyarrow package.")
+    parquet = pq.ParquetFile(handle)
+    names = {n.lower() for n in parquet.schema_arrow.names}
+    missing = {"severity", "status"} - names
+    if missing:
+        raise ValueError(f"File is missing required column(s): {', '.join(sorted(missing))}")
+    rows_read = 0
+    for batch in parquet.iter_batches(batch_size=chunk_size):
+        chunk = []
+        for record in batch.to_pylist():
+            rows_read += 1
+            try:
+                row = _record_row(record, domain)
+                _check_scope(domain, row, scope)
+                chunk.append(row)
+            except ValueError as exc:
+                report.reject(rows_read, str(exc))
+        yield chunk, rows_read
+
+
+# ---------- WRITING ----------
+
+def _insert_sql(domain, mode):
+    table = DOMAINS[domain]["table"]
+    columns = list(DOMAINS[domain]["columns"])
+    all_columns = ["incident_id"] + columns
+    placeholders = ", ".join("?" * len(all_columns))
+    sql = f"INSERT INTO {table} ({', '.join(all_columns)}) VALUES ({placeholders})"
+    if mode == "upsert":
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns)
+        sql += f" ON CONFLICT(incident_id) DO UPDATE SET {updates}"
+    return sql
+
+
+def _write_chunk(conn, table, mode, insert_sql, rows, first_chunk):
+    # Hold the write lock from the MAX(incident_id) read below to the
+    # insert, so no other writer's row falls in this chunk's id range
+    # (sqlite3 would only BEGIN at the first INSERT).
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    if first_chunk and mode == "replace":
+        # Empty the search index in one step rather than row by row; the
+        # new rows are indexed by the triggers as they arrive.
+        conn.execute("INSERT INTO search_suspend (flag) VALUES (1)")
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"INSERT INTO {table}_search ({table}_search) VALUES ('delete-all')")
+        conn.execute("DELETE FROM search_suspend")
+    if mode != "append":
+        conn.executemany(insert_sql, rows)
+        return
+    # New rows only: skip the per-row rollup and search triggers and add
+    # the chunk to the rollups (one GROUP BY) and the index in bulk instead.
+    rows = [(None,) + row[1:] for row in rows]
+    last_id = conn.execute(f"SELECT COALESCE(MAX(incident_id), 0) FROM {table}").fetchone()[0]
+    conn.execute("INSERT INTO rollup_suspend (flag) VALUES (1)")
+    conn.execute("INSERT INTO search_suspend (flag) VALUES (1)")
+    conn.executemany(insert_sql, rows)
+    conn.execute("DELETE FROM rollup_suspend")
+    conn.execute("DELETE FROM search_suspend")
+    add_rollup_counts(conn, table, last_id)
+    add_search_rows(conn, table, last_id)
+
+
+def _load_checkpoint(conn, source, target, stat):
+    row = conn.execute(
+        "SELECT byte_offset, rows_loaded, rows_rejected, line_no, file_size, file_mtime "
+        "FROM ingest_checkpoints WHERE source = ? AND target = ?",
+        (source, target),
+    ).fetchone()
+    if row is None:
+        return None
+    if row[4] != stat.st_size or row[5] != stat.st_mtime:
+        raise ValueError(
+            f"{source} changed since the last checkpoint; rerun without --resume."
+        )
+    return row
+
+
+def ingest_csv(path, domain, mode="append", chunk_size=CHUNK_SIZE, resume=False,
+               progress=None) -> IngestReport:
+    """
+    Stream `path` into the domain's table. `progress(report, byte_offset,
+    file_size)` is called after each committed chunk.
+    """
+    if domain not in DOMAINS:
+        raise ValueError(f"Unknown domain {domain!r}; choose from {sorted(DOMAINS)}")
+    if mode not in ("append", "upsert", "replace"):
+        raise ValueError(f"Unknown mode {mode!r}")
+
+    migrate()
+    path = Path(path)
+    source = str(path.resolve())
+    table = DOMAINS[domain]["table"]
+    stat = path.stat()
+    report = IngestReport()
+    start_offset = 0
+
+    with connection() as conn:
+        if resume:
+            checkpoint = _load_checkpoint(conn, source, table, stat)
+            if checkpoint is not None:
+                (start_offset, report.rows_loaded, report.rows_rejected,
+                 report.lines_read) = checkpoint[:4]
+        else:
+            conn.execute(
+                "DELETE FROM ingest_checkpoints WHERE source = ? AND target = ?",
+                (source, table),
+            )
+
+    insert_sql = _insert_sql(domain, mode)
+    first_chunk = start_offset == 0
+    for rows, offset in iter_chunks(path, domain, chunk_size, start_offset, report):
+        with connection() as conn:
+            _write_chunk(conn, table, mode, insert_sql, rows, first_chunk)
+            first_chunk = False
+            report.rows_loaded += len(rows)
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO ingest_checkpoints
+                    (source, target, byte_offset, rows_loaded, rows_rejected,
+                     line_no, file_size, file_mtime, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+                """,
+                (source, table, offset, report.rows_loaded, report.rows_rejected,
+                 report.lines_read, stat.st_size, stat.st_mtime),
+            )
+        if progress is not None:
+            progress(report, offset, stat.st_size)
+
+    invalidate(table)
+    report.elapsed = time.perf_counter() - report.started
+    return report
+
+
+def _total(handle, file_format):
+    """Bytes in the stream, or rows for Parquet (the unit of its positions)."""
+    if file_format == "parquet":
+        if pq is None:
+            raise ValueError("Parquet files need the pyarrow package.")
+        total = pq.ParquetFile(handle).metadata.num_rows
+    else:
+        handle.seek(0, 2)
+        total = handle.tell()
+    handle.seek(0)
+    return total
+
+
+def ingest_file(handle, domain, file_format, mode="append", chunk_size=CHUNK_SIZE,
+                progress=None, max_errors=MAX_REPORTED_ERRORS,
+                scope: IncidentFilter = None) -> IngestReport:
+    """
+    Stream an open, seekable binary `handle` in `file_format` ("csv",
+    "jsonl" or "parquet") into the domain's table, one transaction per
+    chunk. Bad rows are rejected individually into the report, and so are
+    rows outside `scope` (the uploader's restricted filter) or, when
+    upserting, whose existing incident is. `progress(report,
+    fraction_done)` is called after each chunk.
+    """
+    if domain not in DOMAINS:
+        raise ValueError(f"Unknown domain {domain!r}; choose from {sorted(DOMAINS)}")
+    if mode not in ("append", "upsert", "replace"):
+        raise ValueError(f"Unknown mode {mode!r}")
+    readers = {"csv": _csv_chunks, "jsonl": _jsonl_chunks, "parquet": _parquet_chunks}
+    if file_format not in readers:
+        raise ValueError(f"Unknown file format {file_format!r}; choose from {sorted(readers)}")
+    if scope == IncidentFilter():
+        scope = None                    # every row: nothing to check
+    if scope is not None and mode == "replace":
+        raise ValueError("Replacing the table needs access to every incident.")
+
+    migrate()
+    table = DOMAINS[domain]["table"]
+    total = _total(handle, file_format)
+    report = IngestReport(max_errors)
+    insert_sql = _insert_sql(domain, mode)
+    first_chunk = True
+    for rows, position in readers[file_format](handle, domain, chunk_size,
+                                               report=report, scope=scope):
+        with connection() as conn:
+            if scope is not None and mode == "upsert":
+                # under the write lock, so the targets cannot change before the upsert
+                conn.execute("BEGIN IMMEDIATE")
+                rows = _drop_hidden_targets(conn, domain, rows, scope, report)
+            _write_chunk(conn, table, mode, insert_sql, rows, first_chunk)
+        first_chunk = False
+        report.rows_loaded += len(rows)
+        if progress is not None:
+            progress(report, min(1.0, position / total) if total else 1.0)
+
+    # one cache refresh for the whole file, not one per row
+    invalidate(table)
+    report.elapsed = time.perf_counter() - report.started
+    return report
+
+
+def file_format_of(filename) -> str:
+    """Format name for a file's extension, e.g. 'export.JSONL' -> 'jsonl'."""
+    suffix = Path(filename).suffix.lower()
+    if suffix not in FILE_FORMATS:
+        raise ValueError(
+            f"Unsupported file type {suffix or filename!r}; use {', '.join(sorted(FILE_FORMATS))}"
+        )
+    return FILE_FORMATS[suffix]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stream a CSV export into cyber_incidents or it_incidents."
+    )
+    parser.add_argument("csv_file", type=Path)
+    parser.add_argument("--domain", choices=sorted(DOMAINS), required=True)
+    parser.add_argument("--mode", choices=["append", "upsert", "replace"], default="append")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the last committed checkpoint")
+    args = parser.parse_args()
+
+    def progress(report, offset, size):
+        pct = 100 * offset / size if size else 100
+        print(f"  {pct:5.1f}%  {report.rows_loaded:>12,} rows", end="\r", flush=True)
+
+    report = ingest_csv(args.csv_file, args.domain, args.mode, args.chunk_size,
+                        args.resume, progress)
+    print()
+    print(f"✅ Loaded {report.rows_loaded:,} rows into {DOMAINS[args.domain]['table']} "
+          f"in {report.elapsed:.2f}s ({report.rows_per_sec:,.0f} rows/s)")
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"   Peak RSS: {rss:.1f} MB")
+    if report.rows_rejected:
+        print(f"❌ Rejected {report.rows_rejected:,} rows, first errors:")
+        for line_no, message in report.errors:
+            print(f"   line {line_no}: {message}")
+
+
+if __name__ == "__main__":
+    main()
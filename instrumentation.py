@@ -0,0 +1,358 @@
+"""
+In-process timings for database queries, page renders and other hot spots.
+
+`span("name")` (a context manager) and `@timed()` (a decorator) record how
+long an operation took into a histogram per operation. The histograms have
+fixed, log-spaced buckets (0.1 ms to about a minute), so memory stays
+constant however long the server runs and p50/p95/p99 are read off the
+bucket counts, like Prometheus' histogram_quantile. Inside a span,
+`note_query(sql)` attaches the SQL it ran; the SLOW_QUERIES slowest spans
+with a query are kept with their text and row count.
+
+The versioned cache (incident_cache) reports a hit or miss per loader and
+app.py times every page's show(), one span per rerun. Everything is
+process-wide, like the cache, and exported by `snapshot()` (JSON) and
+`to_prometheus()`. Set CW2_METRICS_PORT to also serve both over HTTP for
+scraping; CW2_INSTRUMENTATION=0 turns recording off. The endpoint has no
+authentication and shows SQL text, so it listens on 127.0.0.1 unless
+CW2_METRICS_HOST names another interface (e.g. 0.0.0.0 behind a firewall
+that only lets the scraper in).
+
+    CW2_METRICS_PORT=9464 streamlit run app.py
+    curl localhost:9464/metrics          # Prometheus text format
+    curl localhost:9464/metrics.json
+"""
+import bisect
+import functools
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("CW2_INSTRUMENTATION", "1") != "0"
+METRICS_PORT = os.environ.get("CW2_METRICS_PORT")
+METRICS_HOST = os.environ.get("CW2_METRICS_HOST", "127.0.0.1")
+SLOW_QUERIES = 25
+MAX_QUERY_CHARS = 2000
+
+# Upper bucket bounds in seconds: 0.1 ms, x sqrt(2) per bucket, up to ~74 s
+BUCKETS = tuple(0.0001 * 2 ** (i / 2) for i in range(40))
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their count, sum and max."""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)   # last slot: over the top bound
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Estimate of the q-quantile, interpolated within its bucket."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class Operation:
+    """Everything recorded for one operation name."""
+
+    __slots__ = ("histogram", "rows", "errors", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.rows = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class Span:
+    """The operation being timed; set `.rows` or `.query` before it ends."""
+
+    __slots__ = ("operation", "query", "rows")
+
+    def __init__(self, operation: str, query: str = None, rows: int = None):
+        self.operation = operation
+        self.query = query
+        self.rows = rows
+
+
+class Store:
+    """Thread-safe histograms per operation and the slow-query log."""
+
+    def __init__(self, slow_queries: int = SLOW_QUERIES):
+        self.slow_queries = slow_queries
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._operations = {}
+            self._slow = []         # min-heap of (seconds, sequence, entry)
+            self.started = time.time()
+
+    def _operation(self, name: str) -> Operation:
+        operation = self._operations.get(name)
+        if operation is None:
+            operation = self._operations[name] = Operation()
+        return operation
+
+    def record(self, name: str, seconds: float, rows: int = None, query: str = None,
+               error: bool = False):
+        with self._lock:
+            operation = self._operation(name)
+            operation.histogram.observe(seconds)
+            operation.rows += rows or 0
+            operation.errors += error
+            if query is None:
+                return
+            if len(self._slow) < self.slow_queries or seconds > self._slow[0][0]:
+                entry = {"operation": name, "seconds": seconds, "rows": rows,
+                         "query": query, "at": time.time()}
+                item = (seconds, next(self._sequence), entry)
+                if len(self._slow) < self.slow_queries:
+                    heapq.heappush(self._slow, item)
+                else:
+                    heapq.heapreplace(self._slow, item)
+
+    def cache_lookup(self, name: str, hit: bool):
+        with self._lock:
+            operation = self._operation(name)
+            if hit:
+                operation.cache_hits += 1
+            else:
+                operation.cache_misses += 1
+
+    def snapshot(self) -> dict:
+        """Per-operation summary, slowest queries and reruns per page."""
+        with self._lock:
+            operations = {}
+            for name, op in sorted(self._operations.items()):
+                h = op.histogram
+                operations[name] = {
+                    "count": h.count,
+                    "sum_seconds": h.sum,
+                    "p50_seconds": h.quantile(0.50),
+                    "p95_seconds": h.quantile(0.95),
+                    "p99_seconds": h.quantile(0.99),
+                    "max_seconds": h.max,
+                    "rows": op.rows,
+                    "errors": op.errors,
+                    "cache_hits": op.cache_hits,
+                    "cache_misses": op.cache_misses,
+                }
+            slow = [entry for _, _, entry in sorted(self._slow, reverse=True)]
+            return {
+                "started": self.started,
+                "operations": operations,
+                "slow_queries": slow,
+                "reruns": {name[len("page."):]: op["count"]
+                           for name, op in operations.items() if name.startswith("page.")},
+            }
+
+    def prometheus(self) -> str:
+        """The store in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._operations.items())
+            lines = [
+                "# HELP cw2_operation_seconds Time spent in each instrumented operation.",
+                "# TYPE cw2_operation_seconds histogram",
+            ]
+            for name, op in items:
+                label = f'operation="{_escape(name)}"'
+                cumulative = 0
+                for bound, n in zip(BUCKETS, op.histogram.counts):
+                    cumulative += n
+                    lines.append(f'cw2_operation_seconds_bucket{{{label},le="{bound:.6g}"}} '
+                                 f"{cumulative}")
+                lines.append(f'cw2_operation_seconds_bucket{{{label},le="+Inf"}} '
+                             f"{op.histogram.count}")
+                lines.append(f"cw2_operation_seconds_sum{{{label}}} {op.histogram.sum:.9g}")
+                lines.append(f"cw2_operation_seconds_count{{{label}}} {op.histogram.count}")
+
+            def counter(metric, help_text, values):
+                lines.extend([f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"])
+                lines.extend(f"{metric}{{{labels}}} {value}" for labels, value in values)
+
+            counter("cw2_operation_rows_total", "Rows returned by each operation.",
+                    [(f'operation="{_escape(n)}"', op.rows) for n, op in items])
+            counter("cw2_operation_errors_total", "Operations that raised an exception.",
+                    [(f'operation="{_escape(n)}"', op.errors) for n, op in items])
+            counter("cw2_cache_lookups_total", "Versioned cache lookups by result.",
+                    [(f'operation="{_escape(n)}",result="{result}"', count)
+                     for n, op in items if op.cache_hits or op.cache_misses
+                     for result, count in (("hit", op.cache_hits), ("miss", op.cache_misses))])
+            counter("cw2_reruns_total", "Streamlit reruns (page renders) per page.",
+                    [(f'page="{_escape(n[len("page."):])}"', op.histogram.count)
+                     for n, op in items if n.startswith("page.")])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_store = Store()
+_local = threading.local()
+
+
+def get_store() -> Store:
+    return _store
+
+
+def _spans() -> list:
+    stack = getattr(_local, "spans", None)
+    if stack is None:
+        stack = _local.spans = []
+    return stack
+
+
+@contextmanager
+def span(operation: str, query: str = None, rows: int = None):
+    """Time the block as `operation`; yields the Span to attach rows / SQL to."""
+    current = Span(operation, query, rows)
+    if not ENABLED:
+        yield current
+        return
+    stack = _spans()
+    stack.append(current)
+    error = False
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception:
+        error = True
+        raise
+    finally:
+        # Streamlit's rerun/stop are BaseExceptions: timed, not counted as errors
+        seconds = time.perf_counter() - started
+        stack.pop()
+        _store.record(operation, seconds, current.rows, current.query, error)
+
+
+def note_query(sql: str, rows: int = None):
+    """Attach SQL (and optionally its row count) to this thread's current span."""
+    stack = getattr(_local, "spans", None)
+    if not stack:
+        return
+    current = stack[-1]
+    sql = " ".join(sql.split())[:MAX_QUERY_CHARS]
+    current.query = sql if current.query is None else f"{current.query}; {sql}"
+    if rows is not None:
+        current.rows = (current.rows or 0) + rows
+
+
+def _row_count(result):
+    if isinstance(result, tuple) and result:    # (page, cursor) style results
+        result = result[0]
+    shape = getattr(result, "shape", None)
+    if shape:
+        return int(shape[0])
+    if isinstance(result, list):
+        return len(result)
+    return None
+
+
+def timed(operation: str = None, rows=_row_count):
+    """
+    Decorator form of span(); the operation defaults to 'module.function',
+    the name the versioned cache reports hits under. `rows(result)` gives
+    the row count when the function did not note one itself.
+    """
+    def decorator(func):
+        name = operation or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name) as current:
+                result = func(*args, **kwargs)
+                if current.rows is None:
+                    current.rows = rows(result)
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def cache_lookup(operation: str, hit: bool):
+    if ENABLED:
+        _store.cache_lookup(operation, hit)
+
+
+def snapshot() -> dict:
+    return _store.snapshot()
+
+
+def to_json(indent: int = 2) -> str:
+    return json.dumps(snapshot(), indent=indent, default=str)
+
+
+def to_prometheus() -> str:
+    return _store.prometheus()
+
+
+def reset():
+    _store.reset()
+
+
+# ---------- HTTP EXPORT ----------
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics and /metrics.json from a daemon thread (once per process)."""
+    global _server
+    if not port:
+        return None
+    # imported here: http.server is only needed when metrics are served
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = to_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = to_json(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics",
+                             daemon=True).start()
+    return _server
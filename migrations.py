@@ -0,0 +1,605 @@
+"""
+Versioned schema migrations for data1/cw2.db.
+
+The applied version lives in `PRAGMA user_version`. Pending migrations run
+in one write transaction together with the version bump, so `migrate()` is
+safe to call on every start-up and upgrades an existing database in place.
+
+    python migrations.py            # upgrade to latest
+    python migrations.py --status   # show current / latest version
+"""
+import argparse
+import sqlite3
+import threading
+
+from db_pool import connection, get_pool
+
+
+def _statements(script: str):
+    """Split a script into statements (trigger bodies contain ';' too)."""
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                yield buffer.strip()
+            buffer = ""
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def _columns(conn, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+# ---------- MIGRATIONS ----------
+# Never edit a migration once released; add a new one instead.
+
+def _m001_baseline(conn):
+    """Tables as created by the original db_helper / db_setup / it_db."""
+    for sql in _statements("""
+        CREATE TABLE IF NOT EXISTS users(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password_hash TEXT,
+            role TEXT
+        );
+        CREATE TABLE IF NOT EXISTS cyber_incidents(
+            incident_id INTEGER PRIMARY KEY,
+            domain TEXT,
+            type TEXT,
+            severity TEXT,
+            status TEXT,
+            reported_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS it_incidents(
+            incident_id INTEGER PRIMARY KEY,
+            service_name TEXT,
+            type TEXT,
+            severity TEXT,
+            status TEXT,
+            detected_at TEXT,
+            resolved_at TEXT
+        );
+    """):
+        conn.execute(sql)
+
+
+# Lower-cases and trims; values outside the enum become NULL.
+_SEVERITY_SQL = (
+    "CASE WHEN lower(trim({c})) IN ('low', 'medium', 'high', 'critical') "
+    "THEN lower(trim({c})) END"
+)
+_STATUS_SQL = (
+    "CASE WHEN lower(trim({c})) IN ('open', 'investigating', 'resolved', 'closed') "
+    "THEN lower(trim({c})) END"
+)
+# ISO-8601 'YYYY-MM-DD HH:MM:SS': fixed width, so text order == time order.
+_TIMESTAMP_SQL = "datetime(trim({c}))"
+
+
+def _m002_normalise_incidents(conn):
+    """
+    Rebuild both incident tables with CHECK-constrained severity/status,
+    ISO timestamps and a real INTEGER PRIMARY KEY, reconcile the
+    type / incident_type split (the canonical column is `type`) and add
+    the composite indexes the dashboard filters use.
+    """
+    conn.execute("""
+        CREATE TABLE cyber_incidents_new(
+            incident_id INTEGER PRIMARY KEY,
+            domain TEXT NOT NULL DEFAULT 'cybersecurity',
+            type TEXT,
+            severity TEXT CHECK (severity IN ('low', 'medium', 'high', 'critical')),
+            status TEXT CHECK (status IN ('open', 'investigating', 'resolved', 'closed')),
+            reported_at TEXT CHECK (reported_at IS datetime(reported_at))
+        )
+    """)
+    cyber_cols = _columns(conn, "cyber_incidents")
+    cyber_type = "type" if "type" in cyber_cols else "incident_type"
+    conn.execute(f"""
+        INSERT INTO cyber_incidents_new (incident_id, domain, type, severity, status, reported_at)
+        SELECT incident_id,
+               COALESCE(domain, 'cybersecurity'),
+               trim({cyber_type}),
+               {_SEVERITY_SQL.format(c="severity")},
+               {_STATUS_SQL.format(c="status")},
+               {_TIMESTAMP_SQL.format(c="reported_at")}
+        FROM cyber_incidents
+        ORDER BY incident_id IS NULL, incident_id
+    """)
+
+    conn.execute("""
+        CREATE TABLE it_incidents_new(
+            incident_id INTEGER PRIMARY KEY,
+            service_name TEXT,
+            type TEXT,
+            severity TEXT CHECK (severity IN ('low', 'medium', 'high', 'critical')),
+            status TEXT CHECK (status IN ('open', 'investigating', 'resolved', 'closed')),
+            detected_at TEXT CHECK (detected_at IS datetime(detected_at)),
+            resolved_at TEXT CHECK (resolved_at IS datetime(resolved_at))
+        )
+    """)
+    it_cols = _columns(conn, "it_incidents")
+    if "type" in it_cols and "incident_type" in it_cols:
+        it_type = "COALESCE(type, incident_type)"
+    else:
+        it_type = "type" if "type" in it_cols else "incident_type"
+    conn.execute(f"""
+        INSERT INTO it_incidents_new
+            (incident_id, service_name, type, severity, status, detected_at, resolved_at)
+        SELECT incident_id,
+               trim(service_name),
+               trim({it_type}),
+               {_SEVERITY_SQL.format(c="severity")},
+               {_STATUS_SQL.format(c="status")},
+               {_TIMESTAMP_SQL.format(c="detected_at")},
+               {_TIMESTAMP_SQL.format(c="resolved_at")}
+        FROM it_incidents
+        ORDER BY incident_id IS NULL, incident_id
+    """)
+
+    for sql in _statements("""
+        DROP TABLE cyber_incidents;
+        ALTER TABLE cyber_incidents_new RENAME TO cyber_incidents;
+        DROP TABLE it_incidents;
+        ALTER TABLE it_incidents_new RENAME TO it_incidents;
+
+        CREATE INDEX idx_cyber_sev_status_reported
+            ON cyber_incidents(severity, status, reported_at);
+        CREATE INDEX idx_cyber_reported ON cyber_incidents(reported_at);
+        CREATE INDEX idx_it_sev_status_detected
+            ON it_incidents(severity, status, detected_at);
+        CREATE INDEX idx_it_service_detected ON it_incidents(service_name, detected_at);
+        CREATE INDEX idx_it_detected ON it_incidents(detected_at);
+    """):
+        conn.execute(sql)
+
+
+def _m003_ingest_checkpoints(conn):
+    """Resume points for ingest.py, committed in the same transaction as each batch."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_checkpoints(
+            source TEXT NOT NULL,
+            target TEXT NOT NULL,
+            byte_offset INTEGER NOT NULL,
+            rows_loaded INTEGER NOT NULL,
+            rows_rejected INTEGER NOT NULL,
+            file_size INTEGER NOT NULL,
+            file_mtime REAL NOT NULL,
+            updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+            PRIMARY KEY (source, target)
+        )
+    """)
+
+
+def _m004_table_versions(conn):
+    """
+    Change counter per incident table, bumped by triggers on every write so
+    caches can tell whether a table changed with one cheap lookup.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions(
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for table in ("cyber_incidents", "it_incidents"):
+        conn.execute(
+            "INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)",
+            (table,),
+        )
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1
+                    WHERE table_name = '{table}';
+                END
+            """)
+
+
+def _m005_change_sequence(conn):
+    """
+    Stamp every row with the table version of its last change (`updated_seq`)
+    and keep tombstones for deletes, so readers can fetch only what changed
+    since a high-water mark. Replaces the version triggers from migration 4.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS incident_tombstones(
+            table_name TEXT NOT NULL,
+            incident_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX idx_tombstones_seq ON incident_tombstones(table_name, seq)")
+
+    data_columns = {
+        "cyber_incidents": "domain, type, severity, status, reported_at",
+        "it_incidents": "service_name, type, severity, status, detected_at, resolved_at",
+    }
+    for table, columns in data_columns.items():
+        for event in ("insert", "update", "delete"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_{event}")
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN updated_seq INTEGER NOT NULL DEFAULT 0")
+        conn.execute(f"CREATE INDEX idx_{table}_updated_seq ON {table}(updated_seq)")
+
+        bump = f"""
+            UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+        """
+        stamp = f"""
+            UPDATE {table}
+            SET updated_seq = (SELECT version FROM table_versions WHERE table_name = '{table}')
+            WHERE incident_id = NEW.incident_id;
+        """
+        # UPDATE OF <data columns> so the stamping UPDATE does not re-fire it
+        for name, event, body in (
+            ("insert", "INSERT", bump + stamp),
+            ("update", f"UPDATE OF incident_id, {columns}", bump + stamp),
+            ("delete", "DELETE", bump + f"""
+                INSERT INTO incident_tombstones (table_name, incident_id, seq)
+                SELECT '{table}', OLD.incident_id, version
+                FROM table_versions WHERE table_name = '{table}';
+            """),
+        ):
+            conn.execute(f"""
+                CREATE TRIGGER trg_{table}_change_{name}
+                AFTER {event} ON {table}
+                BEGIN
+                    {body}
+                END
+            """)
+
+
+# (table, domain key, date column, service expression)
+_ROLLUP_SOURCES = (
+    ("cyber_incidents", "cyber", "reported_at", "''"),
+    ("it_incidents", "it", "detected_at", "COALESCE({row}.service_name, '')"),
+)
+_ROLLUP_GRAINS = (
+    ("day", "substr({row}.{date}, 1, 10)"),
+    ("hour", "substr({row}.{date}, 1, 13) || ':00:00'"),
+)
+
+
+def _rollup_upsert(table, domain, date, service, row, delta):
+    """Add `delta` to the day and hour cells of `row` (NEW or OLD)."""
+    statements = []
+    for grain, bucket in _ROLLUP_GRAINS:
+        statements.append(f"""
+            INSERT INTO incident_rollups
+                (grain, bucket, domain, severity, status, type, service_name, incident_count)
+            SELECT '{grain}', {bucket.format(row=row, date=date)}, '{domain}',
+                   COALESCE({row}.severity, ''), COALESCE({row}.status, ''),
+                   COALESCE({row}.type, ''), {service.format(row=row)}, {delta}
+            WHERE {row}.{date} IS NOT NULL
+            ON CONFLICT (grain, domain, bucket, severity, status, type, service_name)
+            DO UPDATE SET incident_count = incident_count + {delta};
+        """)
+    return "".join(statements)
+
+
+def _m006_rollups(conn):
+    """
+    Daily and hourly incident counts per (domain, severity, status, type,
+    service), kept current by triggers so charts cost O(buckets).
+    Key columns use '' instead of NULL so upserts can match them.
+    """
+    conn.execute("""
+        CREATE TABLE incident_rollups(
+            grain TEXT NOT NULL CHECK (grain IN ('day', 'hour')),
+            bucket TEXT NOT NULL,
+            domain TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            status TEXT NOT NULL,
+            type TEXT NOT NULL,
+            service_name TEXT NOT NULL,
+            incident_count INTEGER NOT NULL,
+            PRIMARY KEY (grain, domain, bucket, severity, status, type, service_name)
+        ) WITHOUT ROWID
+    """)
+    # A row here (written and removed inside one bulk-load transaction, so
+    # never visible to others) pauses the per-row triggers below.
+    conn.execute("CREATE TABLE rollup_suspend(flag INTEGER PRIMARY KEY)")
+    for table, domain, date, service in _ROLLUP_SOURCES:
+        insert = _rollup_upsert(table, domain, date, service, "NEW", 1)
+        delete = _rollup_upsert(table, domain, date, service, "OLD", -1)
+        key_columns = f"severity, status, type, {date}"
+        if domain == "it":
+            key_columns += ", service_name"
+        for name, event, body in (
+            ("insert", "INSERT", insert),
+            ("delete", "DELETE", delete),
+            ("update", f"UPDATE OF {key_columns}", delete + insert),
+        ):
+            conn.execute(f"""
+                CREATE TRIGGER trg_{table}_rollup_{name}
+                AFTER {event} ON {table}
+                WHEN NOT EXISTS (SELECT 1 FROM rollup_suspend)
+                BEGIN
+                    {body}
+                END
+            """)
+    rebuild_rollups(conn)
+
+
+def add_rollup_counts(conn, table: str, after_id: int = 0, where: str = "", params=(),
+                      target: str = "incident_rollups"):
+    """
+    Add rows of `table` with incident_id > after_id (and matching the extra
+    `where` condition) to the `target` rollup table.
+    """
+    where = f" AND ({where})" if where else ""
+    for source, domain, date, service in _ROLLUP_SOURCES:
+        if source != table:
+            continue
+        for grain, bucket in _ROLLUP_GRAINS:
+            conn.execute(f"""
+                INSERT INTO {target}
+                    (grain, bucket, domain, severity, status, type, service_name, incident_count)
+                SELECT '{grain}', {bucket.format(row=table, date=date)}, '{domain}',
+                       COALESCE(severity, ''), COALESCE(status, ''), COALESCE(type, ''),
+                       {service.format(row=table)}, COUNT(*)
+                FROM {table}
+                WHERE {date} IS NOT NULL AND incident_id > ?{where}
+                GROUP BY 2, 4, 5, 6, 7
+                ON CONFLICT (grain, domain, bucket, severity, status, type, service_name)
+                DO UPDATE SET incident_count = incident_count + excluded.incident_count
+            """, (after_id, *params))
+
+
+def rebuild_rollups(conn):
+    """
+    Recompute incident_rollups from the incident tables plus the counts of
+    archived incidents (inside a transaction).
+    """
+    conn.execute("DELETE FROM incident_rollups")
+    for table, *_ in _ROLLUP_SOURCES:
+        add_rollup_counts(conn, table)
+    if "archive_rollups" in _tables(conn):
+        conn.execute("""
+            INSERT INTO incident_rollups
+            SELECT * FROM archive_rollups WHERE true
+            ON CONFLICT (grain, domain, bucket, severity, status, type, service_name)
+            DO UPDATE SET incident_count = incident_count + excluded.incident_count
+        """)
+
+
+def _tables(conn) -> set:
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _m007_users_version(conn):
+    """Change counter for users, so the login cache can tell when to reload."""
+    conn.execute(
+        "INSERT OR IGNORE INTO table_versions (table_name, version) VALUES ('users', 0)"
+    )
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"""
+            CREATE TRIGGER trg_users_version_{event.lower()}
+            AFTER {event} ON users
+            BEGIN
+                UPDATE table_versions SET version = version + 1
+                WHERE table_name = 'users';
+            END
+        """)
+
+
+def _m008_archive(conn):
+    """
+    Parquet archive tier (archive.py): a manifest of archive files, with a
+    change counter for caches, and the rollup counts of archived incidents
+    so rebuilt rollups still include them.
+    """
+    conn.execute("""
+        CREATE TABLE archive_files(
+            path TEXT PRIMARY KEY,
+            domain TEXT NOT NULL,
+            month TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            min_date TEXT,
+            max_date TEXT,
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+    conn.execute("CREATE INDEX idx_archive_files_domain_month ON archive_files(domain, month)")
+    conn.execute("""
+        CREATE TABLE archive_rollups(
+            grain TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            domain TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            status TEXT NOT NULL,
+            type TEXT NOT NULL,
+            service_name TEXT NOT NULL,
+            incident_count INTEGER NOT NULL,
+            PRIMARY KEY (grain, domain, bucket, severity, status, type, service_name)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(
+        "INSERT OR IGNORE INTO table_versions (table_name, version) VALUES ('archive_files', 0)"
+    )
+    for event in ("INSERT", "DELETE"):
+        conn.execute(f"""
+            CREATE TRIGGER trg_archive_files_version_{event.lower()}
+            AFTER {event} ON archive_files
+            BEGIN
+                UPDATE table_versions SET version = version + 1
+                WHERE table_name = 'archive_files';
+            END
+        """)
+
+
+# table -> text columns in its full-text index (<table>_search)
+SEARCH_SOURCES = {
+    "cyber_incidents": ("type", "domain"),
+    "it_incidents": ("type", "service_name"),
+}
+
+
+def _m009_search(conn):
+    """
+    FTS5 index per incident table (external content, so it stores only the
+    index), kept current by triggers. Bulk loads set `search_suspend` and
+    index their rows in one statement instead (see add_search_rows).
+    """
+    conn.execute("CREATE TABLE search_suspend(flag INTEGER PRIMARY KEY)")
+    when = "WHEN NOT EXISTS (SELECT 1 FROM search_suspend)"
+    for table, columns in SEARCH_SOURCES.items():
+        index = f"{table}_search"
+        names = ", ".join(columns)
+        new = ", ".join(f"NEW.{c}" for c in columns)
+        old = ", ".join(f"OLD.{c}" for c in columns)
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE {index} USING fts5(
+                {names}, content='{table}', content_rowid='incident_id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+        conn.execute(f"CREATE VIRTUAL TABLE {index}_vocab USING fts5vocab({index}, 'row')")
+        for name, event, body in (
+            ("insert", "INSERT",
+             f"INSERT INTO {index} (rowid, {names}) VALUES (NEW.incident_id, {new});"),
+            ("delete", "DELETE",
+             f"INSERT INTO {index} ({index}, rowid, {names}) "
+             f"VALUES ('delete', OLD.incident_id, {old});"),
+            ("update", f"UPDATE OF incident_id, {names}",
+             f"INSERT INTO {index} ({index}, rowid, {names}) "
+             f"VALUES ('delete', OLD.incident_id, {old}); "
+             f"INSERT INTO {index} (rowid, {names}) VALUES (NEW.incident_id, {new});"),
+        ):
+            conn.execute(f"""
+                CREATE TRIGGER trg_{table}_search_{name}
+                AFTER {event} ON {table} {when}
+                BEGIN
+                    {body}
+                END
+            """)
+        rebuild_search(conn, table)
+
+
+def add_search_rows(conn, table: str, after_id: int = 0):
+    """Index the rows of `table` with incident_id > after_id."""
+    names = ", ".join(SEARCH_SOURCES[table])
+    conn.execute(f"""
+        INSERT INTO {table}_search (rowid, {names})
+        SELECT incident_id, {names} FROM {table} WHERE incident_id > ?
+    """, (after_id,))
+
+
+def rebuild_search(conn, table: str):
+    """Rebuild a table's full-text index from its rows."""
+    conn.execute(f"INSERT INTO {table}_search ({table}_search) VALUES ('rebuild')")
+
+
+def _m010_saved_views(conn):
+    """
+    Saved report views (reports.py): a named filter spec per domain, and the
+    summary snapshot of its last run with the table version it covers (and
+    the version its last export covered).
+    """
+    conn.execute("""
+        CREATE TABLE saved_views(
+            name TEXT PRIMARY KEY,
+            domain TEXT NOT NULL,
+            spec TEXT NOT NULL,
+            formats TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE report_snapshots(
+            name TEXT PRIMARY KEY,
+            filters TEXT NOT NULL,
+            high_water INTEGER NOT NULL,
+            max_id INTEGER NOT NULL,
+            computed_at TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            exported INTEGER
+        )
+    """)
+
+
+def _m011_export_max_id(conn):
+    """
+    The highest incident id a saved view's last export covered, so a later
+    delta export can tell rows edited since from rows added since.
+    """
+    conn.execute("ALTER TABLE report_snapshots ADD COLUMN exported_max_id INTEGER")
+
+
+def _m012_checkpoint_line(conn):
+    """The CSV line an ingest checkpoint reached, so resumed runs report true line numbers."""
+    conn.execute("ALTER TABLE ingest_checkpoints ADD COLUMN line_no INTEGER NOT NULL DEFAULT 0")
+
+
+MIGRATIONS = [
+    (1, "baseline tables", _m001_baseline),
+    (2, "normalised incidents, enums, ISO timestamps, indexes", _m002_normalise_incidents),
+    (3, "ingest checkpoints", _m003_ingest_checkpoints),
+    (4, "table version counters", _m004_table_versions),
+    (5, "per-row change sequence and tombstones", _m005_change_sequence),
+    (6, "daily / hourly incident rollups", _m006_rollups),
+    (7, "users change counter", _m007_users_version),
+    (8, "parquet archive manifest", _m008_archive),
+    (9, "full-text search index", _m009_search),
+    (10, "saved report views and snapshots", _m010_saved_views),
+    (11, "max incident id of the last report export", _m011_export_max_id),
+    (12, "line reached by an ingest checkpoint", _m012_checkpoint_line),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ---------- RUNNER ----------
+
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+
+def current_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(target: int = LATEST_VERSION) -> int:
+    """Apply every pending migration up to `target`; return the new version."""
+    with connection() as conn:
+        # Commit anything the borrowed connection had open, then take the
+        # write lock so concurrent processes do not migrate twice.
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = current_version(conn)
+            for number, description, apply in MIGRATIONS:
+                if version < number <= target:
+                    apply(conn)
+                    conn.execute(f"PRAGMA user_version = {number}")
+                    version = number
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return version
+
+
+def ensure_migrated():
+    """Run `migrate()` once per process and database (cheap on every rerun)."""
+    db_file = get_pool().db_file
+    if db_file in _migrated:
+        return
+    with _migrate_lock:
+        if db_file not in _migrated:
+            migrate()
+            _migrated.add(db_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upgrade the cw2.db schema.")
+    parser.add_argument("--status", action="store_true", help="only print versions")
+    args = parser.parse_args()
+
+    if args.status:
+        with connection() as conn:
+            print(f"Schema version {current_version(conn)} (latest {LATEST_VERSION})")
+    else:
+        print(f"✅ Schema at version {migrate()}.")
@@ -0,0 +1,673 @@
+"""
+Saved report views: named filter specs that are run headless, on a
+schedule, into summary snapshots and CSV / Parquet / HTML exports.
+
+A run of a saved view does two things.
+
+- It refreshes the view's summary snapshot: the dashboard's metrics,
+  severity counts and daily counts for the spec, stored in
+  `report_snapshots` (migration 10) with the table version they cover. The
+  dashboards serve a saved view from its snapshot without recomputing.
+  Later runs are incremental. Only incidents written since the snapshot's
+  version (`updated_seq`, migration 5) are counted and added to it. Edits,
+  deletes, archiving and a moved `--last-days` window force a full
+  recompute instead.
+- It exports the matching incidents, streamed in EXPORT_CHUNK_ROWS chunks
+  from an SQLite cursor and the Parquet archive, so memory stays bounded
+  whatever the size of the result. An incremental run exports only the
+  incidents written since the previous export, to `<name>-<stamp>-delta.<ext>`.
+  An export reads the table in one read transaction that must still be
+  at the snapshot's version; if rows changed in between, it raises
+  StaleSnapshot and run() refreshes the snapshot and exports again.
+
+    python reports.py save it-critical --domain it --severity high critical --last-days 7 \\
+        --format csv html
+    python reports.py run                   # every saved view, incrementally
+    python reports.py run it-critical --full
+    python reports.py schedule --at 06:30   # run every view each morning
+    python reports.py list
+"""
+import argparse
+import html
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+import db_pool
+from analytics import DashboardView, TableRequest
+from archive import archive_metrics, scan_batches
+from db_helper import count_incidents, get_incident_metrics, get_incidents_page
+from db_pool import connection
+from incident_repo import INCIDENT_TABLES, IncidentFilter, build_where
+from instrumentation import timed
+from migrations import ensure_migrated
+from rollups import get_rollup_severity_counts, get_rollup_time_series
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet exports need pyarrow; CSV and HTML do not
+    pa = pq = None
+
+EXPORT_FORMATS = ("csv", "parquet", "html")
+EXPORT_CHUNK_ROWS = 50_000
+HTML_DAYS = 31          # daily counts shown in the HTML report
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+STALE_RETRIES = 3       # refresh + export attempts while the table keeps changing
+
+_NAME = re.compile(r"^[\w.-]+$")
+_FILTER_FIELDS = ("severities", "statuses", "types", "services")
+
+
+class StaleSnapshot(RuntimeError):
+    """The table changed after the snapshot was taken: refresh it, then export."""
+
+
+@dataclass(frozen=True)
+class SavedView:
+    name: str
+    domain: str
+    filters: IncidentFilter
+    last_days: Optional[int] = None     # a moving window ending today, instead of fixed dates
+    formats: tuple = ("csv",)
+
+    def resolved(self, today: date = None) -> IncidentFilter:
+        """The filter spec for a run on `today`."""
+        if self.last_days is None:
+            return self.filters
+        today = today or date.today()
+        return replace(self.filters, start_date=today - timedelta(days=self.last_days - 1),
+                       end_date=today)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    name: str
+    domain: str
+    filters: IncidentFilter     # as resolved for the run
+    version: int                # table version the summary covers
+    max_id: int
+    computed_at: str
+    summary: dict               # metrics, archived, severity_counts, daily
+
+
+@dataclass(frozen=True)
+class RunReport:
+    name: str
+    mode: str                   # export: "full", "incremental" or "unchanged"
+    version: int
+    rows: int                   # incidents exported
+    files: tuple
+
+
+# ---------- SAVED VIEWS ----------
+
+def _filters_to_json(filters: IncidentFilter) -> dict:
+    data = {field: list(getattr(filters, field)) if getattr(filters, field) is not None else None
+            for field in _FILTER_FIELDS}
+    for field in ("start_date", "end_date"):
+        value = getattr(filters, field)
+        data[field] = value.isoformat() if value is not None else None
+    return data
+
+
+def _filters_from_json(data: dict) -> IncidentFilter:
+    values = {field: tuple(data[field]) if data.get(field) is not None else None
+              for field in _FILTER_FIELDS}
+    for field in ("start_date", "end_date"):
+        values[field] = date.fromisoformat(data[field]) if data.get(field) else None
+    return IncidentFilter(**values)
+
+
+def save_view(view: SavedView):
+    """Create or replace a saved view (its old snapshot is dropped)."""
+    if not _NAME.match(view.name):
+        raise ValueError(f"View names may only use letters, digits, '.', '_' and '-': {view.name!r}")
+    if view.domain not in INCIDENT_TABLES:
+        raise ValueError(f"Unknown domain {view.domain!r}")
+    unknown = set(view.formats) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export formats: {sorted(unknown)}")
+    ensure_migrated()
+    spec = {**_filters_to_json(view.filters), "last_days": view.last_days}
+    with connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO saved_views (name, domain, spec, formats, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (view.name, view.domain, json.dumps(spec), ",".join(view.formats),
+             datetime.now().strftime(TIME_FORMAT)),
+        )
+        conn.execute("DELETE FROM report_snapshots WHERE name = ?", (view.name,))
+
+
+def delete_view(name: str) -> bool:
+    ensure_migrated()
+    with connection() as conn:
+        conn.execute("DELETE FROM report_snapshots WHERE name = ?", (name,))
+        return conn.execute("DELETE FROM saved_views WHERE name = ?", (name,)).rowcount > 0
+
+
+def _view_from_row(name, domain, spec, formats) -> SavedView:
+    spec = json.loads(spec)
+    return SavedView(name, domain, _filters_from_json(spec), spec.get("last_days"),
+                     tuple(formats.split(",")))
+
+
+def list_views(domain: str = None) -> list:
+    """Saved views, by name; only those of `domain` if given."""
+    ensure_migrated()
+    sql = "SELECT name, domain, spec, formats FROM saved_views"
+    params = ()
+    if domain is not None:
+        sql, params = sql + " WHERE domain = ?", (domain,)
+    with connection() as conn:
+        rows = conn.execute(sql + " ORDER BY name", params).fetchall()
+    return [_view_from_row(*row) for row in rows]
+
+
+def get_view(name: str) -> SavedView:
+    ensure_migrated()
+    with connection() as conn:
+        row = conn.execute("SELECT name, domain, spec, formats FROM saved_views WHERE name = ?",
+                           (name,)).fetchone()
+    if row is None:
+        raise KeyError(f"No saved view named {name!r}")
+    return _view_from_row(*row)
+
+
+# ---------- SUMMARY SNAPSHOTS ----------
+
+def _summarise(domain: str, filters: IncidentFilter) -> dict:
+    """The dashboard's figures for a spec (call inside the caller's read transaction)."""
+    hot = get_incident_metrics.uncached(domain, filters)
+    archived = archive_metrics(domain, filters)
+    severities = get_rollup_severity_counts.uncached(domain, filters)
+    daily = get_rollup_time_series.uncached(domain, filters, "day")
+    return {
+        "metrics": {name: count + archived[name] for name, count in hot.items()},
+        "archived": archived,
+        "severity_counts": {severity or "": int(n) for severity, n in severities.items()},
+        "daily": {day.isoformat(): int(n) for day, n in daily.items()},
+    }
+
+
+def _changed_since(conn, table: str, version: int, max_id: Optional[int]) -> bool:
+    """True if rows up to `max_id` were edited, or any row deleted, after `version`."""
+    if max_id is None:
+        return True
+    edited = conn.execute(
+        f"SELECT 1 FROM {table} WHERE updated_seq > ? AND incident_id <= ? LIMIT 1",
+        (version, max_id),
+    ).fetchone()
+    deleted = conn.execute(
+        "SELECT 1 FROM incident_tombstones WHERE table_name = ? AND seq > ? LIMIT 1",
+        (table, version),
+    ).fetchone()
+    return bool(edited or deleted)
+
+
+def _add_changes(conn, domain: str, filters: IncidentFilter, summary: dict, since: int) -> dict:
+    """`summary` plus the matching incidents written after table version `since`."""
+    spec = INCIDENT_TABLES[domain]
+    table, date_column = spec["table"], spec["date_column"]
+    where_sql, params = build_where(domain, filters)
+    where_sql += f"{' AND' if where_sql else ' WHERE'} updated_seq > ?"
+    params = params + [since]
+    # the changes are few: make the planner walk them, not a filter column's index
+    source = f"{table} INDEXED BY idx_{table}_updated_seq"
+
+    added = conn.execute(f"""
+        SELECT COUNT(*),
+               COALESCE(SUM(status IN ('open', 'investigating')), 0),
+               COALESCE(SUM(severity IN ('high', 'critical')), 0),
+               COALESCE(SUM(status = 'resolved'), 0)
+        FROM {source}{where_sql}
+    """, params).fetchone()
+    metrics = dict(summary["metrics"])
+    for name, count in zip(("total", "open_investigating", "high_critical", "resolved"), added):
+        metrics[name] += count
+
+    severities = dict(summary["severity_counts"])
+    for severity, n in conn.execute(
+            f"SELECT COALESCE(severity, ''), COUNT(*) FROM {source}{where_sql} GROUP BY 1", params):
+        severities[severity] = severities.get(severity, 0) + n
+    daily = dict(summary["daily"])
+    for day, n in conn.execute(
+            f"SELECT substr({date_column}, 1, 10), COUNT(*) FROM {source}{where_sql} "
+            f"AND {date_column} IS NOT NULL GROUP BY 1", params):
+        daily[day] = daily.get(day, 0) + n
+    return {
+        "metrics": metrics,
+        "archived": summary["archived"],
+        "severity_counts": dict(sorted(severities.items(), key=lambda item: -item[1])),
+        "daily": dict(sorted(daily.items())),
+    }
+
+
+def get_snapshot(name: str) -> Optional[Snapshot]:
+    """The stored snapshot of a saved view, or None before its first run."""
+    ensure_migrated()
+    with connection() as conn:
+        row = conn.execute("""
+            SELECT v.domain, s.filters, s.high_water, s.max_id, s.computed_at, s.summary
+            FROM report_snapshots s JOIN saved_views v USING (name) WHERE s.name = ?
+        """, (name,)).fetchone()
+    if row is None:
+        return None
+    domain, filters, version, max_id, computed_at, summary = row
+    return Snapshot(name, domain, _filters_from_json(json.loads(filters)), version, max_id,
+                    computed_at, json.loads(summary))
+
+
+@timed()
+def refresh_snapshot(view: SavedView, incremental: bool = True, today: date = None):
+    """
+    Bring a view's snapshot up to the table; returns (Snapshot, mode) with
+    mode "unchanged", "incremental" or "full".
+    """
+    ensure_migrated()
+    table = INCIDENT_TABLES[view.domain]["table"]
+    filters = view.resolved(today)
+    previous = get_snapshot(view.name) if incremental else None
+    if previous is not None and previous.filters != filters:
+        previous = None             # the window moved: every count may change
+    with connection() as conn:
+        conn.execute("BEGIN")       # one snapshot for the version and the figures
+        version = conn.execute("SELECT version FROM table_versions WHERE table_name = ?",
+                               (table,)).fetchone()[0]
+        if previous is not None and previous.version == version:
+            return previous, "unchanged"
+        max_id = conn.execute(f"SELECT COALESCE(MAX(incident_id), 0) FROM {table}").fetchone()[0]
+        mode = "full"
+        if previous is not None:
+            if not _changed_since(conn, table, previous.version, previous.max_id):
+                summary = _add_changes(conn, view.domain, filters, previous.summary,
+                                       previous.version)
+                mode = "incremental"
+        if mode == "full":
+            summary = _summarise(view.domain, filters)
+
+    snapshot = Snapshot(view.name, view.domain, filters, version, max_id,
+                        datetime.now().strftime(TIME_FORMAT), summary)
+    with connection() as conn:
+        conn.execute("""
+            INSERT INTO report_snapshots (name, filters, high_water, max_id, computed_at, summary)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                filters = excluded.filters, high_water = excluded.high_water,
+                max_id = excluded.max_id, computed_at = excluded.computed_at,
+                summary = excluded.summary
+        """, (view.name, json.dumps(_filters_to_json(filters)), version, max_id,
+              snapshot.computed_at, json.dumps(summary)))
+    return snapshot, mode
+
+
+def snapshot_view(snapshot: Snapshot, table: TableRequest = None) -> DashboardView:
+    """
+    A DashboardView whose metrics and charts come from the snapshot; the
+    table page is still read live (a keyset page is cheap).
+    """
+    domain, filters = snapshot.domain, snapshot.filters
+    table = table or TableRequest()
+    summary = snapshot.summary
+    page, next_cursor = get_incidents_page(
+        domain, filters, page_size=table.page_size, sort_column=table.sort_column,
+        descending=table.descending, after=table.after,
+    )
+    severities = summary["severity_counts"]
+    return DashboardView(
+        domain=domain,
+        filters=filters,
+        version=snapshot.version,
+        metrics=dict(summary["metrics"]),
+        severity_counts=pd.Series(
+            list(severities.values()),
+            index=pd.Index([s or None for s in severities], name="severity"),
+            name="count", dtype="int64",
+        ),
+        time_series=pd.Series(
+            list(summary["daily"].values()),
+            index=pd.Index([date.fromisoformat(d) for d in summary["daily"]],
+                           name=INCIDENT_TABLES[domain]["date_column"]),
+            name="incident_count", dtype="int64",
+        ),
+        page=page,
+        next_cursor=next_cursor,
+        total_rows=count_incidents(domain, filters),
+        archived_metrics=dict(summary["archived"]),
+    )
+
+
+# ---------- EXPORTS ----------
+
+def report_root() -> Path:
+    """Default export directory, next to the database in use."""
+    return db_pool.get_pool().db_file.parent / "reports"
+
+
+def _typed(domain: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Same dtypes for every chunk, from SQLite text or archived timestamps."""
+    fields = INCIDENT_TABLES[domain]["fields"]
+    for column in df.columns:
+        if fields[column] == "datetime":
+            df[column] = pd.to_datetime(df[column], format="ISO8601",
+                                        errors="coerce").astype("datetime64[us]")
+        elif fields[column] == "id":
+            df[column] = df[column].astype("int64")
+        else:
+            df[column] = df[column].astype(object).where(df[column].notna(), None)
+    return df
+
+
+def iter_chunks(domain: str, filters: IncidentFilter, upto: int, since: int = None,
+                chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """
+    The matching incidents as of table version `upto`, in DataFrames of at
+    most `chunk_rows` rows: archived ones first, then the table by id. With
+    `since`, only the table's rows written after that version. Raises
+    StaleSnapshot if the table is no longer at version `upto`.
+    """
+    spec = INCIDENT_TABLES[domain]
+    columns = tuple(spec["fields"])
+    where_sql, params = build_where(domain, filters)
+    source = spec["table"]
+    if since is not None:
+        where_sql += f"{' AND' if where_sql else ' WHERE'} updated_seq > ?"
+        params = params + [since]
+        source += f" INDEXED BY idx_{source}_updated_seq"
+    with connection() as conn:
+        # One read transaction for the version check, the archive manifest
+        # and the rows: they are exactly the table at version `upto`.
+        conn.execute("BEGIN")
+        version = conn.execute("SELECT version FROM table_versions WHERE table_name = ?",
+                               (spec["table"],)).fetchone()[0]
+        if version != upto:
+            raise StaleSnapshot(f"{spec['table']} is at version {version}, "
+                                f"the snapshot at {upto}")
+        if since is None:
+            for chunk in scan_batches(domain, columns, filters, chunk_rows):
+                yield _typed(domain, chunk)
+        cursor = conn.execute(
+            f"SELECT {spec['columns']} FROM {source}{where_sql} ORDER BY incident_id", params,
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield _typed(domain, pd.DataFrame.from_records(rows, columns=columns))
+
+
+class _Writer:
+    """Writes to a temporary file that replaces `path` on close()."""
+
+    def __init__(self, path: Path, snapshot: Snapshot):
+        self.path = path
+        self.partial = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        self.snapshot = snapshot
+        self.columns = list(INCIDENT_TABLES[snapshot.domain]["fields"])
+
+    def write(self, chunk: pd.DataFrame):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        self._finish()
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        self._finish()
+        self.partial.unlink(missing_ok=True)
+
+
+class _CsvWriter(_Writer):
+    def __init__(self, path, snapshot):
+        super().__init__(path, snapshot)
+        self.file = open(self.partial, "w", newline="", encoding="utf-8")
+        self.file.write(",".join(self.columns) + "\n")
+
+    def write(self, chunk):
+        chunk.to_csv(self.file, header=False, index=False, date_format=TIME_FORMAT)
+
+    def _finish(self):
+        self.file.close()
+
+
+class _ParquetWriter(_Writer):
+    def __init__(self, path, snapshot):
+        if pq is None:
+            raise RuntimeError("Parquet exports need the pyarrow package.")
+        super().__init__(path, snapshot)
+        fields = INCIDENT_TABLES[snapshot.domain]["fields"]
+        self.schema = pa.schema([
+            (column, pa.int64() if kind == "id" else
+             pa.timestamp("us") if kind == "datetime" else pa.string())
+            for column, kind in fields.items()
+        ])
+        self.writer = pq.ParquetWriter(str(self.partial), self.schema, compression="zstd")
+
+    def write(self, chunk):
+        # one row group per chunk
+        self.writer.write_table(pa.Table.from_pandas(chunk, schema=self.schema,
+                                                     preserve_index=False))
+
+    def _finish(self):
+        self.writer.close()
+
+
+class _HtmlWriter(_Writer):
+    def __init__(self, path, snapshot):
+        super().__init__(path, snapshot)
+        self.file = open(self.partial, "w", encoding="utf-8")
+        self.file.write(_html_head(snapshot, self.columns))
+
+    def write(self, chunk):
+        for column in chunk.select_dtypes("datetime").columns:
+            chunk[column] = chunk[column].dt.strftime(TIME_FORMAT)
+        cells = chunk.astype(object).where(chunk.notna(), "")
+        self.file.write("".join(
+            "<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in row) + "</tr>\n"
+            for row in cells.itertuples(index=False, name=None)
+        ))
+
+    def _finish(self):
+        if not self.file.closed:
+            self.file.write("</tbody></table>\n</body></html>\n")
+            self.file.close()
+
+
+WRITERS = {"csv": _CsvWriter, "parquet": _ParquetWriter, "html": _HtmlWriter}
+
+
+def _table_html(header: tuple, rows) -> str:
+    head = "".join(f"<th>{html.escape(str(h))}</th>" for h in header)
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(str(v))}</td>" for v in row) + "</tr>"
+                   for row in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>\n"
+
+
+def _html_head(snapshot: Snapshot, columns: list) -> str:
+    summary = snapshot.summary
+    spec = ", ".join(f"{field}: {value}" for field, value in _filters_to_json(snapshot.filters).items()
+                     if value is not None) or "all incidents"
+    recent = list(summary["daily"].items())[-HTML_DAYS:]
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(snapshot.name)}</title>"
+        "<style>body{font-family:sans-serif} table{border-collapse:collapse;margin:1em 0}"
+        "td,th{border:1px solid #ccc;padding:2px 6px;font-size:13px}</style></head><body>\n"
+        f"<h1>{html.escape(snapshot.name)}</h1>\n"
+        f"<p>{html.escape(snapshot.domain)} incidents ({html.escape(spec)}), "
+        f"data version {snapshot.version}, computed {snapshot.computed_at}</p>\n"
+        "<h2>Key metrics</h2>\n" + _table_html(("metric", "incidents"), summary["metrics"].items())
+        + "<h2>By severity</h2>\n" + _table_html(("severity", "incidents"),
+                                                 summary["severity_counts"].items())
+        + f"<h2>Last {len(recent)} days</h2>\n" + _table_html(("day", "incidents"), recent)
+        + "<h2>Incidents</h2>\n<table><thead><tr>"
+        + "".join(f"<th>{html.escape(c)}</th>" for c in columns)
+        + "</tr></thead><tbody>\n"
+    )
+
+
+def export(snapshot: Snapshot, formats, out_dir: Path, since: int = None,
+           chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """
+    Stream the snapshot's incidents (or those written after version `since`)
+    into one file per format; returns (rows, paths). Raises StaleSnapshot,
+    leaving no files, if the table changed since the snapshot.
+    """
+    out_dir = Path(out_dir) / snapshot.name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.strptime(snapshot.computed_at, TIME_FORMAT).strftime("%Y%m%d-%H%M%S")
+    suffix = "-delta" if since is not None else ""
+    writers = [WRITERS[fmt](out_dir / f"{snapshot.name}-{stamp}{suffix}.{fmt}", snapshot)
+               for fmt in formats]
+    rows = 0
+    try:
+        for chunk in iter_chunks(snapshot.domain, snapshot.filters, snapshot.version, since,
+                                 chunk_rows):
+            rows += len(chunk)
+            for writer in writers:
+                writer.write(chunk)
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    for writer in writers:
+        writer.close()
+    return rows, tuple(writer.path for writer in writers)
+
+
+# ---------- RUNS ----------
+
+@timed()
+def run(view: SavedView, out_dir: Path = None, incremental: bool = True, today: date = None,
+        chunk_rows: int = EXPORT_CHUNK_ROWS) -> RunReport:
+    """
+    Refresh a view's snapshot and export its incidents: only those written
+    since the last export when incremental and nothing was edited or deleted
+    since that export. Writes landing in between start the run again.
+    """
+    table = INCIDENT_TABLES[view.domain]["table"]
+    for _ in range(STALE_RETRIES):
+        snapshot, mode = refresh_snapshot(view, incremental, today)
+        with connection() as conn:
+            exported, exported_max_id = conn.execute(
+                "SELECT exported, exported_max_id FROM report_snapshots WHERE name = ?",
+                (view.name,)).fetchone()
+            if incremental and exported == snapshot.version:
+                return RunReport(view.name, "unchanged", snapshot.version, 0, ())
+            since = None
+            if (incremental and mode != "full" and exported is not None
+                    and not _changed_since(conn, table, exported, exported_max_id)):
+                since = exported
+        try:
+            rows, files = export(snapshot, view.formats, out_dir or report_root(), since,
+                                 chunk_rows)
+        except StaleSnapshot:
+            continue
+        with connection() as conn:
+            conn.execute("UPDATE report_snapshots SET exported = ?, exported_max_id = ? "
+                         "WHERE name = ? AND high_water = ?",
+                         (snapshot.version, snapshot.max_id, view.name, snapshot.version))
+        return RunReport(view.name, "full" if since is None else "incremental",
+                         snapshot.version, rows, files)
+    raise StaleSnapshot(f"{view.name}: the table changed during {STALE_RETRIES} exports")
+
+
+def run_all(names=None, out_dir: Path = None, incremental: bool = True) -> list:
+    """Run the named saved views (default: all); a failing view does not stop the rest."""
+    reports = []
+    for view in list_views():
+        if names and view.name not in names:
+            continue
+        try:
+            reports.append(run(view, out_dir, incremental))
+        except Exception as error:     # reported, then the next view runs
+            print(f"❌ {view.name}: {error}")
+    return reports
+
+
+def next_run(times: list, now: datetime) -> datetime:
+    """The first of the daily `times` (datetime.time) after `now`."""
+    candidates = [datetime.combine(now.date() + timedelta(days=days), at)
+                  for days in (0, 1) for at in times]
+    return min(c for c in candidates if c > now)
+
+
+def _print_report(report: RunReport):
+    files = ", ".join(str(path) for path in report.files) or "no new incidents"
+    print(f"✅ {report.name}: {report.mode} (version {report.version}), "
+          f"{report.rows} incidents -> {files}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Saved report views: snapshots and exports.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    save = commands.add_parser("save", help="create or replace a saved view")
+    save.add_argument("name")
+    save.add_argument("--domain", choices=sorted(INCIDENT_TABLES), default="cyber")
+    save.add_argument("--severity", nargs="+")
+    save.add_argument("--status", nargs="+")
+    save.add_argument("--type", nargs="+")
+    save.add_argument("--service", nargs="+")
+    save.add_argument("--start", type=date.fromisoformat)
+    save.add_argument("--end", type=date.fromisoformat)
+    save.add_argument("--last-days", type=int, help="moving window ending on the run date")
+    save.add_argument("--format", nargs="+", choices=EXPORT_FORMATS, default=["csv"])
+
+    commands.add_parser("list", help="saved views and their snapshots")
+    delete = commands.add_parser("delete", help="remove a saved view")
+    delete.add_argument("name")
+
+    for name in ("run", "schedule"):
+        command = commands.add_parser(name, help="run saved views now" if name == "run"
+                                      else "run every saved view daily at the given times")
+        if name == "run":
+            command.add_argument("names", nargs="*", help="default: every saved view")
+        else:
+            command.add_argument("--at", nargs="+", required=True,
+                                 type=lambda s: datetime.strptime(s, "%H:%M").time(),
+                                 help="local times, e.g. 06:30 13:00")
+        command.add_argument("--full", action="store_true", help="recompute and export everything")
+        command.add_argument("--out", type=Path, help="default: data1/reports")
+    args = parser.parse_args()
+
+    if args.command == "save":
+        spec = IncidentFilter(
+            severities=tuple(args.severity) if args.severity else None,
+            statuses=tuple(args.status) if args.status else None,
+            types=tuple(args.type) if args.type else None,
+            services=tuple(args.service) if args.service else None,
+            start_date=args.start,
+            end_date=args.end,
+        )
+        save_view(SavedView(args.name, args.domain, spec, args.last_days, tuple(args.format)))
+        print(f"✅ saved {args.name}")
+    elif args.command == "list":
+        for view in list_views():
+            snapshot = get_snapshot(view.name)
+            last = (f"snapshot {snapshot.computed_at}, version {snapshot.version}, "
+                    f"{snapshot.summary['metrics']['total']} incidents") if snapshot else "never run"
+            print(f"{view.name:<24} {view.domain:<6} {','.join(view.formats):<16} {last}")
+    elif args.command == "delete":
+        print(f"✅ deleted {args.name}" if delete_view(args.name) else f"No view {args.name!r}")
+    elif args.command == "run":
+        for report in run_all(args.names, args.out, not args.full):
+            _print_report(report)
+    else:
+        while True:
+            due = next_run(args.at, datetime.now())
+            print(f"next run at {due:%Y-%m-%d %H:%M}")
+            time.sleep(max(0.0, (due - datetime.now()).total_seconds()))
+            for report in run_all(None, args.out, not args.full):
+                _print_report(report)
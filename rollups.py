@@ -0,0 +1,113 @@
+"""
+Chart queries over the materialised incident_rollups table.
+
+incident_rollups holds daily and hourly incident counts per (domain,
+severity, status, type, service). Triggers keep it current (see migration 6
+in migrations.py), so the severity and time-series charts read O(buckets)
+rows instead of grouping every incident.
+
+    python rollups.py --rebuild     # recompute from the incident tables
+    python rollups.py --check       # compare rollups with a fresh GROUP BY
+"""
+import argparse
+
+import pandas as pd
+
+from db_helper import INCIDENT_TABLES, IncidentFilter, build_where, table_for
+from db_pool import connection
+from incident_cache import versioned
+from migrations import migrate, rebuild_rollups
+
+
+def _rollup_where(domain, filters, grain):
+    where_sql, params = build_where(domain, filters, date_column="bucket")
+    prefix = " AND " if where_sql else " WHERE "
+    where_sql += f"{prefix}grain = ? AND domain = ? AND incident_count > 0"
+    return where_sql, params + [grain, domain]
+
+
+@versioned(table_for)
+def get_rollup_severity_counts(domain: str, filters: IncidentFilter) -> pd.Series:
+    """Incident count per severity, largest first, from the daily rollup."""
+    where_sql, params = _rollup_where(domain, filters, "day")
+    with connection() as conn:
+        rows = conn.execute(f"""
+            SELECT severity, SUM(incident_count) AS n FROM incident_rollups{where_sql}
+            GROUP BY severity ORDER BY n DESC
+        """, params).fetchall()
+    return pd.Series(
+        [n for _, n in rows],
+        index=pd.Index([s or None for s, _ in rows], name="severity"),
+        name="count",
+        dtype="int64",
+    )
+
+
+@versioned(table_for)
+def get_rollup_time_series(domain: str, filters: IncidentFilter,
+                           grain: str = "day") -> pd.Series:
+    """Incident count per day (dates) or hour (timestamps) from the rollup."""
+    where_sql, params = _rollup_where(domain, filters, grain)
+    with connection() as conn:
+        rows = conn.execute(f"""
+            SELECT bucket, SUM(incident_count) FROM incident_rollups{where_sql}
+            GROUP BY bucket ORDER BY bucket
+        """, params).fetchall()
+    index = pd.to_datetime(pd.Index([b for b, _ in rows]))
+    if grain == "day":
+        index = index.date
+    return pd.Series(
+        [n for _, n in rows],
+        index=pd.Index(index, name=INCIDENT_TABLES[domain]["date_column"]),
+        name="incident_count",
+        dtype="int64",
+    )
+
+
+def rebuild():
+    """Recompute every rollup cell in one transaction."""
+    migrate()
+    with connection() as conn:
+        rebuild_rollups(conn)
+
+
+def check() -> bool:
+    """
+    True if the daily rollup matches a fresh GROUP BY over the incidents
+    plus the archived counts.
+    """
+    migrate()
+    for domain in INCIDENT_TABLES:
+        stored = get_rollup_time_series.uncached(domain, IncidentFilter())
+        with connection() as conn:
+            table = INCIDENT_TABLES[domain]["table"]
+            date_column = INCIDENT_TABLES[domain]["date_column"]
+            fresh = dict(conn.execute(f"""
+                SELECT substr({date_column}, 1, 10), COUNT(*) FROM {table}
+                WHERE {date_column} IS NOT NULL GROUP BY 1
+            """).fetchall())
+            for day, count in conn.execute("""
+                SELECT bucket, SUM(incident_count) FROM archive_rollups
+                WHERE grain = 'day' AND domain = ? GROUP BY bucket
+            """, (domain,)):
+                fresh[day] = fresh.get(day, 0) + count
+        if {str(k): v for k, v in stored.items()} != fresh:
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the incident rollup tables.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--rebuild", action="store_true", help="recompute all rollups")
+    group.add_argument("--check", action="store_true", help="verify rollups are current")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild()
+        print("✅ Incident rollups rebuilt.")
+    elif check():
+        print("✅ Incident rollups are up to date.")
+    else:
+        print("❌ Incident rollups are stale; run with --rebuild.")
+        raise SystemExit(1)
@@ -0,0 +1,217 @@
+"""
+Full-text incident search over the FTS5 indexes from migration 9.
+
+Each incident table has an external-content FTS5 index (`<table>_search`)
+over its type, service and domain columns, maintained by triggers and by
+the bulk ingest path. `search(domain, text)` turns free text into an FTS
+query in which every word matches as a prefix ("pay" finds "payments"),
+and a word that matches nothing in the index is replaced by the closest
+indexed terms ("ransomwre" -> "ransomware"); only terms that match a row
+the filters select (the role's restricted filter at the widest) are
+suggested, so corrections never name values the user may not read.
+Results are fetched one page
+at a time and ranked by bm25 (newest first on ties) when there are at most
+RANK_LIMIT hits. Scoring needs every hit, so broader queries list newest
+first instead, which FTS5 streams in rowid order and stops after the page;
+their filtered count stops at COUNT_LIMIT. Only incidents still in SQLite
+are searchable; archived ones (archive.py) are not indexed.
+
+    python search_index.py --domain it "paymnts api"
+    python search_index.py --rebuild     # rebuild every index from its table
+    python search_index.py --check       # FTS5 integrity check
+"""
+import argparse
+import bisect
+import difflib
+import itertools
+import re
+import sqlite3
+from dataclasses import dataclass
+
+import pandas as pd
+
+from db_pool import connection
+from incident_cache import invalidate, versioned
+from incident_repo import INCIDENT_TABLES, RENAMES, IncidentFilter, build_where, table_for
+from instrumentation import note_query, timed
+from migrations import SEARCH_SOURCES, ensure_migrated, rebuild_search
+
+PAGE_SIZE = 25
+RANK_LIMIT = 5_000
+COUNT_LIMIT = 10_000
+FUZZY_MATCHES = 3       # indexed terms tried for a word with no match
+FUZZY_CUTOFF = 0.75     # difflib similarity needed to count as a match
+
+_WORD = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    rows: pd.DataFrame
+    total: int
+    exact: bool             # False: at least `total` matches (COUNT_LIMIT reached)
+    ranked: bool            # bm25 order; otherwise newest first
+    match: str              # the FTS5 query that was run
+    corrections: dict       # word -> indexed terms it was replaced by
+
+
+def _index(domain: str) -> str:
+    table = INCIDENT_TABLES[domain]["table"]
+    if table not in SEARCH_SOURCES:
+        raise ValueError(f"Domain {domain!r} has no search index")
+    return f"{table}_search"
+
+
+@versioned(table_for)
+def vocabulary(domain: str) -> list:
+    """Sorted distinct terms in a domain's index."""
+    with connection() as conn:
+        return [term for (term,) in conn.execute(
+            f"SELECT term FROM {_index(domain)}_vocab ORDER BY term"
+        )]
+
+
+def build_match(domain: str, text: str, filters: IncidentFilter = None):
+    """
+    (FTS5 query, corrections) for free text; query is '' for no words.
+    Corrections only use terms found in rows `filters` selects.
+    """
+    terms = vocabulary(domain)
+    index, table = _index(domain), INCIDENT_TABLES[domain]["table"]
+    where_sql, params = build_where(domain, filters or IncidentFilter())
+
+    def readable(term):
+        if not where_sql:
+            return True
+        with connection() as conn:
+            return conn.execute(f"""
+                SELECT 1 FROM (SELECT rowid AS hit_id FROM {index} WHERE {index} MATCH ?)
+                CROSS JOIN {table} ON incident_id = hit_id{where_sql} LIMIT 1
+            """, (f'"{term}"', *params)).fetchone() is not None
+
+    clauses, corrections = [], {}
+    for word in _WORD.findall(text.lower()):
+        position = bisect.bisect_left(terms, word)
+        if position < len(terms) and terms[position].startswith(word):
+            clauses.append(f'"{word}"*')
+            continue
+        candidates = difflib.get_close_matches(word, terms, FUZZY_MATCHES * 5, FUZZY_CUTOFF)
+        close = list(itertools.islice(filter(readable, candidates), FUZZY_MATCHES))
+        if close:
+            corrections[word] = close
+            clauses.append("(" + " OR ".join(f'"{term}"' for term in close) + ")")
+        else:
+            clauses.append(f'"{word}"')     # matches nothing, as it should
+    return " AND ".join(clauses), corrections
+
+
+@versioned(table_for)
+def _search(domain: str, text: str, filters: IncidentFilter, page: int,
+            page_size: int) -> SearchPage:
+    spec = INCIDENT_TABLES[domain]
+    match, corrections = build_match(domain, text, filters)
+    if not match:
+        empty = pd.DataFrame(columns=[RENAMES.get(c, c) for c in spec["fields"]])
+        return SearchPage(empty, 0, True, True, match, corrections)
+
+    index, table = _index(domain), spec["table"]
+    where_sql, params = build_where(domain, filters)
+    columns = ", ".join(f"{table}.{c}" for c in spec["fields"])
+    # Hits drive the join (CROSS JOIN keeps that order) and only their rowid
+    # and score leave the subquery, so the filter columns are unambiguous.
+    joined = f"CROSS JOIN {table} ON incident_id = hit_id{where_sql}"
+    with connection() as conn:
+        hits = conn.execute(f"SELECT COUNT(*) FROM {index} WHERE {index} MATCH ?",
+                            (match,)).fetchone()[0]
+        total, exact = hits, True
+        if where_sql:
+            total = conn.execute(f"""
+                SELECT COUNT(*) FROM (
+                    SELECT 1 FROM (SELECT rowid AS hit_id FROM {index} WHERE {index} MATCH ?)
+                    {joined} LIMIT ?
+                )
+            """, [match, *params, COUNT_LIMIT + 1]).fetchone()[0]
+            exact = total <= COUNT_LIMIT
+            total = min(total, COUNT_LIMIT)
+        ranked = hits <= RANK_LIMIT
+        if ranked:
+            sql = f"""
+                WITH hits AS MATERIALIZED (
+                    SELECT rowid AS hit_id, rank AS score FROM {index} WHERE {index} MATCH ?
+                )
+                SELECT {columns} FROM hits {joined}
+                ORDER BY score, incident_id DESC LIMIT ? OFFSET ?
+            """
+        else:
+            sql = f"""
+                SELECT {columns} FROM (
+                    SELECT rowid AS hit_id FROM {index} WHERE {index} MATCH ? ORDER BY rowid DESC
+                ) {joined}
+                ORDER BY hit_id DESC LIMIT ? OFFSET ?
+            """
+        note_query(sql)
+        rows = pd.read_sql_query(sql, conn, params=[match, *params, page_size, page * page_size])
+    return SearchPage(rows.rename(columns=RENAMES), total, exact, ranked, match, corrections)
+
+
+@timed(rows=lambda result: len(result.rows))
+def search(domain: str, text: str, filters: IncidentFilter = None, page: int = 0,
+           page_size: int = PAGE_SIZE) -> SearchPage:
+    """One page of incidents matching `text` (and the filters), best first."""
+    ensure_migrated()
+    return _search(domain, text.strip(), filters or IncidentFilter(), page, page_size)
+
+
+def rebuild(domains=None):
+    """Rebuild the search index of each domain (all by default)."""
+    ensure_migrated()
+    searchable = [d for d, s in INCIDENT_TABLES.items() if s["table"] in SEARCH_SOURCES]
+    for domain in domains or searchable:
+        table = INCIDENT_TABLES[domain]["table"]
+        with connection() as conn:
+            rebuild_search(conn, table)
+        invalidate(table)
+
+
+def check() -> bool:
+    """True if every index passes the FTS5 integrity check against its table."""
+    ensure_migrated()
+    with connection() as conn:
+        for table in SEARCH_SOURCES:
+            try:
+                conn.execute(
+                    f"INSERT INTO {table}_search ({table}_search, rank) VALUES ('integrity-check', 1)"
+                )
+            except sqlite3.DatabaseError:
+                return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search incidents or maintain the search index.")
+    parser.add_argument("text", nargs="?", help="words to search for")
+    parser.add_argument("--domain", choices=sorted(INCIDENT_TABLES), default="it")
+    parser.add_argument("--page", type=int, default=0)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--rebuild", action="store_true", help="rebuild every search index")
+    group.add_argument("--check", action="store_true", help="verify the search indexes")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild()
+        print("✅ Search indexes rebuilt.")
+    elif args.check:
+        if not check():
+            print("❌ A search index is out of date; run with --rebuild.")
+            raise SystemExit(1)
+        print("✅ Search indexes are consistent.")
+    elif args.text:
+        result = search(args.domain, args.text, page=args.page)
+        for word, terms in result.corrections.items():
+            print(f"  '{word}' -> {', '.join(terms)}")
+        more = "" if result.exact else "+"
+        order = "ranked" if result.ranked else "newest first"
+        print(f"{result.total}{more} matches, {order} ({result.match})")
+        print(result.rows.to_string(index=False))
+    else:
+        parser.error("give search text, --rebuild or --check")
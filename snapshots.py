@@ -0,0 +1,288 @@
+"""
+Shared, memory-mapped snapshots of the incident tables for deployments
+running several Streamlit server processes on one host.
+
+Every process already sees every write: cached loaders are keyed on the
+change counters in `table_versions` (migrations.py), which triggers bump
+whichever process wrote. What each process did not share is the data
+itself, since each one loaded and cached its own copy of the incident
+frames. With CW2_SHARED_SNAPSHOTS=1, incident_repo.load reads the hot table
+from an Arrow IPC file instead:
+
+    data1/snapshots/<table>.v<version>.arrow
+
+Every column is stored as a fixed-width array without nulls: ids as int64,
+categoricals as their codes (categories in the field metadata), and
+timestamps as int64 microseconds with NaT as the minimum. A process maps
+the file and builds its DataFrame as views over the mapped pages. N workers
+therefore share one copy in the page cache, and loading a snapshot costs
+no parsing.
+
+A snapshot is rebuilt when the table's counter has moved and the newest
+file is more than MAX_STALENESS seconds old. A write is therefore seen by
+every process within MAX_STALENESS seconds plus one rebuild. One process
+rebuilds, under an exclusive lock file, while the others keep serving the
+previous snapshot. The file is written under a temporary name and renamed
+into place, so readers never see a partial one. Files that are replaced
+are unlinked, and processes still mapping them keep their pages until they
+move on. Filters are applied in memory (incident_repo.filter_mask); with
+every value selected, the mapped frame is returned as it is.
+
+    python snapshots.py build        # write fresh snapshots now
+    python snapshots.py status
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import db_pool
+import incident_repo
+from incident_cache import table_version
+from incident_repo import INCIDENT_TABLES, RENAMES, IncidentFilter, category_dtype
+from instrumentation import span
+from migrations import ensure_migrated
+
+try:
+    import pyarrow as pa
+except ImportError:  # snapshots need pyarrow; without it every process loads its own copy
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # no flock (Windows): concurrent rebuilds are wasted work, not errors
+    fcntl = None
+
+ENABLED = os.environ.get("CW2_SHARED_SNAPSHOTS", "0") == "1" and pa is not None
+MAX_STALENESS = float(os.environ.get("CW2_SNAPSHOT_STALENESS", "5"))
+
+_NAT = np.iinfo(np.int64).min
+_FILE = re.compile(r"^(?P<table>\w+)\.v(?P<version>\d+)\.arrow$")
+
+
+def snapshot_root() -> Path:
+    """Snapshot directory, next to the database in use."""
+    return db_pool.get_pool().db_file.parent / "snapshots"
+
+
+def _files(table: str) -> list:
+    """(version, path) of a table's snapshot files, oldest first."""
+    root = snapshot_root()
+    if not root.exists():
+        return []
+    found = []
+    for path in root.iterdir():
+        match = _FILE.match(path.name)
+        if match and match["table"] == table:
+            found.append((int(match["version"]), path))
+    return sorted(found)
+
+
+# ---------- WRITE ----------
+
+def _arrow_column(kind: str, series: pd.Series):
+    """(Arrow array, field metadata) for one column of a loaded frame."""
+    if kind == "category":
+        dtype = series.dtype
+        metadata = {"kind": kind, "categories": json.dumps([str(c) for c in dtype.categories]),
+                    "ordered": json.dumps(bool(dtype.ordered))}
+        return pa.array(series.cat.codes.to_numpy()), metadata
+    if kind == "datetime":
+        return pa.array(series.to_numpy(dtype="datetime64[us]").view("int64")), {"kind": kind}
+    if kind == "id":
+        return pa.array(series.to_numpy(dtype="int64")), {"kind": kind}
+    return pa.array(series.astype(object).to_numpy()), {"kind": kind}
+
+
+def write_snapshot(domain: str):
+    """Snapshot a domain's table as it is now; returns (version, path)."""
+    spec = INCIDENT_TABLES[domain]
+    table = spec["table"]
+    # read the counter first: the rows can only be newer than the label
+    version = table_version(table)
+    with span("snapshots.build") as current:
+        frame = incident_repo._load.uncached(domain, tuple(spec["fields"]), IncidentFilter())
+        current.rows = len(frame)
+        arrays, fields = [], []
+        for column, kind in spec["fields"].items():
+            array, metadata = _arrow_column(kind, frame[RENAMES.get(column, column)])
+            arrays.append(array)
+            fields.append(pa.field(column, array.type, metadata=metadata))
+        data = pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+        root = snapshot_root()
+        root.mkdir(parents=True, exist_ok=True)
+        path = root / f"{table}.v{version:012d}.arrow"
+        partial = root / f".{path.name}.{os.getpid()}.tmp"
+        with pa.OSFile(str(partial), "wb") as sink:
+            with pa.ipc.new_file(sink, data.schema) as writer:
+                writer.write_table(data)
+        os.replace(partial, path)
+
+    for old_version, old_path in _files(table):
+        if old_path != path:
+            try:
+                old_path.unlink()
+            except OSError:     # still mapped on a platform that forbids unlinking
+                pass
+    return version, path
+
+
+@contextmanager
+def _build_lock(table: str, wait: bool):
+    """Yield True if this process holds the table's rebuild lock."""
+    if fcntl is None:
+        yield True
+        return
+    root = snapshot_root()
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / f"{table}.lock", "a") as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+# ---------- READ ----------
+
+def _values(array, dtype) -> np.ndarray:
+    """Read-only numpy view of a null-free fixed-width Arrow array."""
+    if not len(array):
+        return np.empty(0, dtype=dtype)
+    itemsize = np.dtype(dtype).itemsize
+    return np.frombuffer(array.buffers()[1], dtype=dtype, count=len(array),
+                         offset=array.offset * itemsize)
+
+
+def read_snapshot(domain: str, path: Path) -> pd.DataFrame:
+    """The frame of a snapshot file, its columns viewing the mapped file."""
+    with span("snapshots.map"):
+        data = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        columns = {}
+        for field, column in zip(data.schema, data.columns):
+            kind = field.metadata[b"kind"].decode()
+            name = RENAMES.get(field.name, field.name)
+            array = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+            if kind == "category":
+                stored = pd.CategoricalDtype(json.loads(field.metadata[b"categories"]),
+                                             json.loads(field.metadata[b"ordered"]))
+                codes = _values(array, array.type.to_pandas_dtype())
+                dtype = category_dtype(domain, field.name, stored.categories)
+                if not dtype.categories.equals(stored.categories):
+                    # this process met the categories in another order: recode
+                    lookup = np.append(dtype.categories.get_indexer(stored.categories), -1)
+                    codes = lookup[codes].astype(codes.dtype)
+                columns[name] = pd.Categorical.from_codes(codes, dtype=dtype, validate=False)
+            elif kind == "datetime":
+                columns[name] = _values(array, "int64").view("datetime64[us]")
+            elif kind == "id":
+                columns[name] = _values(array, "int64")
+            else:
+                columns[name] = array.to_pandas()
+        return pd.DataFrame(columns, copy=False)
+
+
+class _Mapped:
+    __slots__ = ("version", "path", "frame")
+
+    def __init__(self, version: int, path: Path, frame: pd.DataFrame):
+        self.version = version
+        self.path = path
+        self.frame = frame
+
+
+_mapped = {}        # table -> _Mapped, this process's current snapshot
+_lock = threading.Lock()
+
+
+def _fresh(path: Path) -> bool:
+    try:
+        return time.time() - path.stat().st_mtime < MAX_STALENESS
+    except FileNotFoundError:   # replaced since it was listed
+        return False
+
+
+def _current(domain: str, table: str, version: int):
+    """(version, path) of the snapshot to serve, rebuilding it if needed."""
+    files = _files(table)
+    if files and (files[-1][0] == version or _fresh(files[-1][1])):
+        return files[-1]
+    with _build_lock(table, wait=not files) as holder:
+        if not holder:
+            return files[-1]            # another process is rebuilding
+        files = _files(table)           # it may have finished while we waited
+        if files and (files[-1][0] >= version or _fresh(files[-1][1])):
+            return files[-1]
+        return write_snapshot(domain)
+
+
+def frame(domain: str) -> pd.DataFrame:
+    """The whole hot table of a domain, from the shared snapshot."""
+    ensure_migrated()
+    table = INCIDENT_TABLES[domain]["table"]
+    version = table_version(table)
+    with _lock:
+        mapped = _mapped.get(table)
+        if mapped is not None and (mapped.version == version or _fresh(mapped.path)):
+            return mapped.frame
+        snapshot_version, path = _current(domain, table, version)
+        if mapped is None or mapped.path != path:
+            mapped = _mapped[table] = _Mapped(snapshot_version, path, read_snapshot(domain, path))
+        return mapped.frame
+
+
+def load(domain: str, columns: tuple, filters: IncidentFilter) -> pd.DataFrame:
+    """incident_repo._load's result, served from the shared snapshot."""
+    df = frame(domain)
+    mask = incident_repo.filter_mask(domain, df, filters)
+    if not mask.all():
+        df = df[mask].reset_index(drop=True)
+    return df[[RENAMES.get(c, c) for c in columns]]
+
+
+def status() -> list:
+    """One row per domain: table version, newest snapshot and its age."""
+    ensure_migrated()
+    rows = []
+    for domain, spec in INCIDENT_TABLES.items():
+        files = _files(spec["table"])
+        version, path = files[-1] if files else (None, None)
+        mapped = _mapped.get(spec["table"])
+        rows.append({
+            "domain": domain,
+            "table_version": table_version(spec["table"]),
+            "snapshot_version": version,
+            "snapshot_bytes": path.stat().st_size if path else 0,
+            "snapshot_age_s": round(time.time() - path.stat().st_mtime, 1) if path else None,
+            "mapped_version": mapped.version if mapped else None,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared incident snapshots.")
+    parser.add_argument("command", choices=["build", "status"])
+    parser.add_argument("--domain", action="append", help="default: every domain")
+    args = parser.parse_args()
+
+    if pa is None:
+        raise SystemExit("Shared snapshots need the pyarrow package.")
+    ensure_migrated()
+    if args.command == "build":
+        for domain in args.domain or list(INCIDENT_TABLES):
+            version, path = write_snapshot(domain)
+            print(f"✅ {domain}: version {version} -> {path}")
+    else:
+        print(pd.DataFrame(status()).to_string(index=False))
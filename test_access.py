@@ -0,0 +1,179 @@
+"""Role policies: restricted filters return exactly the allowed rows, and scan less."""
+import io
+import json
+from datetime import date
+
+import pytest
+
+import access
+import anomalies
+import db_pool
+import incident_delta
+import incident_repo
+import migrations
+import search_index
+from access import AccessDenied, session_policy
+from analytics import dashboard_view
+from db_helper import get_filter_options
+from incident_delta import IncidentSync, session_sync
+from incident_repo import IncidentFilter, build_where
+from ingest import ingest_file
+
+SERVICES = ["payments-api", "auth-worker", "ledger-db"]
+
+
+def _row(i):
+    return {"service_name": SERVICES[i % 3], "type": "outage",
+            "severity": ["low", "low", "medium", "high", "critical"][i % 5],
+            "status": ["open", "resolved"][i % 2],
+            "detected_at": f"2025-04-{1 + i % 28:02d} 10:00:00"}
+
+
+@pytest.fixture
+def db(db):
+    incident_repo.insert_many("it", (_row(i) for i in range(2000)))
+    yield db
+    anomalies._models.clear()
+
+
+def test_policies_restrict_rows(db):
+    everything = incident_repo.load("it")
+    analyst = access.resolve("analyst")
+    assert access.resolve("data_scientist").restrict("it") == IncidentFilter()
+
+    # the sidebar selection is intersected with the policy, not widened by it
+    filters = analyst.restrict("it", IncidentFilter(severities=("low", "high")))
+    assert filters.severities == ("high",)
+    rows = incident_repo.load("it", filters=analyst.restrict("it"))
+    expected = everything[everything["severity"].isin(["high", "critical"])]
+    assert sorted(rows["incident_id"]) == sorted(expected["incident_id"])
+    assert dashboard_view("it", analyst.restrict("it")).metrics["total"] == len(expected)
+
+    (db / "access.json").write_text(json.dumps({"roles": {
+        "payments": {"it": {"services": ["payments-api"], "severities": ["critical"]}}}}))
+    payments = access.resolve("payments", path=db / "access.json")
+    rows = incident_repo.load("it", filters=payments.restrict("it"))
+    assert set(rows["service_name"]) == {"payments-api"} and set(rows["severity"]) == {"critical"}
+    assert not payments.allows("cyber")
+    with pytest.raises(AccessDenied):
+        payments.restrict("cyber")
+    assert not analyst.covers("it", IncidentFilter())
+    assert analyst.covers("it", IncidentFilter(severities=("critical",)))
+    assert access.resolve("guest").domains == {}
+
+
+def test_restricted_queries_scan_fewer_rows(db):
+    def scan(filters):
+        where_sql, params = build_where("it", filters)
+        sql = f"SELECT * FROM it_incidents{where_sql}"
+        steps = [0]
+
+        def count():
+            steps[0] += 1
+        with db_pool.connection() as conn:
+            plan = " ".join(r[-1] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+            conn.set_progress_handler(count, 100)
+            rows = len(conn.execute(sql, params).fetchall())
+            conn.set_progress_handler(None, 0)
+        return plan, rows, steps[0]
+
+    full_plan, full_rows, full_steps = scan(IncidentFilter())
+    plan, rows, steps = scan(access.resolve("analyst").restrict("it"))
+    assert full_plan.startswith("SCAN") and full_rows == 2000
+    assert "USING INDEX idx_it_sev_status_detected" in plan and rows == 800
+    assert steps < full_steps * 0.6
+
+
+def test_policy_resolved_once_per_session(monkeypatch):
+    calls = []
+    resolve = access.resolve
+    monkeypatch.setattr(access, "resolve", lambda role: calls.append(role) or resolve(role))
+    state = {"logged_in_user": "rak", "role": "analyst"}
+    assert session_policy(state) is session_policy(state)
+    assert calls == ["analyst"]
+    state["role"] = "it_admin"
+    assert session_policy(state).role == "it_admin" and calls == ["analyst", "it_admin"]
+    state["logged_in_user"] = None              # logged out: no access
+    assert not session_policy(state).allows("it")
+
+
+def test_delta_sync_fetches_only_the_roles_rows(db):
+    scope = access.resolve("analyst").restrict("it")
+    everything, restricted = IncidentSync("it"), IncidentSync("it", scope)
+    everything.refresh(), restricted.refresh()
+    assert everything.rows_fetched == 2000 and restricted.rows_fetched == 800
+    assert restricted.metrics(IncidentFilter()) == dashboard_view("it", scope).metrics
+    assert set(restricted.frame()["severity"]) == {"high", "critical"}
+
+    # a row edited out of the scope leaves the cube; rows outside it are never fetched
+    with db_pool.connection() as conn:
+        conn.execute("UPDATE it_incidents SET severity = 'low' WHERE incident_id = 4")
+    restricted.refresh()
+    assert restricted.rows_fetched == 1 and restricted.metrics(IncidentFilter())["total"] == 799
+    incident_repo.insert_many("it", (_row(i) for i in (0, 1, 2)))     # low, low, medium
+    restricted.refresh()
+    assert restricted.rows_fetched == 0
+
+    # the session's cursor follows the role
+    state = {}
+    assert session_sync(state, "it", scope).scope == scope
+    assert session_sync(state, "it").metrics(IncidentFilter())["total"] == 2003
+    assert incident_delta.shared_mirror("it", scope) is restricted.mirror
+
+
+def test_alerts_count_only_the_roles_rows(db_file):
+    migrations.migrate()
+
+    def day(offset):
+        return {**_row(3), "detected_at": f"{date(2025, 5, 1 + offset).isoformat()} 10:00:00"}
+
+    # a steady baseline of severe incidents, then a burst of low ones today
+    incident_repo.insert_many("it", (day(d) for d in range(20) for _ in range(4)))
+    incident_repo.insert_many("it", ({**day(20), "severity": "low"} for _ in range(40)))
+    scope = access.resolve("analyst").restrict("it")
+
+    seen = anomalies.get_alerts("it")
+    assert {"all", "type", "service"} <= set(seen["dimension"])
+    scoped = anomalies.get_alerts("it", scope=scope)
+    assert scoped.empty
+    # the burst is not in the scoped series: its latest day is still the day before
+    assert anomalies.get_model("it").series[("all", "")].count == 40
+    assert anomalies.get_model("it", scope).series[("all", "")].day == date(2025, 5, 20).toordinal()
+    anomalies._models.clear()
+
+
+def test_upload_cannot_touch_rows_outside_the_scope(db):
+    # incident 1 is low (hidden from the analyst), 4 is high and 5 critical
+    upload = io.BytesIO(b"""incident_id,service_name,type,severity,status,detected_at
+1,payments-api,outage,critical,open,2025-04-02 10:00:00
+4,auth-worker,outage,low,open,2025-04-05 10:00:00
+5,ledger-db,outage,critical,resolved,2025-04-06 10:00:00
+""")
+    scope = access.resolve("analyst").restrict("it")
+    report = ingest_file(upload, "it", "csv", mode="upsert", scope=scope)
+    assert report.rows_loaded == 1 and report.rows_rejected == 2
+    assert [line for line, _ in report.errors] == [3, None]   # new values, then target
+
+    rows = incident_repo.load("it").set_index("incident_id")
+    assert rows.loc[1, "severity"] == "low" and rows.loc[4, "severity"] == "high"
+    assert rows.loc[5, "status"] == "resolved"
+    with pytest.raises(ValueError):
+        ingest_file(io.BytesIO(b"severity,status\nhigh,open\n"), "it", "csv",
+                    mode="replace", scope=scope)
+
+
+def test_filter_options_only_name_readable_rows(db):
+    incident_repo.insert("it", {**_row(0), "type": "data-leak"})       # low: hidden
+    analyst = access.resolve("analyst")
+    assert "data-leak" in get_filter_options("it")["types"]
+    options = analyst.options("it", get_filter_options("it", analyst.restrict("it")))
+    assert options["types"] == ["outage"] and options["severities"] == ["critical", "high"]
+
+
+def test_search_suggests_only_readable_terms(db):
+    incident_repo.insert("it", {**_row(0), "service_name": "billing-gateway"})    # low: hidden
+    scope = access.resolve("analyst").restrict("it")
+    assert search_index.search("it", "gatewy").corrections == {"gatewy": ["gateway"]}
+    hidden = search_index.search("it", "gatewy", scope)
+    assert hidden.corrections == {} and hidden.total == 0
+    assert search_index.search("it", "ledgr", scope).corrections == {"ledgr": ["ledger"]}
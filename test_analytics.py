@@ -0,0 +1,50 @@
+"""Headless dashboard core: results match the queries and are memoised per version."""
+import pytest
+
+import incident_repo
+from analytics import TableRequest, dashboard_view
+from db_helper import IncidentFilter, count_incidents
+from incident_cache import cache_stats
+
+
+@pytest.fixture
+def db(db):
+    incident_repo.insert_many("it", (
+        {
+            "service_name": f"svc-{i % 5}",
+            "type": ["outage", "latency"][i % 2],
+            "severity": ["low", "medium", "high", "critical"][i % 4],
+            "status": ["open", "investigating", "resolved"][i % 3],
+            "detected_at": f"2025-04-{1 + i % 20:02d} 0{i % 10}:00:00",
+        }
+        for i in range(120)
+    ))
+    return db
+
+
+def test_view_matches_queries(db):
+    filters = IncidentFilter(severities=("high", "critical"), services=("svc-1", "svc-2"))
+    view = dashboard_view("it", filters, TableRequest(page_size=10))
+
+    assert view.total_rows == count_incidents.uncached("it", filters)
+    assert view.metrics["total"] == view.total_rows
+    assert int(view.severity_counts.sum()) == view.total_rows
+    assert int(view.time_series.sum()) == view.total_rows
+    assert len(view.page) == 10 and view.next_cursor is not None
+    assert set(view.page["severity"]) <= {"high", "critical"}
+
+
+def test_view_is_memoised_until_the_data_changes(db):
+    filters = IncidentFilter(statuses=("open",))
+    first = dashboard_view("it", filters)
+    hits = cache_stats()["hits"]
+    again = dashboard_view("it", filters)
+    assert cache_stats()["hits"] == hits + 1          # one lookup, nothing recomputed
+    assert again.version == first.version
+
+    incident_repo.insert("it", {"service_name": "svc-9", "type": "outage",
+                                "severity": "low", "status": "open",
+                                "detected_at": "2025-04-30 12:00:00"})
+    changed = dashboard_view("it", filters)
+    assert changed.version > first.version
+    assert changed.metrics["total"] == first.metrics["total"] + 1
@@ -0,0 +1,95 @@
+"""Spike detection: streaming updates match a full recompute, and inserts are folded in."""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import anomalies
+import incident_repo
+from anomalies import AnomalyModel
+from incident_repo import IncidentFilter
+
+START = date(2025, 1, 6).toordinal()
+
+
+def _history(seed=7, days=120):
+    """(day, severity, type, service) of a noisy weekly series with gaps and two spikes."""
+    rng = np.random.default_rng(seed)
+    incidents = []
+    for offset in range(days):
+        if 40 <= offset < 45:           # a week without incidents
+            continue
+        rate = 6 + 4 * (offset % 7 < 5) + (30 if offset in (80, 110) else 0)
+        for _ in range(rng.poisson(rate)):
+            incidents.append((START + offset, str(rng.choice(["low", "high"])),
+                              str(rng.choice(["outage", "latency"])),
+                              str(rng.choice(["payments-api", "auth-worker"]))))
+    return incidents
+
+
+def _counts(incidents):
+    rows = []
+    for day, severity, incident_type, service in incidents:
+        rows += [("all", "", day), ("severity", severity, day), ("type", incident_type, day),
+                 ("service", service, day)]
+    frame = pd.DataFrame(rows, columns=["dimension", "value", "day"])
+    return frame.groupby(["dimension", "value", "day"], as_index=False).size().rename(
+        columns={"size": "count"})
+
+
+def test_streaming_matches_recompute():
+    incidents = _history()
+    streamed = AnomalyModel("it")
+    for incident in incidents:
+        streamed.observe(*incident)
+    rebuilt = AnomalyModel("it")
+    rebuilt.recompute(_counts(incidents))
+
+    a, b = streamed.alerts(days=200), rebuilt.alerts(days=200)
+    assert len(a) and list(a["dimension"]) == list(b["dimension"])
+    pd.testing.assert_frame_equal(a, b)
+    assert date.fromordinal(START + 110) in set(a.loc[a["dimension"] == "all", "day"])
+    for key, series in streamed.series.items():
+        other = rebuilt.series[key]
+        assert (series.day, series.count, series.n) == (other.day, other.count, other.n)
+        assert series.mean == pytest.approx(other.mean)
+        assert series.week_var == pytest.approx(other.week_var)
+
+    with pytest.raises(anomalies.LateIncident):
+        streamed.observe(START, "low", "outage", "payments-api")
+
+
+@pytest.fixture
+def db(db):
+    yield db
+    anomalies._models.clear()
+
+
+def _row(day, severity="low", service="payments-api"):
+    return {"service_name": service, "type": "outage", "severity": severity, "status": "open",
+            "detected_at": f"{date.fromordinal(day).isoformat()} 09:00:00"}
+
+
+def test_inserts_stream_into_the_model(db):
+    incident_repo.insert_many("it", (_row(START + d) for d in range(30) for _ in range(5)))
+    model = anomalies.get_model("it")
+    assert model.recomputes == 1 and model.series[("all", "")].count == 5
+    assert anomalies.get_alerts("it").empty
+
+    today = START + 30
+    for _ in range(25):
+        incident_repo.insert("it", _row(today, "critical"))
+    alerts = anomalies.get_alerts("it")
+    assert model.recomputes == 1                      # folded in, not recomputed
+    spike = alerts[alerts["dimension"] == "all"].iloc[0]
+    assert spike["day"] == date.fromordinal(today) and spike["in_progress"]
+    assert spike["count"] == 25 and spike["expected"] == pytest.approx(5)
+
+    hidden = anomalies.get_alerts("it", IncidentFilter(services=("auth-worker",)))
+    assert "service" not in set(hidden["dimension"])
+
+    incident_repo.insert("it", _row(today - 3))         # back-dated: recompute
+    assert anomalies.get_model("it").recomputes == 2
+    assert model.series[("all", "")].count == 25
+    assert date.fromordinal(today) - timedelta(days=1) not in set(anomalies.get_alerts("it")["day"])
@@ -0,0 +1,98 @@
+"""Parquet archive tier: compaction moves rows without changing what readers see."""
+import threading
+import time
+from datetime import date, datetime
+
+import pytest
+
+import archive
+import db_pool
+import incident_repo
+import migrations
+import rollups
+from analytics import dashboard_view
+from db_helper import IncidentFilter
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def db(db):
+    incident_repo.insert_many("it", (
+        {
+            "service_name": f"svc-{i % 5}",
+            "type": ["outage", "latency"][i % 2],
+            "severity": ["low", "medium", "high", "critical"][i % 4],
+            "status": ["open", "investigating", "resolved", "closed"][i % 4],
+            "detected_at": f"2025-{1 + i % 6:02d}-{1 + i % 20:02d} 0{i % 10}:00:00",
+        }
+        for i in range(240)
+    ))
+    return db
+
+
+def _sorted(df):
+    return df.sort_values("incident_id").reset_index(drop=True)
+
+
+def test_compaction_is_invisible_to_readers(db):
+    filters = IncidentFilter(severities=("high", "critical"), start_date=date(2025, 2, 1))
+    before = _sorted(incident_repo.load("it"))
+    before_view = dashboard_view("it", filters)
+
+    result = archive.compact("it", older_than_days=30, now=datetime(2025, 5, 1))
+    assert result["rows"] > 0 and result["files"] == 3          # Jan..Mar partitions
+    assert len(incident_repo.load("it", include_archive=False)) == len(before) - result["rows"]
+
+    after = _sorted(incident_repo.load("it"))
+    assert after.equals(before)
+    view = dashboard_view("it", filters)
+    assert view.metrics == before_view.metrics
+    assert view.severity_counts.equals(before_view.severity_counts)
+    assert view.archived_metrics["total"] > 0
+    assert rollups.check()
+
+    with db_pool.connection() as conn:
+        migrations.rebuild_rollups(conn)
+    assert rollups.check()
+
+
+def test_date_filter_reads_only_matching_partitions(db):
+    archive.compact("it", older_than_days=0, now=datetime(2026, 1, 1))
+    march = IncidentFilter(start_date=date(2025, 3, 1), end_date=date(2025, 3, 31))
+    files = archive._files_for("it", march)
+    assert files and all("month=2025-03" in path for path in files)
+
+    cold = incident_repo.load("it", columns=["incident_id", "detected_at"], filters=march)
+    assert list(cold.columns) == ["incident_id", "detected_at"]
+    assert cold["detected_at"].dt.month.eq(3).all()
+
+
+def test_orphan_files_are_removed(db):
+    orphan = archive.archive_root() / "it" / "month=2025-01" / "part-orphan.parquet"
+    orphan.parent.mkdir(parents=True)
+    orphan.write_bytes(b"")
+    archive.compact("it", older_than_days=30, now=datetime(2025, 5, 1))
+    assert not orphan.exists()
+
+
+def test_file_being_committed_is_not_an_orphan(db):
+    written = threading.Event()
+    pending = archive.archive_root() / "it" / "month=2025-01" / "part-pending.parquet"
+
+    def writer():       # another run: file written, manifest row not committed yet
+        with db_pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            pending.parent.mkdir(parents=True)
+            pending.write_bytes(b"")
+            written.set()
+            time.sleep(0.3)
+            conn.execute("INSERT INTO archive_files (path, domain, month, row_count) "
+                         "VALUES ('it/month=2025-01/part-pending.parquet', 'it', '2025-01', 0)")
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    written.wait()
+    archive.compact("it", older_than_days=30, now=datetime(2025, 5, 1))
+    thread.join()
+    assert pending.exists()
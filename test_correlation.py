@@ -0,0 +1,68 @@
+"""Cross-domain correlation: the sweep matches a naive cross join; cached per window."""
+import numpy as np
+import pandas as pd
+
+import correlation
+import incident_repo
+
+
+def _frames(n=400, seed=11):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-06-01")
+
+    def times(size):
+        stamps = start + pd.to_timedelta(rng.integers(0, 5 * 24 * 60, size), "min")
+        return pd.Series(stamps).where(rng.random(size) > 0.02).astype("datetime64[us]")
+
+    cyber = pd.DataFrame({
+        "incident_id": np.arange(1, n + 1),
+        "incident_type": pd.Categorical(rng.choice(["ransomware", "phishing"], n)),
+        "reported_at": times(n),
+    })
+    it = pd.DataFrame({
+        "incident_id": np.arange(1, n + 1),
+        "incident_type": pd.Categorical(rng.choice(["outage", "latency"], n)),
+        "detected_at": times(n),
+    })
+    return cyber, it
+
+
+def test_sweep_matches_cross_join():
+    cyber, it = _frames()
+    window = pd.Timedelta(minutes=45)
+    links = correlation.link_incidents(cyber, it, window)
+
+    pairs = it.merge(cyber, how="cross", suffixes=("_it", "_cyber"))
+    lag = pairs["detected_at"] - pairs["reported_at"]
+    pairs = pairs[(lag >= pd.Timedelta(0)) & (lag <= window)]
+    expected = pairs.groupby("incident_id_it").agg(
+        count=("incident_id_cyber", "size"), latest=("reported_at", "max"))
+
+    assert sorted(links["it_incident_id"]) == sorted(expected.index)
+    got = links.set_index("it_incident_id").loc[expected.index]
+    assert (got["cyber_in_window"] == expected["count"]).all()
+    assert (got["cyber_reported_at"] == expected["latest"]).all()
+    assert (got["lag_minutes"].between(0, 45)).all()
+
+    followed = correlation.followed_counts(cyber, it, window)
+    per_cyber = pairs.groupby("incident_id_cyber").size()
+    assert (followed > 0).sum() == len(per_cyber)
+    assert followed[per_cyber.index - 1].tolist() == per_cyber.tolist()
+
+
+def test_cached_per_window_and_refreshed_by_writes(db):
+    incident_repo.insert("cyber", {"domain": "network", "type": "ransomware", "severity": "critical",
+                                   "status": "open", "reported_at": "2025-06-01 10:00:00"})
+    incident_repo.insert("it", {"service_name": "payments-api", "type": "outage",
+                                "severity": "high", "status": "open",
+                                "detected_at": "2025-06-01 10:40:00"})
+    hour = correlation.get_correlation(60)
+    assert hour.summary["linked_it"] == 1 and hour.summary["median_lag_minutes"] == 40
+    assert hour.pairs.loc["ransomware", "outage"] == 1
+    assert correlation.get_correlation(30).summary["linked_it"] == 0
+    assert correlation.get_correlation(60) is hour          # served from the cache
+
+    incident_repo.insert("it", {"service_name": "ledger-db", "type": "outage",
+                                "severity": "low", "status": "open",
+                                "detected_at": "2025-06-01 10:05:00"})
+    assert correlation.get_correlation(60).summary["linked_it"] == 2
@@ -1,5 +1,12 @@
+"""IT incidents load through cyber_db from a migrated database (a temporary one, not data1/)."""
+import incident_repo
 from cyber_db import get_it_incidents_df
 
-df = get_it_incidents_df()
-print(df)
-print("Rows in IT table:", len(df))
\ No newline at end of file
+
+def test_it_incidents_load(db):
+    assert get_it_incidents_df().empty
+    incident_repo.insert("it", {"service_name": "payments-api", "type": "outage",
+                                "severity": "high", "status": "open",
+                                "detected_at": "2025-04-01 10:00:00"})
+    df = get_it_incidents_df()
+    assert len(df) == 1 and df["severity"].iloc[0] == "high"
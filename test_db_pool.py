@@ -0,0 +1,57 @@
+"""Connection pool: a slow connect does not block borrowers, and a failed one frees its slot."""
+import sqlite3
+import threading
+
+import pytest
+
+from db_pool import ConnectionPool
+
+
+def test_connect_runs_outside_the_pool_lock(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.db", max_size=2, timeout=2.0)
+    with pool.connection():
+        pass                                    # one idle connection
+    opening, release = threading.Event(), threading.Event()
+    open_connection = pool._open
+
+    def slow_open():
+        opening.set()
+        release.wait(5)
+        return open_connection()
+
+    pool._open = slow_open
+    held = pool._acquire()
+
+    # another thread needs a second connection and is stuck connecting ...
+    other = threading.Thread(target=lambda: pool._release(pool._acquire()))
+    other.start()
+    assert opening.wait(5)
+    # ... while this one can still hand back and borrow the idle connection
+    def borrow():
+        pool._release(held)
+        pool._release(pool._acquire())
+
+    borrower = threading.Thread(target=borrow)
+    borrower.start()
+    borrower.join(1)
+    assert not borrower.is_alive()
+    release.set()
+    other.join(5)
+    assert pool.stats()["open"] == 2
+    pool.close()
+
+
+def test_failed_connect_gives_the_slot_back(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.db", max_size=1, timeout=0.5)
+    open_connection = pool._open
+
+    def broken():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    pool._open = broken
+    with pytest.raises(sqlite3.OperationalError):
+        pool._acquire()
+    pool._open = open_connection
+    with pool.connection() as conn:
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+    pool.close()
@@ -0,0 +1,87 @@
+"""Incremental sync: only changed rows are fetched, results match full queries."""
+import db_pool
+from db_helper import (
+    IncidentFilter,
+    get_incident_metrics,
+    get_severity_counts,
+    insert_cyber_incident,
+)
+from incident_delta import IncidentSync
+
+
+def _insert_batch(start, size):
+    with db_pool.connection() as conn:
+        conn.executemany(
+            "INSERT INTO cyber_incidents (type, severity, status, reported_at) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                ("phishing", ["low", "medium", "high", "critical"][i % 4],
+                 "open", f"2025-01-{1 + i % 28:02d} 00:00:00")
+                for i in range(start, start + size)
+            ],
+        )
+
+
+def test_rerun_cost_stays_flat_under_steady_inserts(db):
+    sync = IncidentSync("cyber")
+    sync.refresh()
+    batch = 50
+    for step in range(20):
+        _insert_batch(step * batch, batch)
+        assert sync.refresh()
+        # each rerun pulls exactly the new rows, however large the table is
+        assert sync.rows_fetched == batch
+        assert not sync.refresh() and sync.rows_fetched == 0
+
+    assert sync.metrics(IncidentFilter())["total"] == 20 * batch
+    assert len(sync.frame()) == 20 * batch
+
+    # the delta query is an index range scan, not a table scan
+    with db_pool.connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM cyber_incidents WHERE updated_seq > ?", (0,)
+        ).fetchall()
+    assert "idx_cyber_incidents_updated_seq" in plan[0][-1]
+
+
+def test_status_changes_and_deletes_are_applied(db):
+    _insert_batch(0, 40)
+    insert_cyber_incident("cybersecurity", "malware", "critical", "open", "2025-02-01")
+    sync = IncidentSync("cyber")
+    sync.refresh()
+
+    with db_pool.connection() as conn:
+        conn.execute("UPDATE cyber_incidents SET status = 'resolved' WHERE incident_id <= 10")
+        conn.execute("UPDATE cyber_incidents SET severity = 'low' WHERE type = 'malware'")
+        conn.execute("DELETE FROM cyber_incidents WHERE incident_id BETWEEN 11 AND 15")
+    sync.refresh()
+    assert sync.rows_fetched == 10 + 1 + 5
+
+    for filters in (
+        IncidentFilter(),
+        IncidentFilter(statuses=("resolved",)),
+        IncidentFilter(severities=("critical", "low"), types=("malware",)),
+    ):
+        assert sync.metrics(filters) == get_incident_metrics.uncached("cyber", filters)
+        assert (
+            sync.severity_counts(filters).to_dict()
+            == get_severity_counts.uncached("cyber", filters).to_dict()
+        )
+    assert len(sync.frame()) == 36
+
+
+def test_sessions_share_one_mirror(db):
+    _insert_batch(0, 30)
+    first = IncidentSync("cyber")
+    assert first.refresh() and first.rows_fetched == 30
+
+    # a new session starts from the shared cube: nothing is fetched again
+    second = IncidentSync("cyber")
+    assert second.mirror is first.mirror
+    assert second.refresh() and second.rows_fetched == 0
+    assert second.metrics(IncidentFilter()) == first.metrics(IncidentFilter())
+
+    _insert_batch(30, 5)
+    assert second.refresh() and second.rows_fetched == 5
+    assert first.refresh() and first.rows_fetched == 0
+    assert first.metrics(IncidentFilter())["total"] == 35
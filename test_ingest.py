@@ -0,0 +1,28 @@
+"""CSV ingestion: a resumed run reports rejected rows with their line in the file."""
+import pytest
+
+from ingest import ingest_csv
+
+
+class Crash(Exception):
+    pass
+
+
+def test_resume_reports_source_lines(db):
+    lines = ["incident_id,category,type,severity,status,reported_at"]
+    for i in range(1, 21):
+        severity = "bogus" if i in (3, 15) else "high"
+        lines.append(f"{i},cybersecurity,phishing,{severity},open,2025-04-{i:02d}")
+    path = db / "feed.csv"
+    path.write_text("\n".join(lines) + "\n")
+
+    def crash_after_two_chunks(report, offset, size):
+        if report.rows_loaded >= 8:
+            raise Crash
+
+    with pytest.raises(Crash):
+        ingest_csv(path, "cyber", mode="upsert", chunk_size=4, progress=crash_after_two_chunks)
+    report = ingest_csv(path, "cyber", mode="upsert", chunk_size=4, resume=True)
+    # incident 15 is on line 16 (the header is line 1), wherever the resume started
+    assert [line for line, _ in report.errors] == [16]
+    assert report.rows_loaded == 18 and report.rows_rejected == 2
@@ -0,0 +1,57 @@
+"""Instrumentation: histogram quantiles, spans with query text, cache hits and exports."""
+import json
+
+import pytest
+
+import db_pool
+import instrumentation
+import migrations
+from db_helper import IncidentFilter, count_incidents, insert_it_incident
+
+
+@pytest.fixture
+def store():
+    instrumentation.reset()
+    yield instrumentation.get_store()
+    instrumentation.reset()
+
+
+def test_histogram_quantiles_stay_within_a_bucket():
+    histogram = instrumentation.Histogram()
+    for ms in range(1, 1001):
+        histogram.observe(ms / 1000)
+    for q in (0.5, 0.95, 0.99):
+        assert histogram.quantile(q) == pytest.approx(q, rel=0.42)  # bucket width sqrt(2)
+    assert histogram.quantile(1.0) == histogram.max == 1.0
+
+
+def test_spans_record_queries_errors_and_slowest(store):
+    for seconds in (0.001, 0.5, 0.002):
+        store.record("db.q", seconds, rows=10, query=f"SELECT {seconds}")
+    with pytest.raises(ZeroDivisionError):
+        with instrumentation.span("db.q") as current:
+            instrumentation.note_query("SELECT  1\n  FROM t", rows=3)
+            1 / 0
+    snapshot = instrumentation.snapshot()
+    op = snapshot["operations"]["db.q"]
+    assert op["count"] == 4 and op["rows"] == 33 and op["errors"] == 1
+    assert current.query == "SELECT 1 FROM t"
+    assert snapshot["slow_queries"][0]["query"] == "SELECT 0.5"
+
+
+def test_db_helper_reports_cache_hits_and_exports(tmp_path, store):
+    db_pool.configure(tmp_path / "cw2.db")
+    migrations.migrate()
+    insert_it_incident("payments-api", "outage", "high", "open", "2025-04-01 10:00:00")
+    for _ in range(3):
+        assert count_incidents("it", IncidentFilter()) == 1
+    db_pool.get_pool().close()
+
+    op = instrumentation.snapshot()["operations"]["db_helper.count_incidents"]
+    assert (op["count"], op["cache_hits"], op["cache_misses"]) == (3, 2, 1)
+    assert json.loads(instrumentation.to_json())["operations"]["db_helper.count_incidents"]
+
+    text = instrumentation.to_prometheus()
+    assert 'cw2_operation_seconds_count{operation="db_helper.count_incidents"} 3' in text
+    assert 'cw2_cache_lookups_total{operation="db_helper.count_incidents",result="hit"} 2' in text
+    assert 'le="+Inf"} 3' in text
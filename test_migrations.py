@@ -0,0 +1,81 @@
+"""Schema migration tests: in-place upgrade and index use by dashboard filters."""
+import sqlite3
+from datetime import date
+
+import pytest
+
+import db_pool
+import migrations
+from db_helper import INCIDENT_TABLES, IncidentFilter, build_where
+
+
+def _plan(domain, filters):
+    where_sql, params = build_where(domain, filters)
+    table = INCIDENT_TABLES[domain]["table"]
+    with db_pool.connection() as conn:
+        rows = conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT COUNT(*) FROM {table}{where_sql}", params
+        ).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def test_upgrades_legacy_database_in_place(db_file):
+    # Shape left behind by it_db.load_it_incidents_csv's to_sql(replace)
+    conn = sqlite3.connect(db_file)
+    conn.executescript("""
+        CREATE TABLE cyber_incidents ("incident_id" INTEGER, "domain" TEXT, "type" TEXT,
+            "severity" TEXT, "status" TEXT, "reported_at" TEXT);
+        INSERT INTO cyber_incidents VALUES (1, 'cybersecurity', 'phishing', 'High', ' open', '2025-11-20');
+        INSERT INTO cyber_incidents VALUES (NULL, 'cybersecurity', 'malware', 'critical', 'investigating', '2025-12-01');
+        CREATE TABLE it_incidents ("incident_id" INTEGER, "service_name" TEXT, "incident_type" TEXT,
+            "severity" TEXT, "status" TEXT, "detected_at" TEXT, "resolved_at" TEXT);
+        INSERT INTO it_incidents VALUES (1, 'Auth API', 'Outage', 'critical', 'resolved', '2025-11-10', '2025-11-10');
+    """)
+    conn.close()
+
+    assert migrations.migrate() == migrations.LATEST_VERSION
+
+    with db_pool.connection() as conn:
+        cyber = conn.execute(
+            "SELECT incident_id, domain, type, severity, status, reported_at "
+            "FROM cyber_incidents ORDER BY incident_id"
+        ).fetchall()
+        it_cols = [row[1] for row in conn.execute("PRAGMA table_info(it_incidents)")]
+        it_type = conn.execute("SELECT type, detected_at FROM it_incidents").fetchone()
+
+    assert cyber == [
+        (1, "cybersecurity", "phishing", "high", "open", "2025-11-20 00:00:00"),
+        (2, "cybersecurity", "malware", "critical", "investigating", "2025-12-01 00:00:00"),
+    ]
+    assert "type" in it_cols and "incident_type" not in it_cols
+    assert it_type == ("Outage", "2025-11-10 00:00:00")
+
+    # Re-running is a no-op
+    assert migrations.migrate() == migrations.LATEST_VERSION
+
+
+def test_constraints_reject_bad_values(db):
+    with pytest.raises(sqlite3.IntegrityError):
+        with db_pool.connection() as conn:
+            conn.execute("INSERT INTO cyber_incidents (severity) VALUES ('urgent')")
+    with pytest.raises(sqlite3.IntegrityError):
+        with db_pool.connection() as conn:
+            conn.execute("INSERT INTO it_incidents (detected_at) VALUES ('20/11/2025')")
+
+
+@pytest.mark.parametrize("domain, filters, index", [
+    ("cyber", IncidentFilter(severities=("high", "critical"), statuses=("open",),
+                             start_date=date(2025, 1, 1), end_date=date(2025, 2, 1)),
+     "idx_cyber_sev_status_reported"),
+    ("cyber", IncidentFilter(start_date=date(2025, 1, 1), end_date=date(2025, 2, 1)),
+     "idx_cyber_reported"),
+    ("it", IncidentFilter(severities=("high",), statuses=("open", "investigating"),
+                          start_date=date(2025, 1, 1)),
+     "idx_it_sev_status_detected"),
+    ("it", IncidentFilter(services=("Auth API",), start_date=date(2025, 1, 1),
+                          end_date=date(2025, 2, 1)),
+     "idx_it_service_detected"),
+])
+def test_dashboard_filters_use_indexes(db, domain, filters, index):
+    plan = _plan(domain, filters)
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
@@ -0,0 +1,71 @@
+"""Keyset pagination returns every filtered row exactly once, in order."""
+import pytest
+
+import db_pool
+from db_helper import INCIDENT_TABLES, IncidentFilter, count_incidents, get_incidents_page
+
+
+@pytest.fixture
+def db(db):
+    with db_pool.connection() as conn:
+        conn.executemany(
+            "INSERT INTO it_incidents (service_name, type, severity, status, detected_at, resolved_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    None if i % 11 == 0 else f"svc-{i % 7}",
+                    ["outage", "latency", "degraded"][i % 3],
+                    ["low", "medium", "high", "critical"][i % 4],
+                    ["open", "investigating", "resolved"][i % 3],
+                    None if i % 13 == 0 else f"2025-03-{1 + i % 5:02d} 00:00:00",
+                    None,
+                )
+                for i in range(157)
+            ],
+        )
+    return db
+
+
+def _all_pages(filters, sort_column, descending, page_size=10):
+    ids, cursor = [], None
+    while True:
+        df, cursor = get_incidents_page.uncached(
+            "it", filters, page_size=page_size, sort_column=sort_column,
+            descending=descending, after=cursor,
+        )
+        ids.extend(df["incident_id"].tolist())
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("sort_column", ["detected_at", "service_name", "severity", "incident_id"])
+@pytest.mark.parametrize("descending", [True, False])
+def test_keyset_pages_match_full_ordering(db, sort_column, descending):
+    filters = IncidentFilter(statuses=("open", "investigating"))
+    order = "DESC" if descending else "ASC"
+    with db_pool.connection() as conn:
+        expected = [
+            r[0] for r in conn.execute(
+                f"SELECT incident_id FROM it_incidents WHERE status IN ('open', 'investigating') "
+                f"ORDER BY {sort_column} {order}, incident_id {order}"
+            )
+        ]
+    assert _all_pages(filters, sort_column, descending) == expected
+    assert count_incidents.uncached("it", filters) == len(expected)
+
+
+def test_rejects_unknown_sort_column(db):
+    with pytest.raises(ValueError):
+        get_incidents_page.uncached("it", IncidentFilter(), sort_column="1; DROP TABLE users")
+
+
+def test_default_page_seeks_through_date_index(db):
+    columns = INCIDENT_TABLES["it"]["columns"]
+    with db_pool.connection() as conn:
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT {columns} FROM it_incidents "
+            "WHERE ((detected_at, incident_id) < (?, ?) OR detected_at IS NULL) "
+            "ORDER BY detected_at DESC, incident_id DESC LIMIT 101",
+            ("2025-03-03 00:00:00", 50),
+        ).fetchall()
+    assert not any("TEMP B-TREE" in row[-1] for row in plan), plan
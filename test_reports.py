@@ -0,0 +1,112 @@
+"""Saved report views: incremental snapshots match a full recompute; exports stream in chunks."""
+from datetime import date
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import db_pool
+import incident_repo
+import reports
+from analytics import dashboard_view
+from incident_repo import IncidentFilter
+from reports import SavedView
+
+
+def _row(i, day=None):
+    return {"service_name": ["payments-api", "auth-worker", "ledger-db"][i % 3], "type": "outage",
+            "severity": ["low", "high", "critical"][i % 3],
+            "status": ["open", "resolved"][i % 2],
+            "detected_at": f"2025-04-{day or 1 + i % 20:02d} 10:00:00"}
+
+
+@pytest.fixture
+def db(db):
+    incident_repo.insert_many("it", (_row(i) for i in range(60)))
+    return db
+
+
+def _same_as_dashboard(snapshot):
+    live = dashboard_view("it", snapshot.filters)
+    view = reports.snapshot_view(snapshot)
+    assert view.metrics == live.metrics
+    pd.testing.assert_series_equal(view.severity_counts.sort_index(),
+                                   live.severity_counts.sort_index())
+    pd.testing.assert_series_equal(view.time_series, live.time_series)
+
+
+def test_incremental_snapshot_matches_full(db):
+    view = SavedView("it-high", "it", IncidentFilter(severities=("high", "critical")),
+                     last_days=10)
+    reports.save_view(view)
+    today = date(2025, 4, 20)
+    snapshot, mode = reports.refresh_snapshot(view, today=today)
+    assert mode == "full" and snapshot.summary["metrics"]["total"] == 20
+    _same_as_dashboard(snapshot)
+    assert reports.refresh_snapshot(view, today=today)[1] == "unchanged"
+
+    incident_repo.insert_many("it", (_row(i, day=18) for i in range(1, 10)))
+    snapshot, mode = reports.refresh_snapshot(view, today=today)
+    assert mode == "incremental" and snapshot.summary["metrics"]["total"] == 26
+    _same_as_dashboard(snapshot)
+    assert reports.get_snapshot("it-high") == snapshot
+
+    with db_pool.connection() as conn:          # an edit can remove counted rows
+        conn.execute("UPDATE it_incidents SET severity = 'low' WHERE incident_id = 2")
+    snapshot, mode = reports.refresh_snapshot(view, today=today)
+    assert mode == "full"
+    _same_as_dashboard(snapshot)
+    assert reports.refresh_snapshot(view, today=date(2025, 4, 21))[1] == "full"  # window moved
+
+
+def test_exports_stream_and_rerun_incrementally(db):
+    view = SavedView("it-all", "it", IncidentFilter(), formats=("csv", "parquet", "html"))
+    reports.save_view(view)
+    assert [v.name for v in reports.list_views("it")] == ["it-all"]
+    out = db / "out"
+
+    reports.refresh_snapshot(view)          # as the dashboard picker does: no export yet
+    first = reports.run(view, out, chunk_rows=7)
+    assert first.mode == "full" and first.rows == 60
+    csv_file, parquet_file, html_file = first.files
+    exported = pd.read_csv(csv_file)
+    assert len(exported) == 60 and list(exported.columns)[0] == "incident_id"
+    assert pq.ParquetFile(parquet_file).metadata.num_row_groups == 9      # one per chunk
+    assert html_file.read_text().count("10:00:00</td>") == 60
+    assert list((out / "it-all").glob(".*.tmp")) == []
+
+    incident_repo.insert_many("it", (_row(i) for i in range(5)))
+    second = reports.run(view, out, chunk_rows=7)
+    assert second.mode == "incremental" and second.rows == 5
+    assert second.files[0].name.endswith("-delta.csv")
+    assert pd.read_csv(second.files[0])["incident_id"].tolist() == list(range(61, 66))
+    assert reports.run(view, out).mode == "unchanged"
+
+
+def test_rows_edited_after_the_snapshot_are_not_dropped(db):
+    view = SavedView("it-all", "it", IncidentFilter())
+    reports.save_view(view)
+    out = db / "out"
+    snapshot, _ = reports.refresh_snapshot(view)
+    with db_pool.connection() as conn:
+        conn.execute("UPDATE it_incidents SET status = 'closed' WHERE incident_id = 2")
+    with pytest.raises(reports.StaleSnapshot):
+        reports.export(snapshot, ["csv"], out)
+    assert list(out.rglob("*.csv")) == []
+
+    report = reports.run(view, out)        # refreshes the snapshot, then exports
+    assert report.mode == "full" and report.rows == 60
+    exported = pd.read_csv(report.files[0])
+    assert exported.loc[exported["incident_id"] == 2, "status"].item() == "closed"
+
+
+def test_edits_since_the_last_export_force_a_full_export(db):
+    view = SavedView("it-all", "it", IncidentFilter())
+    reports.save_view(view)
+    reports.run(view, db / "out")
+    with db_pool.connection() as conn:
+        conn.execute("UPDATE it_incidents SET status = 'closed' WHERE incident_id = 2")
+    reports.refresh_snapshot(view)          # the dashboard picker: no export
+    incident_repo.insert_many("it", (_row(i) for i in range(5)))
+    report = reports.run(view, db / "out")
+    assert report.mode == "full" and report.rows == 65
@@ -0,0 +1,68 @@
+"""Search index: kept in sync by triggers and bulk loads, prefix and fuzzy matching."""
+import pytest
+
+import db_pool
+import incident_repo
+import search_index
+from incident_cache import invalidate
+from db_helper import IncidentFilter
+from ingest import ingest_csv
+
+
+@pytest.fixture
+def db(db):
+    incident_repo.insert_many("it", (
+        {
+            "service_name": ["payments-api", "ledger-stream", "auth-worker"][i % 3],
+            "type": ["outage", "latency"][i % 2],
+            "severity": ["low", "critical"][i % 2],
+            "status": "open",
+            "detected_at": f"2025-04-{1 + i % 20:02d} 10:00:00",
+        }
+        for i in range(60)
+    ))
+    return db
+
+
+def test_prefix_fuzzy_and_filters(db):
+    assert search_index.search("it", "pay").total == 20
+    assert search_index.search("it", "pay api").total == 20
+
+    fuzzy = search_index.search("it", "ledgr")
+    assert fuzzy.corrections == {"ledgr": ["ledger"]} and fuzzy.total == 20
+
+    critical = search_index.search("it", "outage", IncidentFilter(severities=("critical",)))
+    assert critical.total == 0
+    assert search_index.search("it", "nothing-like-this").total == 0
+
+
+def test_triggers_follow_updates_and_deletes(db):
+    incident_id = incident_repo.insert("it", {"service_name": "search-gateway", "type": "outage",
+                                              "severity": "high", "status": "open",
+                                              "detected_at": "2025-05-01 09:00:00"})
+    assert search_index.search("it", "gateway").rows["incident_id"].tolist() == [incident_id]
+
+    with db_pool.connection() as conn:
+        conn.execute("UPDATE it_incidents SET service_name = 'billing-db' WHERE incident_id = ?",
+                     (incident_id,))
+    invalidate("it_incidents")
+    assert search_index.search("it", "gateway").total == 0
+    assert search_index.search("it", "billing").total == 1
+    assert search_index.check()
+
+
+def test_index_survives_replace_load(db):
+    csv = db / "it.csv"
+    csv.write_text(
+        "incident_id,service_name,incident_type,severity,status,detected_at\n"
+        "1,mail-relay,outage,high,open,2025-06-01 10:00:00\n"
+        "2,mail-relay,latency,low,resolved,2025-06-02 10:00:00\n"
+    )
+    ingest_csv(csv, "it", mode="replace")
+    assert search_index.search("it", "mail").total == 2
+    assert search_index.search("it", "payments").total == 0
+    assert search_index.check()
+
+    ingest_csv(csv, "it", mode="append")         # bulk path indexes in one statement
+    assert search_index.search("it", "relay").total == 4
+    assert search_index.check()
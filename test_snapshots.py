@@ -0,0 +1,72 @@
+"""Shared snapshots: same frame as SQLite, mapped zero-copy, rebuilt within the staleness bound."""
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import db_pool
+import incident_repo
+import snapshots
+from incident_repo import IncidentFilter
+
+ROOT = Path(__file__).resolve().parent
+
+OTHER_PROCESS = """
+import sys
+import db_pool, incident_repo, snapshots
+db_pool.configure(sys.argv[1])
+snapshots.MAX_STALENESS = 0
+frame = snapshots.frame("it")
+print(len(frame), snapshots._mapped["it_incidents"].path.name)
+incident_repo.insert("it", {"service_name": "ledger-db", "type": "outage", "severity": "low",
+                            "status": "open", "detected_at": "2025-05-02 08:00:00"})
+"""
+
+
+def _row(i):
+    return {"service_name": ["payments-api", "auth-worker"][i % 2], "type": "outage",
+            "severity": ["low", "critical"][i % 2], "status": ["open", "resolved"][i % 2],
+            "detected_at": f"2025-04-{1 + i % 20:02d} 10:00:00",
+            "resolved_at": None if i % 2 == 0 else f"2025-04-{1 + i % 20:02d} 12:00:00"}
+
+
+@pytest.fixture
+def db(db, monkeypatch):
+    monkeypatch.setattr(snapshots, "ENABLED", True)
+    monkeypatch.setattr(snapshots, "MAX_STALENESS", 0)
+    snapshots._mapped.clear()
+    incident_repo.insert_many("it", (_row(i) for i in range(50)))
+    yield db
+    snapshots._mapped.clear()
+
+
+def test_snapshot_matches_sqlite_and_is_mapped(db):
+    spec = IncidentFilter(severities=("critical",))
+    shared = incident_repo.load("it", filters=spec, include_archive=False)
+    direct = incident_repo._load.uncached("it", incident_repo._project("it", None), spec)
+    pd.testing.assert_frame_equal(shared, direct.sort_values("incident_id", ignore_index=True))
+
+    whole = snapshots.frame("it")
+    assert len(whole) == 50 and whole["resolved_at"].isna().sum() == 25
+    owner = whole["incident_id"].to_numpy()
+    while isinstance(owner, np.ndarray):
+        owner = owner.base
+    assert owner is not None        # the column is a view of the mapped Arrow buffer
+    assert snapshots.load("it", ("incident_id",), IncidentFilter())["incident_id"] is not None
+
+
+def test_writes_from_another_process_are_seen(db, monkeypatch):
+    snapshots.frame("it")
+    run = subprocess.run([sys.executable, "-c", OTHER_PROCESS, str(db / "cw2.db")], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    count, name = run.stdout.split()
+    assert count == "50" and name == snapshots._mapped["it_incidents"].path.name  # reused the file
+
+    monkeypatch.setattr(snapshots, "MAX_STALENESS", 3600)
+    assert len(snapshots.frame("it")) == 50           # stale, but within the bound
+    monkeypatch.setattr(snapshots, "MAX_STALENESS", 0)
+    assert len(snapshots.frame("it")) == 51
+    assert len(list((db / "snapshots").glob("*.arrow"))) == 1
@@ -0,0 +1,104 @@
+"""Group-commit write queue: throughput under concurrency, errors and back-pressure."""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import db_pool
+from write_queue import WriteQueue, WriteQueueFull
+
+ROWS_PER_TEST = 200
+
+
+def _incident(n, severity="medium"):
+    return {"service_name": f"svc-{n % 9}", "type": "latency", "severity": severity,
+            "status": "open", "detected_at": f"2025-05-01 10:{n // 60 % 60:02d}:{n % 60:02d}"}
+
+
+@pytest.mark.parametrize("submitters", [1, 10, 100])
+def test_concurrent_submitters_are_group_committed(db, submitters):
+    writer = WriteQueue()
+    per_submitter = ROWS_PER_TEST // submitters
+    ids, errors = [], []
+    lock = threading.Lock()
+
+    def submitter(k):
+        # like a form handler: submit one row and wait until it is committed
+        try:
+            for i in range(per_submitter):
+                incident_id = writer.submit("it", _incident(k * per_submitter + i)).result(30)
+                with lock:
+                    ids.append(incident_id)
+        except Exception as exc:   # e.g. "database is locked"
+            errors.append(exc)
+
+    threads = [threading.Thread(target=submitter, args=(k,)) for k in range(submitters)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+
+    stats = writer.stats()
+    total = per_submitter * submitters
+    assert not errors
+    assert len(set(ids)) == total and stats["rows_written"] == total
+    if submitters > 1:
+        assert stats["batches"] < total       # concurrent rows shared commits
+    else:
+        assert stats["batches"] == total      # a lone submitter is not held back
+    with db_pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM it_incidents").fetchone()[0] == total
+
+
+def test_simultaneous_single_submits_share_commits(db):
+    writer = WriteQueue()
+    start = threading.Barrier(50)
+    futures = []
+
+    def submit_one(n):
+        start.wait()
+        futures.append(writer.submit("it", _incident(n)))
+
+    threads = [threading.Thread(target=submit_one, args=(n,)) for n in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(f.result(timeout=30) for f in futures)
+    writer.close()
+    stats = writer.stats()
+    assert stats["rows_written"] == 50 and stats["batches"] < 50 and stats["largest_batch"] > 1
+
+
+def test_bad_row_fails_alone(db):
+    writer = WriteQueue(max_latency=0.2)
+    good = writer.submit("it", _incident(1))
+    with pytest.raises(ValueError):
+        writer.submit("it", {"service_name": "x", "detected_at": "not a date"})
+    # passes validation but breaks the schema's CHECK constraint
+    bad = writer.submit("it", {**_incident(2), "status": "snoozed"})
+    other = writer.submit("it", _incident(3))
+    assert good.result(timeout=5) and other.result(timeout=5)
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result(timeout=5)
+    writer.close()
+    assert writer.stats()["rows_failed"] == 1
+
+
+def test_full_queue_pushes_back(db):
+    # hold the write lock so the writer thread stalls on its first batch
+    blocker = sqlite3.connect(db / "cw2.db", timeout=0)
+    blocker.execute("BEGIN IMMEDIATE")
+    writer = WriteQueue(max_pending=5, max_batch=1)
+    futures = [writer.submit("it", _incident(0))]
+    time.sleep(0.1)                     # writer has taken the first row
+    futures += [writer.submit("it", _incident(n)) for n in range(1, 6)]
+    with pytest.raises(WriteQueueFull):
+        writer.submit("it", _incident(99), timeout=0.05)
+
+    blocker.rollback()
+    blocker.close()
+    assert all(f.result(timeout=30) for f in futures)
+    writer.close()
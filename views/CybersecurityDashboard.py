@@ -0,0 +1,188 @@
+from db_helper import IncidentFilter, get_filter_options
+import streamlit as st
+import pandas as pd
+
+from access import session_policy
+from analytics import dashboard_view
+from reports import snapshot_view
+from incident_delta import session_sync
+from incident_alerts import render_alerts
+from incident_reports import saved_view_picker
+from incident_search import render_search
+from incident_table import render_table_page, table_request
+from incident_upload import render_bulk_upload
+from write_queue import WriteQueueFull, submit_incident
+
+SAVE_TIMEOUT = 10  # seconds to wait for the new incident to be committed
+
+
+def show():
+    """Render the cybersecurity incident analytics dashboard."""
+    st.title("Cybersecurity – Incident Dashboard")
+
+    user = st.session_state.get("logged_in_user")
+    role = st.session_state.get("role")
+
+    # Enforce authentication
+    if not user:
+        st.warning("Please log in from the Login page before viewing this dashboard.")
+        return
+
+    st.caption(f"Logged in as **{user}** (role: `{role}`)")
+
+    # Row access of the role, compiled into every query's WHERE clause
+    policy = session_policy(st.session_state)
+    if not policy.allows("cyber"):
+        st.error(f"Your role (`{role}`) has no access to cybersecurity incidents.")
+        return
+    if not policy.unrestricted("cyber"):
+        st.info("Your role sees part of the cybersecurity incidents; "
+                "every figure below covers those rows only.")
+
+    flash = st.session_state.pop("cyber_flash", None)
+    if flash:
+        st.success(flash)
+
+    # ---------- Filter options (distinct values only, not the table) ----------
+    options = policy.options("cyber", get_filter_options("cyber", policy.restrict("cyber")))
+
+    if pd.isna(options["min_date"]):
+        st.error("No incidents found in the database.")
+        return
+
+    # ---------- Sidebar filters ----------
+    snapshot = saved_view_picker("cyber", key="cyber_saved_view", policy=policy)
+    st.sidebar.subheader("Incident Filters")
+
+    severities = options["severities"]
+    selected_severity = st.sidebar.multiselect(
+        "Severity", severities, default=severities,
+        disabled=snapshot is not None,
+    )
+
+    statuses = options["statuses"]
+    selected_status = st.sidebar.multiselect(
+        "Status", statuses, default=statuses,
+        disabled=snapshot is not None,
+    )
+
+    types = options["types"]
+    selected_type = st.sidebar.multiselect(
+        "Incident Type", types, default=types,
+        disabled=snapshot is not None,
+    )
+
+    min_date = options["min_date"].date()
+    max_date = options["max_date"].date()
+    date_range = st.sidebar.date_input(
+        "Reported Date Range",
+        value=(min_date, max_date),
+        min_value=min_date,
+        max_value=max_date,
+        disabled=snapshot is not None,
+    )
+
+    if isinstance(date_range, tuple):
+        start_date, end_date = date_range
+    else:
+        start_date = end_date = date_range
+
+    # Filters are applied in SQLite, not on a full DataFrame
+    filters = policy.restrict("cyber", IncidentFilter(
+        severities=tuple(selected_severity),
+        statuses=tuple(selected_status),
+        types=tuple(selected_type),
+        start_date=start_date,
+        end_date=end_date,
+    ))
+    if snapshot is not None:
+        filters = snapshot.filters
+
+    # ---------- Key metrics ----------
+    st.subheader("Key Metrics")
+    col1, col2, col3 = st.columns(3)
+
+    st.subheader("Search")
+    render_search("cyber", filters, key="cyber_search")
+
+    st.subheader("Incident Table")
+    table = table_request("cyber", filters, key="cyber_table")
+
+    # All numbers below come from the headless core (analytics.py); metrics
+    # from the session's incrementally synced cube, or a saved view's snapshot
+    if snapshot is not None:
+        view = snapshot_view(snapshot, table)
+    else:
+        view = dashboard_view(
+            "cyber", filters, table, sync=session_sync(st.session_state, "cyber", policy.restrict("cyber"))
+        )
+    metrics = view.metrics
+    col1.metric("Total Incidents", metrics["total"])
+    col2.metric("Open / Investigating", metrics["open_investigating"])
+    col3.metric("High / Critical", metrics["high_critical"])
+
+    # ---------- Data table ----------
+    render_table_page(view, table, key="cyber_table")
+
+    # ---------- Visual analytics ----------
+    st.subheader("Incidents by Severity")
+    if metrics["total"]:
+        st.bar_chart(view.severity_counts)
+
+    st.subheader("Incidents over Time")
+    if metrics["total"]:
+        st.line_chart(view.time_series)
+
+    st.subheader("Spike Alerts")
+    render_alerts("cyber", filters, key="cyber_alerts", scope=policy.restrict("cyber"))
+
+    # ---------- Create new incident ----------
+    st.subheader("Add New Incident")
+
+    with st.form("new_incident_form", clear_on_submit=True):
+        col_a, col_b = st.columns(2)
+        with col_a:
+            new_type = st.text_input(
+                "Incident type (e.g. phishing, malware, ransomware)"
+            )
+            new_severity = st.selectbox(
+                "Severity", ["low", "medium", "high", "critical"]
+            )
+        with col_b:
+            new_status = st.selectbox(
+                "Status", ["open", "investigating", "resolved"]
+            )
+            new_date = st.date_input("Reported date")
+
+        submitted = st.form_submit_button("Create incident")
+
+    if submitted:
+        if not new_type.strip():
+            st.error("Please enter an incident type.")
+        else:
+            # Queued for the background writer, which group-commits inserts;
+            # the future resolves once the row is committed
+            try:
+                incident_id = submit_incident("cyber", {
+                    "domain": "cybersecurity",
+                    "incident_type": new_type.strip(),
+                    "severity": new_severity,
+                    "status": new_status,
+                    "reported_at": str(new_date),
+                }).result(timeout=SAVE_TIMEOUT)
+            except WriteQueueFull:
+                st.error("The database is busy right now; please submit again.")
+            except Exception as exc:
+                st.error(f"Incident was not saved: {exc}")
+            else:
+                # Cached queries see the new table version, so a rerun is enough
+                st.session_state["cyber_flash"] = f"New incident #{incident_id} saved."
+                st.rerun()
+
+    # ---------- Bulk import ----------
+    st.subheader("Bulk Import")
+    render_bulk_upload("cyber", key="cyber_import", scope=policy.restrict("cyber"))
+
+
+if __name__ == "__main__":
+    show()
\ No newline at end of file
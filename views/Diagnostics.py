@@ -0,0 +1,95 @@
+import pandas as pd
+import streamlit as st
+
+import instrumentation
+from incident_cache import cache_stats
+
+ADMIN_ROLES = ("admin", "it_admin")
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def show():
+    st.title("Diagnostics")
+
+    # ---------- auth check (admins only) ----------
+    user = st.session_state.get("logged_in_user")
+    role = st.session_state.get("role")
+
+    if not user:
+        st.warning("Please login from the Login page first.")
+        return
+    if role not in ADMIN_ROLES:
+        st.error("The diagnostics page is only available to administrators.")
+        return
+
+    if not instrumentation.ENABLED:
+        st.info("Instrumentation is switched off (CW2_INSTRUMENTATION=0).")
+        return
+
+    snapshot = instrumentation.snapshot()
+    operations = snapshot["operations"]
+    st.caption("Timings since this server process started (or was last reset), "
+               "shared by every session.")
+
+    # ---------- headline numbers ----------
+    cache = cache_stats()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Reruns", sum(snapshot["reruns"].values()))
+    c2.metric("Operations", len(operations))
+    c3.metric("Cache hit rate", f"{cache['hit_rate']:.0%}")
+    c4.metric("Cache size", f"{cache['bytes'] / 2**20:.1f} MB")
+
+    # ---------- per-operation percentiles ----------
+    st.subheader("Operations")
+    if operations:
+        table = pd.DataFrame([
+            {
+                "operation": name,
+                "calls": op["count"],
+                "p50 ms": _ms(op["p50_seconds"]),
+                "p95 ms": _ms(op["p95_seconds"]),
+                "p99 ms": _ms(op["p99_seconds"]),
+                "max ms": _ms(op["max_seconds"]),
+                "total s": round(op["sum_seconds"], 3),
+                "rows": op["rows"],
+                "cache hits": op["cache_hits"],
+                "cache misses": op["cache_misses"],
+                "errors": op["errors"],
+            }
+            for name, op in operations.items()
+        ]).sort_values("p95 ms", ascending=False)
+        st.dataframe(table, use_container_width=True, hide_index=True)
+    else:
+        st.info("Nothing recorded yet; open a dashboard first.")
+
+    # ---------- slowest queries ----------
+    st.subheader("Slowest queries")
+    slow = snapshot["slow_queries"]
+    if slow:
+        st.dataframe(pd.DataFrame([
+            {"ms": _ms(q["seconds"]), "operation": q["operation"], "rows": q["rows"],
+             "query": q["query"], "at": pd.Timestamp(q["at"], unit="s").floor("s")}
+            for q in slow
+        ]), use_container_width=True, hide_index=True)
+    else:
+        st.info("No queries recorded yet.")
+
+    # ---------- export ----------
+    st.subheader("Export")
+    d1, d2, d3 = st.columns(3)
+    d1.download_button("Download JSON", instrumentation.to_json(),
+                       file_name="cw2_metrics.json", mime="application/json")
+    d2.download_button("Download Prometheus text", instrumentation.to_prometheus(),
+                       file_name="cw2_metrics.prom", mime="text/plain")
+    if d3.button("Reset timings"):
+        instrumentation.reset()
+        st.rerun()
+    st.caption("Set CW2_METRICS_PORT to serve the same data at /metrics and "
+               "/metrics.json for scraping.")
+
+
+if __name__ == "__main__":
+    show()
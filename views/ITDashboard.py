@@ -0,0 +1,199 @@
+import pandas as pd
+import streamlit as st
+
+# use the helper functions from db_helper.py
+from db_helper import IncidentFilter, get_filter_options
+from access import session_policy
+from analytics import dashboard_view
+from reports import snapshot_view
+from mttr import get_open_counts, get_resolution_table, get_sla_summary
+from incident_delta import session_sync
+from incident_alerts import render_alerts
+from incident_reports import saved_view_picker
+from incident_search import render_search
+from incident_table import render_table_page, table_request
+from incident_upload import render_bulk_upload
+from write_queue import WriteQueueFull, submit_incident
+
+SAVE_TIMEOUT = 10  # seconds to wait for the new incident to be committed
+
+
+def _hours(value):
+    return "–" if value is None else f"{value:.1f}"
+
+
+def show():
+    st.title("IT Operations – Service Outage Dashboard")
+
+    # ---------- auth check ----------
+    user = st.session_state.get("logged_in_user")
+    role = st.session_state.get("role")
+
+    if not user:
+        st.warning("Please login from the Login page first.")
+        return
+
+    st.caption(f"Logged in as **{user}** (role: `{role}`)")
+
+    # row access of the role, compiled into every query's WHERE clause
+    policy = session_policy(st.session_state)
+    if not policy.allows("it"):
+        st.error(f"Your role (`{role}`) has no access to IT incidents.")
+        return
+    if not policy.unrestricted("it"):
+        st.info("Your role sees part of the IT incidents; "
+                "every figure below covers those rows only.")
+
+    flash = st.session_state.pop("it_flash", None)
+    if flash:
+        st.success(flash)
+
+    # ---------- filter options (distinct values only) ----------
+    options = policy.options("it", get_filter_options("it", policy.restrict("it")))
+
+    if not options["severities"]:
+        st.error("No IT incidents found in the database.")
+        return
+
+    # ---------- sidebar filters ----------
+    snapshot = saved_view_picker("it", key="it_saved_view", policy=policy)
+    st.sidebar.subheader("IT Incident Filters")
+
+    services = options["services"]
+    selected_services = st.sidebar.multiselect(
+        "Service name", services, default=services,
+        disabled=snapshot is not None,
+    )
+
+    severities = options["severities"]
+    selected_severity = st.sidebar.multiselect(
+        "Severity", severities, default=severities,
+        disabled=snapshot is not None,
+    )
+
+    statuses = options["statuses"]
+    selected_status = st.sidebar.multiselect(
+        "Status", statuses, default=statuses,
+        disabled=snapshot is not None,
+    )
+
+    # filters are pushed down into the SQL query
+    filters = policy.restrict("it", IncidentFilter(
+        services=tuple(selected_services),
+        severities=tuple(selected_severity),
+        statuses=tuple(selected_status),
+    ))
+    if snapshot is not None:
+        filters = snapshot.filters
+
+    # ---------- key metrics ----------
+    st.subheader("Key Metrics")
+    c1, c2, c3 = st.columns(3)
+
+    st.subheader("Search")
+    render_search("it", filters, key="it_search")
+
+    st.subheader("IT Incident Table")
+    table = table_request("it", filters, key="it_table")
+
+    # computed by the headless core (analytics.py); metrics from the
+    # session's incrementally synced cube, or a saved view's snapshot
+    if snapshot is not None:
+        view = snapshot_view(snapshot, table)
+    else:
+        view = dashboard_view("it", filters, table,
+                              sync=session_sync(st.session_state, "it", policy.restrict("it")))
+    metrics = view.metrics
+
+    c1.metric("Total IT incidents", metrics["total"])
+    c2.metric("Open / Investigating", metrics["open_investigating"])
+    c3.metric("Resolved", metrics["resolved"])
+
+    # ---------- table ----------
+    render_table_page(view, table, key="it_table")
+
+    # ---------- simple charts ----------
+    st.subheader("Incidents by Severity")
+    if metrics["total"]:
+        st.bar_chart(view.severity_counts.to_frame("count"))
+
+    st.subheader("Incidents over Time (Detected)")
+    if metrics["total"]:
+        st.line_chart(view.time_series)
+
+    st.subheader("Spike Alerts")
+    render_alerts("it", filters, key="it_alerts", scope=policy.restrict("it"))
+
+    # ---------- resolution time & SLA ----------
+    st.subheader("Resolution Time & SLA")
+    if metrics["total"]:
+        # rounded so the cached figures are reused within the hour
+        as_of = pd.Timestamp.now().floor("h").to_pydatetime()
+        sla = get_sla_summary("it", filters, as_of)
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("MTTR (hours)", _hours(sla["mean_hours"]))
+        m2.metric("Median (hours)", _hours(sla["median_hours"]))
+        m3.metric("p95 (hours)", _hours(sla["p95_hours"]))
+        m4.metric("SLA breaches", sla["breached_resolved"] + sla["breached_open"],
+                  help=f"{sla['breached_open']} still open past their target")
+        if sla["unknown_duration"]:
+            st.caption(f"{sla['unknown_duration']} finished incidents have no resolved "
+                       "date and are left out of the times and breaches.")
+
+        st.caption("Concurrently open incidents (end of day)")
+        st.line_chart(get_open_counts("it", filters, "D"))
+
+        st.caption("Slowest services by p95 time to resolve")
+        slowest = get_resolution_table("it", filters).sort_values("p95_hours", ascending=False)
+        st.dataframe(slowest.head(15).round(2), use_container_width=True)
+
+    # ---------- add new incident ----------
+    st.subheader("Add New IT Incident")
+
+    with st.form("new_it_incident", clear_on_submit=True):
+        colA, colB = st.columns(2)
+        with colA:
+            new_service = st.text_input("Service name")
+            new_incident_type = st.text_input("Incident type (e.g. outage, latency)")
+        with colB:
+            new_severity = st.selectbox(
+                "Severity", ["low", "medium", "high", "critical"]
+            )
+            new_status = st.selectbox(
+                "Status", ["open", "investigating", "resolved"]
+            )
+            detected_date = st.date_input("Detected at")
+            resolved_date = st.date_input("Resolved at (optional)", value=None)
+
+        submitted = st.form_submit_button("Create IT incident")
+
+    if submitted:
+        if not new_service.strip() or not new_incident_type.strip():
+            st.error("Please fill in service name and incident type.")
+        else:
+            # group-committed by the background writer (write_queue.py)
+            try:
+                incident_id = submit_incident("it", {
+                    "service_name": new_service.strip(),
+                    "incident_type": new_incident_type.strip(),
+                    "severity": new_severity,
+                    "status": new_status,
+                    "detected_at": str(detected_date),
+                    "resolved_at": str(resolved_date) if resolved_date else None,
+                }).result(timeout=SAVE_TIMEOUT)
+            except WriteQueueFull:
+                st.error("The database is busy right now; please submit again.")
+            except Exception as exc:
+                st.error(f"IT incident was not saved: {exc}")
+            else:
+                # cached queries pick up the new table version on rerun
+                st.session_state["it_flash"] = f"New IT incident #{incident_id} saved."
+                st.rerun()
+
+    # ---------- Bulk import ----------
+    st.subheader("Bulk Import")
+    render_bulk_upload("it", key="it_import", scope=policy.restrict("it"))
+
+
+if __name__ == "__main__":
+    show()
\ No newline at end of file
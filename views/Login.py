@@ -0,0 +1,28 @@
+import streamlit as st
+
+from auth_service import BAD_PASSWORD, BUSY, LOGIN_OK, authenticate
+
+
+def show():
+    st.title("Login System")
+
+    with st.form("login", clear_on_submit=True):
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+        login_btn = st.form_submit_button("Login")
+
+    if login_btn:
+        # user lookup is cached; bcrypt runs in the shared worker pool
+        status, role = authenticate(username, password)
+
+        if status == LOGIN_OK:
+            st.session_state["logged_in_user"] = username
+            st.session_state["role"] = role
+            st.success(f"Login successful. Welcome {username}! (Role: {role})")
+            st.rerun()
+        elif status == BAD_PASSWORD:
+            st.error("Incorrect password")
+        elif status == BUSY:
+            st.error("The login service is busy right now; please try again in a moment.")
+        else:
+            st.error("User not found")
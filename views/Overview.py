@@ -0,0 +1,107 @@
+import pandas as pd
+import streamlit as st
+
+from access import session_policy
+from analytics import dashboard_view
+from correlation import WINDOWS_MINUTES, get_correlation
+from db_helper import IncidentFilter, get_filter_options
+from instrumentation import span
+
+
+def _window_label(minutes: int) -> str:
+    return f"{minutes} min" if minutes < 60 else f"{minutes // 60} h"
+
+
+def _minutes(value):
+    return "–" if value is None else f"{value:.0f}"
+
+
+def show():
+    st.title("Overview")
+
+    st.write(
+        """
+        Both incident domains side by side, and the IT incidents that
+        started shortly after a cyber incident. Use the **Cybersecurity
+        Dashboard** and **IT Dashboard** pages for each domain in detail.
+        """
+    )
+
+    # ---------- auth check ----------
+    user = st.session_state.get("logged_in_user")
+    if not user:
+        st.warning("Please login from the Login page first.")
+        return
+
+    # ---------- row access of the role ----------
+    policy = session_policy(st.session_state)
+    if not (policy.allows("cyber") and policy.allows("it")):
+        st.error(f"The overview needs access to both incident domains, which your role "
+                 f"(`{policy.role}`) does not have.")
+        return
+    if not (policy.unrestricted("cyber") and policy.unrestricted("it")):
+        st.info("Your role sees part of the incidents; every figure below covers those rows only.")
+
+    # ---------- both domains ----------
+    cyber_view = dashboard_view("cyber", policy.restrict("cyber"))
+    it_view = dashboard_view("it", policy.restrict("it"))
+
+    st.subheader("Both Domains")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Cyber incidents", cyber_view.metrics["total"])
+    c2.metric("Cyber open / investigating", cyber_view.metrics["open_investigating"])
+    c3.metric("IT incidents", it_view.metrics["total"])
+    c4.metric("IT open / investigating", it_view.metrics["open_investigating"])
+
+    if cyber_view.metrics["total"] or it_view.metrics["total"]:
+        st.caption("Incidents per day")
+        st.line_chart(pd.concat({"Cyber": cyber_view.time_series, "IT": it_view.time_series},
+                                axis=1).fillna(0))
+
+    # ---------- cyber -> IT correlation ----------
+    st.subheader("Cyber Incidents Followed by IT Incidents")
+
+    # only the types of rows the role may read
+    cyber_types = get_filter_options("cyber", policy.restrict("cyber"))["types"]
+    it_types = get_filter_options("it", policy.restrict("it"))["types"]
+    w1, w2, w3 = st.columns([1, 2, 2])
+    window = w1.select_slider("Window", WINDOWS_MINUTES, value=60,
+                              format_func=_window_label, key="overview_window")
+    selected_cyber = w2.multiselect("Cyber incident types", cyber_types,
+                                    default=cyber_types, key="overview_cyber_types")
+    selected_it = w3.multiselect("IT incident types", it_types,
+                                 default=it_types, key="overview_it_types")
+
+    result = get_correlation(window,
+                             policy.restrict("cyber", IncidentFilter(types=tuple(selected_cyber))),
+                             policy.restrict("it", IncidentFilter(types=tuple(selected_it))))
+    summary = result.summary
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Linked IT incidents", summary["linked_it"],
+              help=f"{summary['linked_it_share']:.1%} of {summary['it_incidents']} "
+                   "IT incidents started within the window after a cyber incident")
+    m2.metric("Cyber incidents followed", summary["cyber_followed"],
+              help=f"of {summary['cyber_incidents']} cyber incidents")
+    m3.metric("Median lag (min)", _minutes(summary["median_lag_minutes"]))
+    m4.metric("p95 lag (min)", _minutes(summary["p95_lag_minutes"]))
+
+    if not summary["linked_it"]:
+        st.info(f"No IT incident started within {_window_label(window)} of a cyber incident.")
+        return
+
+    st.caption("Links by cyber incident type (rows) and IT incident type (columns); "
+               "each IT incident is linked to the latest cyber incident before it")
+    st.dataframe(result.pairs, use_container_width=True)
+
+    st.caption("Linked IT incidents per day")
+    st.bar_chart(result.daily)
+
+    st.caption(f"Most recent links (latest {len(result.links)})")
+    with span("render.dataframe", rows=len(result.links)):
+        st.dataframe(result.links.round({"lag_minutes": 1}), use_container_width=True,
+                     hide_index=True)
+
+
+if __name__ == "__main__":
+    show()
@@ -0,0 +1,31 @@
+"""
+Pages routed by app.py.
+
+They live here rather than in pages/, which Streamlit would auto-discover
+and run as extra multipage entries next to app.py's own navigation. A page
+module is imported the first time it is selected, so opening the login
+page does not import pandas or the data layer.
+"""
+import importlib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Page:
+    module: str               # module in this package with a show() function
+    needs_data: bool = True   # reads incidents (load the domain registry first)
+
+
+# Navigation label -> page, in menu order
+PAGES = {
+    "Login": Page("Login", needs_data=False),
+    "Overview": Page("Overview"),
+    "Cybersecurity Dashboard": Page("CybersecurityDashboard"),
+    "IT Dashboard": Page("ITDashboard"),
+    "Diagnostics": Page("Diagnostics", needs_data=False),
+}
+
+
+def load_page(label: str):
+    """Import (once) and return the module behind a navigation label."""
+    return importlib.import_module(f"{__name__}.{PAGES[label].module}")
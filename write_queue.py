@@ -0,0 +1,183 @@
+"""
+Background writer that group-commits incident inserts.
+
+Form handlers and feeds call `submit(domain, values)`, which validates the
+row on the caller's thread, enqueues it and returns a Future. One writer
+thread drains the queue: it takes every pending row, up to `max_batch`, and
+inserts them in one transaction (one commit and WAL sync for the batch).
+Rows that arrive while a commit is running form the next batch. Once the
+last batch showed concurrent submitters, a batch is also held open for up
+to `max_latency` (MAX_LATENCY, a few milliseconds) to gather more rows, so
+a burst shares one commit; a row then waits at most that long plus the
+batch ahead of it. A lone submitter's row is committed straight away. Each
+Future resolves to the new incident_id once the commit is durable, or to
+the error of its own row; a bad row does not fail the rest of the batch.
+
+The queue is bounded. When it is full, `submit` blocks for up to `timeout`
+seconds and then raises WriteQueueFull, so callers slow down instead of
+piling up "database is locked" retries.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from db_pool import connection
+from incident_cache import invalidate
+from incident_repo import INCIDENT_TABLES, prepare_insert
+from migrations import ensure_migrated
+
+MAX_PENDING = 10_000
+MAX_BATCH = 500
+MAX_LATENCY = 0.005      # seconds a busy batch is held open for more rows
+SUBMIT_TIMEOUT = 5.0
+
+_STOP = object()
+
+
+class WriteQueueFull(Exception):
+    """Raised when the queue stayed full for the whole submit timeout."""
+
+
+class WriteQueue:
+    """Bounded queue of incident inserts, written by one thread in batches."""
+
+    def __init__(self, max_pending: int = MAX_PENDING, max_batch: int = MAX_BATCH,
+                 max_latency: float = MAX_LATENCY):
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.commit_seconds = 0.0
+        self._last_batch = 0
+        self._thread = threading.Thread(target=self._run, name="incident-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- producer side ----------
+
+    def submit(self, domain: str, values: dict, timeout: float = SUBMIT_TIMEOUT) -> Future:
+        """
+        Queue one incident; the Future resolves to its incident_id. Invalid
+        values raise ValueError here, before anything is queued.
+        """
+        sql, params = prepare_insert(domain, values)
+        future = Future()
+        try:
+            self._queue.put((INCIDENT_TABLES[domain]["table"], sql, params, future),
+                            timeout=timeout)
+        except queue.Full:
+            raise WriteQueueFull(
+                f"Write queue full ({self._queue.maxsize} pending); try again shortly."
+            ) from None
+        return future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self):
+        """Block until everything submitted so far is committed (or failed)."""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    # ---------- writer thread ----------
+
+    def _collect(self, first) -> list:
+        batch = [first]
+        # Only hold the batch open when the last one showed concurrent
+        # submitters; a lone analyst's row is committed straight away.
+        wait = self.max_latency if self._last_batch > 1 else 0.0
+        deadline = time.monotonic() + wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 \
+                    else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _STOP:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect(self._queue.get())
+            stop = batch[-1] is _STOP
+            rows = batch[:-1] if stop else batch
+            self._last_batch = len(rows)
+            if rows:
+                self._write(rows)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, rows: list):
+        started = time.perf_counter()
+        outcomes = []                  # (future, incident_id or exception)
+        try:
+            ensure_migrated()
+            with connection() as conn:
+                for _, sql, params, future in rows:
+                    # a failed statement is rolled back on its own; the
+                    # transaction and the other rows carry on
+                    try:
+                        outcomes.append((future, conn.execute(sql, params).lastrowid))
+                    except sqlite3.Error as exc:
+                        outcomes.append((future, exc))
+        except Exception as exc:       # the commit itself failed: nothing persisted
+            outcomes = [(future, exc) for *_, future in rows]
+
+        written = [table for (table, *_), (_, result) in zip(rows, outcomes)
+                   if not isinstance(result, Exception)]
+        for table in set(written):
+            invalidate(table)
+        with self._lock:
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(rows))
+            self.rows_written += len(written)
+            self.rows_failed += len(rows) - len(written)
+            self.commit_seconds += time.perf_counter() - started
+        for future, result in outcomes:
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "rows_written": self.rows_written,
+                "rows_failed": self.rows_failed,
+                "batches": self.batches,
+                "largest_batch": self.largest_batch,
+                "mean_batch": self.rows_written / self.batches if self.batches else 0.0,
+                "commit_seconds": self.commit_seconds,
+            }
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteQueue:
+    """Process-wide writer shared by all sessions."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = WriteQueue()
+    return _writer
+
+
+def submit_incident(domain: str, values: dict, timeout: float = SUBMIT_TIMEOUT) -> Future:
+    return get_write_queue().submit(domain, values, timeout)